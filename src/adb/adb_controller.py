@@ -1,18 +1,47 @@
 from __future__ import annotations
+from typing import Optional
 from core.point import Point
+from core.region import Region
 import time
 import numpy as np
 from numpy.typing import NDArray
 from PIL.Image import Image
 
 from adb.interfaces.i_adb_device_client import IAdbDeviceClient
+from adb.input_batch import InputBatch
+from adb.screen_change import ScreenChangeCondition, SettleResult
+import vision.preprocessing as vision_pre
+from vision.change_detection import compute_fingerprint, is_fingerprint_changed
+from vision.layout import REFERENCE_RESOLUTION, LayoutProfile, get_layout_profile
+
+from logger.logger import setup_logger, logging
+from logger.metrics import metrics, INPUT, SLEEP
+logger = setup_logger(__name__, level=logging.ERROR)
 
 class AdbControllerError(Exception):
     pass
 
 class AdbController:
+    """
+    Points and regions passed in are in layout space (Settings coordinates, REFERENCE_RESOLUTION)
+    and are mapped to the device resolution, so devices can run at any resolution.
+    """
     def __init__(self, adb_device_client: IAdbDeviceClient):
         self.adb_device_client = adb_device_client
+        self._screenshot_buffer: Optional[NDArray[np.uint8]] = None
+        # Full frames polled by capture_watched_image - never handed out by get_screenshot()
+        self._watch_buffer: Optional[NDArray[np.uint8]] = None
+        # (width, height, header_size) of the raw framebuffer, learnt from the last full capture
+        self._framebuffer_geometry: Optional[tuple[int, int, int]] = None
+        # time.monotonic() when the last input command completed on the device
+        self.last_input_at: float = 0.0
+
+    def _device_layout(self) -> LayoutProfile:
+        """Layout of the device screen - the reference until a full capture revealed its resolution."""
+        if self._framebuffer_geometry is None:
+            return get_layout_profile(*REFERENCE_RESOLUTION)
+        width, height, _ = self._framebuffer_geometry
+        return get_layout_profile(width, height)
 
     # --------------------------------
     # Screen
@@ -24,24 +53,150 @@ class AdbController:
             return pil_image
         except Exception as e:
             raise AdbControllerError from e
-        
+
+    def get_screenshot(self, out: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint8]:
+        """
+        Return screenshot as BGR np array, read from the raw framebuffer.
+        Skips the PNG encode (device) / decode (host) of get_raw_screenshot().
+
+        The result is written into `out`, or into a buffer owned by the controller
+        which is overwritten by the next call - copy it to keep it across captures.
+        """
+        try:
+            if out is not None:
+                return self._capture_full_frame(out)
+            self._screenshot_buffer = self._capture_full_frame(self._screenshot_buffer)
+            return self._screenshot_buffer
+        except Exception as e:
+            raise AdbControllerError("Failed to capture raw framebuffer screenshot.") from e
+
+    def _capture_full_frame(self, dst: Optional[NDArray[np.uint8]]) -> NDArray[np.uint8]:
+        raw = self.adb_device_client.exec_out("screencap")
+        self._framebuffer_geometry = vision_pre.parse_raw_screencap_header(raw)
+        return vision_pre.process_raw_screencap(raw, dst=dst)
+
+    def capture_regions(self, regions: list[Region]) -> list[NDArray[np.uint8]]:
+        """
+        Return BGR crops (device resolution) for the given layout space regions only (same order).
+
+        Once the framebuffer geometry is known, only the band of rows spanning the
+        regions is transferred (trimmed on the device with tail/head). Only the
+        cropped pixels are colour converted - unrequested rows/columns cost nothing.
+        """
+        try:
+            if not regions:
+                return []
+            if self._framebuffer_geometry is None:
+                return self._capture_regions_from_full_framebuffer(regions)
+
+            width, height, header_size = self._framebuffer_geometry
+            device_layout = self._device_layout()
+            clamped = [device_layout.region(region).clamp(width + 1, height + 1) for region in regions]
+            bounds = [region.to_tuple_x1_y1_x2_y2() for region in clamped]
+            y_min = min(y1 for _, y1, _, _ in bounds)
+            y_max = max(y2 for _, _, _, y2 in bounds)
+            stride = width * 4
+            start, length = header_size + y_min * stride, (y_max - y_min) * stride
+
+            raw_rows = self.adb_device_client.exec_out(f"screencap | tail -c +{start + 1} | head -c {length}")
+            if len(raw_rows) != length:
+                # Geometry changed (rotation / resolution) or the device lacks tail/head -c
+                return self._capture_regions_from_full_framebuffer(regions)
+
+            band = vision_pre.convert_raw_screencap_rows_2_np_array(raw_rows, width)
+            return [vision_pre.crop_RGBA_2_BGR(band, region, y_offset=y_min) for region in clamped]
+        except Exception as e:
+            raise AdbControllerError(f"Failed to capture {len(regions)} regions.") from e
+
+    def _capture_regions_from_full_framebuffer(self, regions: list[Region]) -> list[NDArray[np.uint8]]:
+        raw = self.adb_device_client.exec_out("screencap")
+        self._framebuffer_geometry = vision_pre.parse_raw_screencap_header(raw)
+        width, height, _ = self._framebuffer_geometry
+        device_layout = self._device_layout()
+        rgba = vision_pre.convert_raw_screencap_2_np_array(raw)
+        return [vision_pre.crop_RGBA_2_BGR(rgba, device_layout.region(region).clamp(width + 1, height + 1)) for region in regions]
+
+    # --------------------------------
+    # Screen change (input confirmation)
+    # --------------------------------
+    def capture_watched_image(self, condition: ScreenChangeCondition) -> NDArray[np.uint8]:
+        """Capture the condition's region (partial capture) or the full frame."""
+        if condition.region is None:
+            self._watch_buffer = self._capture_full_frame(self._watch_buffer)
+            return self._watch_buffer
+        return self.capture_regions([condition.region])[0]
+
+    def wait_for_screen_change(
+        self,
+        condition: ScreenChangeCondition,
+        baseline: Optional[NDArray[np.uint8]] = None,
+        since: Optional[float] = None
+    ) -> SettleResult:
+        """
+        Poll the watched image until it reaches condition.expected or, without a predicate,
+        until its fingerprint differs from baseline's (a BGR image captured before the input).
+        since: time.monotonic() the settle latency is measured from (default: last input).
+        """
+        try:
+            if condition.expected is None and baseline is None:
+                raise ValueError("Waiting for any change requires a baseline image.")
+            baseline_fingerprint = None if baseline is None else compute_fingerprint(baseline)
+            start = self.last_input_at if since is None else since
+            deadline = time.monotonic() + condition.timeout
+            polls = 0
+            while True:
+                image = self.capture_watched_image(condition)
+                polls += 1
+                captured_at = time.monotonic()
+                if condition.expected is not None:
+                    settled = condition.expected(image)
+                else:
+                    settled = is_fingerprint_changed(baseline_fingerprint, compute_fingerprint(image))
+                if settled:
+                    return SettleResult(True, captured_at - start, polls)
+                if captured_at >= deadline:
+                    logger.warning(f"Screen did not settle within {condition.timeout}s (region: {condition.region}).")
+                    return SettleResult(False, captured_at - start, polls)
+                with metrics.span("adb_controller.settle_poll", SLEEP):
+                    time.sleep(condition.poll_interval)
+        except Exception as e:
+            raise AdbControllerError("Failed to wait for screen change.") from e
+
+    def _run_input(self, cmd: str, debounce: float, confirm: Optional[ScreenChangeCondition]) -> Optional[SettleResult]:
+        """Run an input shell command, then sleep debounce - or, with confirm, wait for the screen to settle."""
+        baseline = None
+        if confirm is not None and confirm.expected is None:
+            baseline = self.capture_watched_image(confirm).copy()
+        with metrics.span("adb_controller.input", INPUT):
+            self.adb_device_client.shell_exc(cmd)
+        self.last_input_at = time.monotonic()
+        if confirm is None:
+            with metrics.span("adb_controller.debounce", SLEEP):
+                time.sleep(debounce)
+            return None
+        return self.wait_for_screen_change(confirm, baseline=baseline)
 
     # --------------------------------
     # Tap
     # --------------------------------
-    def tap(self, pt: Point, debounce: float = 0.2):
+    def tap(self, pt: Point, debounce: float = 0.2, confirm: Optional[ScreenChangeCondition] = None) -> Optional[SettleResult]:
+        """Tap pt. With confirm, return as soon as the screen settles instead of sleeping debounce."""
         try:
-            self.adb_device_client.shell_exc(f"input tap {pt.x} {pt.y}")
-            time.sleep(debounce)   
+            x, y = self._device_layout().point(pt).to_int_tuple_x_y()
+            return self._run_input(f"input tap {x} {y}", debounce, confirm)
         except Exception as e:
             raise AdbControllerError(f"Failed to tap at {pt}.") from e
         
 
-    def tap_multiple(self, pt: Point, number_of_clicks: int = 1, debounce: float = 0.5):
+    def tap_multiple(
+        self,
+        pt: Point,
+        number_of_clicks: int = 1,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
         try:
-            for _ in range(number_of_clicks):
-                self.tap(pt, debounce=0)
-            time.sleep(debounce)  
+            return self.run_input_batch(InputBatch().tap(pt, number_of_clicks=number_of_clicks), debounce=debounce, confirm=confirm)
         except Exception as e:
             raise AdbControllerError(f"Filated to tap {number_of_clicks} times at {pt}.") from e
         
@@ -50,9 +205,40 @@ class AdbController:
     # --------------------------------
     # Swipe
     # --------------------------------
-    def swipe(self, start_pt: Point, end_pt: Point, duration: int = 500, debounce: float = 0.5):
+    def swipe(
+        self,
+        start_pt: Point,
+        end_pt: Point,
+        duration: int = 500,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        try:
+            return self.run_input_batch(InputBatch().swipe(start_pt, end_pt, duration), debounce=debounce, confirm=confirm)
+        except Exception as e:
+            raise AdbControllerError(f"Failed to swipe from {start_pt} to {end_pt}.") from e
+
+
+    # --------------------------------
+    # Input Batch
+    # --------------------------------
+    def run_input_batch(
+        self,
+        batch: InputBatch,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        """
+        Run all steps of the batch as one device-side shell script (single round trip).
+        With confirm, the last step runs in a round trip of its own: the earlier steps (and their waits)
+        may redraw the watched region, so its baseline - and the settle timeout - start right before it.
+        """
         try:
-            self.adb_device_client.shell_exc(f"input swipe {start_pt.x} {start_pt.y} {end_pt.x} {end_pt.y} {duration}")
-            time.sleep(debounce)    
+            point_map = self._device_layout().point
+            if confirm is not None and len(batch) > 1:
+                head, batch = batch.split_last()
+                with metrics.span("adb_controller.input", INPUT):
+                    self.adb_device_client.shell_exc(head.compile(point_map))
+            return self._run_input(batch.compile(point_map), debounce, confirm)
         except Exception as e:
-            raise AdbControllerError(f"Failed to swipe from {start_pt} to {end_pt}.") from e
\ No newline at end of file
+            raise AdbControllerError(f"Failed to run input batch of {len(batch)} steps.") from e
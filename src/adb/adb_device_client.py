@@ -1,10 +1,14 @@
 
+import threading
 import time
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from adbutils import adb, AdbDevice # type: ignore
 from PIL.Image import Image
 
+from adb.connection_stats import ConnectionStats
+
 from logger.logger import setup_logger, logging
+from logger.metrics import metrics, CAPTURE
 logger = setup_logger(__name__, level=logging.ERROR)
 
 class AdbDeviceClientError(Exception):
@@ -13,16 +17,26 @@ class AdbDeviceClientError(Exception):
 class AdbDeviceClientConnectionTimeoutError(Exception):
     pass
 
+T = TypeVar("T")
+
 class AdbDeviceClient:
-    def __init__(self, addr: str, timeout: Optional[float] = None, retry: int = 3):
+    def __init__(self, addr: str, timeout: Optional[float] = None, retry: int = 3, liveness_ttl: float = 5.0):
         """
         Initialize the ADB device by serial.
         If serial is None, selects the first connected device.
+
+        liveness_ttl: seconds a successful command counts as proof the link is up -
+        maintain_connection() only probes get_state() once the link has been idle longer.
         """
         self.addr = addr
         self.timeout = timeout
         self.retry = retry
+        self.liveness_ttl = liveness_ttl
         self.adb_device: Optional[AdbDevice] = None
+        self.connection_stats = ConnectionStats()
+        self._last_alive: Optional[float] = None
+        # Serialises connection checks / reconnects when commands run from several threads
+        self._connection_lock = threading.RLock()
 
     def connect(self) -> bool:
         for _ in range(self.retry):
@@ -35,6 +49,7 @@ class AdbDeviceClient:
                 if state != "device":
                     raise ConnectionError(f"Connected device with state '{state}'")
                 self.adb_device = temp_device
+                self._mark_alive()
                 logger.info(f"Adb device connection is established at {self.addr}")
                 return True
             except Exception:
@@ -46,11 +61,14 @@ class AdbDeviceClient:
     def disconnect(self):
         adb.disconnect(self.addr) # type: ignore
         self.adb_device = None
+        self._last_alive = None
 
     def reconnect(self) -> bool:
-        self.disconnect()
-        self.connect()
-        return True
+        with self._connection_lock:
+            self.connection_stats.reconnects += 1
+            self.disconnect()
+            self.connect()
+            return True
 
     def check_connection(self) -> bool:
         try:
@@ -64,19 +82,82 @@ class AdbDeviceClient:
         return False
     
     def maintain_connection(self) -> bool:
-        is_connected = self.check_connection()
-        if not is_connected:
+        """
+        Reconnect if the link is down.
+        A command that succeeded within liveness_ttl counts as proof of liveness - no probe is sent.
+        """
+        if self.is_recently_alive():
+            self.connection_stats.probes_avoided += 1
+            return True
+        with self._connection_lock:
+            if self.is_recently_alive():
+                self.connection_stats.probes_avoided += 1
+                return True
+            self.connection_stats.probes_sent += 1
+            if self.check_connection():
+                self._mark_alive()
+            else:
+                self.reconnect()
+            return True
+
+    def is_recently_alive(self) -> bool:
+        return (
+            self.adb_device is not None
+            and self._last_alive is not None
+            and time.monotonic() - self._last_alive < self.liveness_ttl
+        )
+
+    def _mark_alive(self):
+        self._last_alive = time.monotonic()
+
+    def _run_command(self, command: Callable[[], T], idempotent: bool) -> T:
+        """
+        Run an adb command, reconnecting if the command itself fails.
+        Only idempotent commands (reads) are retried once - input may already have run
+        on the device when the link dropped, so a failed one is raised after reconnecting.
+        Success refreshes the liveness TTL.
+        """
+        self.maintain_connection()
+        try:
+            result = command()
+        except Exception as e:
+            self.connection_stats.command_failures += 1
+            if not idempotent:
+                logger.warning("Adb command failed - reconnecting, not retried.")
+                self.reconnect()
+                raise AdbDeviceClientError("Adb command failed and was not retried - it may have run on the device.") from e
+            logger.warning("Adb command failed - reconnecting and retrying once.")
             self.reconnect()
-        return True
+            result = command()
+        self._mark_alive()
+        return result
 
+    @metrics.timed()
     def shell_exc(self, cmd: str) -> str:
         """
         Run shell command, always return str.
-        Handles stream=False case.
+        Handles stream=False case. Not retried - shell commands send input.
         """
-        self.maintain_connection()
-        return self.device.shell(cmd, stream=False) # type: ignore
+        return self._run_command(lambda: self.adb_device.shell(cmd, stream=False), idempotent=False) # type: ignore
+
+    @metrics.timed(category=CAPTURE)
+    def exec_out(self, cmd: str) -> bytes:
+        """
+        Run command through the `exec:` service (adb exec-out), return raw stdout bytes.
+        Unlike shell, the output is not tty-mangled - safe for binary payloads.
+        Retried once on failure - only used for reads (screencap).
+        """
+        return self._run_command(lambda: self._exec_out(cmd), idempotent=True)
+
+    def _exec_out(self, cmd: str) -> bytes:
+        conn = self.adb_device.open_transport() # type: ignore
+        try:
+            conn.send_command(f"exec:{cmd}") # type: ignore
+            conn.check_okay() # type: ignore
+            return conn.read_until_close(encoding=None) # type: ignore
+        finally:
+            conn.close() # type: ignore
     
+    @metrics.timed(category=CAPTURE)
     def screenshot(self) -> Image:
-        self.maintain_connection()
-        return self.device.screenshot() # type: ignore
\ No newline at end of file
+        return self._run_command(lambda: self.adb_device.screenshot(), idempotent=True) # type: ignore
\ No newline at end of file
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Optional
+import zlib
+
+class AdbSessionError(Exception):
+    pass
+
+
+# Session directory layout
+SESSION_INDEX_FILE = "index.jsonl"
+SESSION_PAYLOADS_FILE = "payloads.bin"
+# Call kinds - the IAdbDeviceClient method recorded
+SCREENSHOT = "screenshot"  # payload: PNG bytes
+SHELL_EXC = "shell_exc"  # payload: utf-8 output
+EXEC_OUT = "exec_out"  # payload: raw stdout bytes
+PAYLOAD_COMPRESSION_LEVEL = 1  # framebuffers compress well even at the fastest level
+# Decompressed payloads kept by the reader (a raw 1920x1080 frame is ~8 MB)
+PAYLOAD_CACHE_SIZE = 8
+
+
+@dataclass(frozen=True, slots=True)
+class SessionRecord:
+    seq: int
+    kind: str
+    cmd: str
+    started_at: float  # seconds since session start
+    duration: float  # seconds the device took to answer
+    offset: int  # of the zlib payload in the payloads file
+    size: int  # compressed size
+    error: Optional[str] = None  # the call raised - replayed as an error
+
+
+class AdbSessionWriter:
+    """
+    Appends recorded calls to a session directory: one JSON line per call in the index,
+    payloads zlib-compressed in one blob file. Identical payloads (static screens,
+    empty shell output) are stored once and referenced by every record using them.
+    """
+    def __init__(self, session_dir: Path):
+        try:
+            session_dir.mkdir(parents=True, exist_ok=True)
+            self.session_dir = session_dir
+            self._index = open(session_dir / SESSION_INDEX_FILE, "w", encoding="utf-8")
+            self._payloads = open(session_dir / SESSION_PAYLOADS_FILE, "wb")
+        except Exception as e:
+            raise AdbSessionError(f"Failed to create adb session at {session_dir}.") from e
+        self.started_at = time.monotonic()
+        self.records = 0
+        self.payload_bytes = 0  # uncompressed
+        self.stored_bytes = 0  # compressed, deduplicated
+        self._seen: dict[bytes, tuple[int, int]] = {}  # payload digest -> (offset, size)
+        self._lock = threading.Lock()
+
+    def write(self, kind: str, cmd: str, started_at: float, duration: float, payload: bytes, error: Optional[str] = None):
+        """started_at: time.monotonic() when the call was made."""
+        with self._lock:
+            digest = hashlib.blake2b(payload, digest_size=16).digest()
+            location = self._seen.get(digest)
+            if location is None:
+                compressed = zlib.compress(payload, PAYLOAD_COMPRESSION_LEVEL)
+                location = (self._payloads.tell(), len(compressed))
+                self._payloads.write(compressed)
+                self._seen[digest] = location
+                self.stored_bytes += len(compressed)
+            self.payload_bytes += len(payload)
+            record = SessionRecord(self.records, kind, cmd, started_at - self.started_at, duration, *location, error)
+            self._index.write(json.dumps(asdict(record)) + "\n")
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._index.close()
+            self._payloads.close()
+
+
+class AdbSessionReader:
+    """A recorded session, index in memory, payloads read (and decompressed) on demand."""
+    def __init__(self, session_dir: Path):
+        try:
+            with open(session_dir / SESSION_INDEX_FILE, encoding="utf-8") as f:
+                self.records = [SessionRecord(**json.loads(line)) for line in f if line.strip()]
+            self._payloads = (session_dir / SESSION_PAYLOADS_FILE).read_bytes()
+        except Exception as e:
+            raise AdbSessionError(f"Failed to load adb session from {session_dir}.") from e
+        self.session_dir = session_dir
+        self._cache: OrderedDict[int, bytes] = OrderedDict()  # offset -> payload, LRU
+        self._cache_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def payload(self, record: SessionRecord) -> bytes:
+        with self._cache_lock:
+            payload = self._cache.get(record.offset)
+            if payload is not None:
+                self._cache.move_to_end(record.offset)
+                return payload
+        try:
+            payload = zlib.decompress(self._payloads[record.offset:record.offset + record.size])
+        except Exception as e:
+            raise AdbSessionError(f"Corrupt payload for session record {record.seq}.") from e
+        with self._cache_lock:
+            self._cache[record.offset] = payload
+            if len(self._cache) > PAYLOAD_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return payload
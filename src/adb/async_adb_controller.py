@@ -0,0 +1,106 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+import time
+from typing import Any, Callable, Optional, TypeVar
+import numpy as np
+from numpy.typing import NDArray
+
+from core.point import Point
+from core.region import Region
+from adb.input_batch import InputBatch
+from adb.screen_change import ScreenChangeCondition, SettleResult
+from adb.interfaces.i_adb_controller import IAdbController
+
+from logger.metrics import metrics, SLEEP
+
+T = TypeVar("T")
+
+class AsyncAdbController:
+    """
+    Async wrapper of a (blocking) IAdbController.
+
+    Adb round trips and colour conversion run in the executor; debounce waits are
+    asyncio.sleep, so the event loop keeps serving other work (e.g. recognition of
+    the previous frame) meanwhile. Screenshots alternate between two buffers so a
+    capture can run while the previous frame is still being processed.
+    """
+    def __init__(self, adb_controller: IAdbController, executor: Optional[Executor] = None):
+        self.adb_controller = adb_controller
+        self.executor = executor
+        self.last_settled_at: float = 0.0
+        self._screenshot_buffers: list[Optional[NDArray[np.uint8]]] = [None, None]
+        self._next_buffer = 0
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    # --------------------------------
+    # Screen
+    # --------------------------------
+    async def get_screenshot(self) -> NDArray[np.uint8]:
+        """Return screenshot as BGR np array - valid until the second next call (double-buffered)."""
+        index = self._next_buffer
+        self._next_buffer ^= 1
+        screenshot = await self._run(self.adb_controller.get_screenshot, out=self._screenshot_buffers[index])
+        self._screenshot_buffers[index] = screenshot
+        return screenshot
+
+    async def capture_regions(self, regions: list[Region]) -> list[NDArray[np.uint8]]:
+        return await self._run(self.adb_controller.capture_regions, regions)
+
+    # --------------------------------
+    # Tap
+    # --------------------------------
+    async def tap(self, pt: Point, debounce: float = 0.2, confirm: Optional[ScreenChangeCondition] = None) -> Optional[SettleResult]:
+        result = await self._run(self.adb_controller.tap, pt, debounce=0, confirm=confirm)
+        await self._debounce(debounce, confirm)
+        return result
+
+    async def tap_multiple(
+        self,
+        pt: Point,
+        number_of_clicks: int = 1,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        result = await self._run(self.adb_controller.tap_multiple, pt, number_of_clicks=number_of_clicks, debounce=0, confirm=confirm)
+        await self._debounce(debounce, confirm)
+        return result
+
+    # --------------------------------
+    # Swipe
+    # --------------------------------
+    async def swipe(
+        self,
+        start_pt: Point,
+        end_pt: Point,
+        duration: int = 500,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        result = await self._run(self.adb_controller.swipe, start_pt, end_pt, duration=duration, debounce=0, confirm=confirm)
+        await self._debounce(debounce, confirm)
+        return result
+
+    # --------------------------------
+    # Input Batch
+    # --------------------------------
+    async def run_input_batch(
+        self,
+        batch: InputBatch,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        result = await self._run(self.adb_controller.run_input_batch, batch, debounce=0, confirm=confirm)
+        await self._debounce(debounce, confirm)
+        return result
+
+    async def _debounce(self, debounce: float, confirm: Optional[ScreenChangeCondition]):
+        # A confirmed input already waited for the screen to settle
+        if confirm is None:
+            with metrics.span("async_adb_controller.debounce", SLEEP):
+                await asyncio.sleep(debounce)
+        self.last_settled_at = time.monotonic()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+from PIL.Image import Image
+
+from adb.interfaces.i_adb_device_client import IAdbDeviceClient
+
+T = TypeVar("T")
+
+class AsyncAdbDeviceClient:
+    """
+    Async wrapper of a (blocking) IAdbDeviceClient.
+    Every call runs in the given executor (default: the loop's default executor).
+    """
+    def __init__(self, adb_device_client: IAdbDeviceClient, executor: Optional[Executor] = None):
+        self.adb_device_client = adb_device_client
+        self.executor = executor
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args))
+
+    async def connect(self) -> bool:
+        return await self._run(self.adb_device_client.connect)
+
+    async def disconnect(self) -> None:
+        await self._run(self.adb_device_client.disconnect)
+
+    async def reconnect(self) -> bool:
+        return await self._run(self.adb_device_client.reconnect)
+
+    async def check_connection(self) -> bool:
+        return await self._run(self.adb_device_client.check_connection)
+
+    async def maintain_connection(self) -> bool:
+        return await self._run(self.adb_device_client.maintain_connection)
+
+    async def shell_exc(self, cmd: str) -> str:
+        return await self._run(self.adb_device_client.shell_exc, cmd)
+
+    async def exec_out(self, cmd: str) -> bytes:
+        return await self._run(self.adb_device_client.exec_out, cmd)
+
+    async def screenshot(self) -> Image:
+        return await self._run(self.adb_device_client.screenshot)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Optional
+
+from adb.interfaces.i_adb_controller import IAdbController
+from config.settings import Settings
+from vision.frame_ring_buffer import FrameRingBuffer, FrameRingBufferError
+
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+
+class CaptureProducer:
+    """
+    Background thread capturing screenshots into a FrameRingBuffer, at most one every min_interval seconds.
+    Frames are tagged with the time their capture started, so a frame newer than an
+    input is guaranteed to have been captured after it.
+    Captures can be paused (pause_until) while nobody reads frames, e.g. between cycles.
+    """
+    def __init__(
+        self,
+        adb_controller: IAdbController,
+        frame_ring_buffer: FrameRingBuffer,
+        min_interval: float = Settings.CAPTURE_MIN_INTERVAL_SECONDS,
+        error_backoff: float = 1.0
+    ):
+        self.adb_controller = adb_controller
+        self.frame_ring_buffer = frame_ring_buffer
+        self.min_interval = min_interval
+        self.error_backoff = error_backoff
+        self.frames_captured = 0
+        self.failures = 0
+        # time.monotonic() before which no capture starts
+        self._resume_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="capture-producer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pause_until(self, resume_at: float):
+        """Start no capture before resume_at (time.monotonic) - a capture already running completes."""
+        self._resume_at = resume_at
+
+    def wait_for_resumed_frame(self, timeout: float = 5.0) -> bool:
+        """
+        Wait for a frame captured after the pause, so readers taking the latest frame
+        can't get one from before it. False on timeout.
+        """
+        frame = self.frame_ring_buffer.wait_for_newer(self._resume_at, timeout)
+        if frame is None:
+            logger.warning(f"No frame captured within {timeout}s of resuming captures.")
+            return False
+        self.frame_ring_buffer.release(frame)
+        return True
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            paused = self._resume_at - time.monotonic()
+            if paused > 0:
+                self._stop_event.wait(paused)
+                continue
+            try:
+                slot, buffer = self.frame_ring_buffer.acquire_write_slot()
+            except FrameRingBufferError:
+                # Every slot pinned by readers - wait for a release
+                self._stop_event.wait(0.01)
+                continue
+            captured_at = time.monotonic()
+            try:
+                screenshot = self.adb_controller.get_screenshot(out=buffer)
+            except Exception:
+                self.frame_ring_buffer.abort(slot)
+                self.failures += 1
+                logger.warning("Background capture failed.", exc_info=True)
+                self._stop_event.wait(self.error_backoff)
+                continue
+            self.frame_ring_buffer.commit(slot, screenshot, captured_at)
+            self.frames_captured += 1
+            wait = self.min_interval - (time.monotonic() - captured_at)
+            if wait > 0:
+                self._stop_event.wait(wait)
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass
+class ConnectionStats:
+    probes_sent: int = 0
+    probes_avoided: int = 0
+    reconnects: int = 0
+    command_failures: int = 0
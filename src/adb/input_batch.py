@@ -0,0 +1,93 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from core.point import Point
+
+class InputBatchError(Exception):
+    pass
+
+@dataclass(frozen=True, slots=True)
+class TapStep:
+    pt: Point
+
+@dataclass(frozen=True, slots=True)
+class SwipeStep:
+    start_pt: Point
+    end_pt: Point
+    duration: int
+
+@dataclass(frozen=True, slots=True)
+class WaitStep:
+    seconds: float
+
+InputStep = Union[TapStep, SwipeStep, WaitStep]
+
+
+class InputBatch:
+    """
+    Sequence of taps, swipes and waits compiled into one device-side shell script,
+    so the whole sequence costs a single adb round trip.
+    Builder methods return self for chaining.
+    """
+    def __init__(self):
+        self.steps: list[InputStep] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def tap(self, pt: Point, number_of_clicks: int = 1, interval: float = 0.0) -> InputBatch:
+        """Tap pt number_of_clicks times, waiting interval seconds between clicks."""
+        if number_of_clicks < 1:
+            raise InputBatchError(f"number_of_clicks must be >= 1, got {number_of_clicks}.")
+        for i in range(number_of_clicks):
+            if i > 0 and interval > 0:
+                self.steps.append(WaitStep(interval))
+            self.steps.append(TapStep(pt))
+        return self
+
+    def swipe(self, start_pt: Point, end_pt: Point, duration: int = 500) -> InputBatch:
+        self.steps.append(SwipeStep(start_pt, end_pt, duration))
+        return self
+
+    def wait(self, seconds: float) -> InputBatch:
+        if seconds < 0:
+            raise InputBatchError(f"Wait must be >= 0 seconds, got {seconds}.")
+        if seconds > 0:
+            self.steps.append(WaitStep(seconds))
+        return self
+
+    def extend(self, other: InputBatch) -> InputBatch:
+        self.steps.extend(other.steps)
+        return self
+
+    def split_last(self) -> tuple[InputBatch, InputBatch]:
+        """Return (all steps but the last, the last step) as two batches."""
+        head, last = InputBatch(), InputBatch()
+        head.steps = self.steps[:-1]
+        last.steps = self.steps[-1:]
+        return head, last
+
+    def compile(self, point_map: Optional[Callable[[Point], Point]] = None) -> str:
+        """
+        Return the batch as a single `;`-separated shell command.
+        point_map: applied to every point first (e.g. layout space -> device pixels).
+        """
+        if not self.steps:
+            raise InputBatchError("Cannot compile an empty input batch.")
+        return "; ".join(compile_input_step(step, point_map) for step in self.steps)
+
+
+def compile_input_step(step: InputStep, point_map: Optional[Callable[[Point], Point]] = None) -> str:
+    if point_map is None:
+        point_map = lambda pt: pt
+    match step:
+        case TapStep(pt=pt):
+            x, y = point_map(pt).to_int_tuple_x_y()
+            return f"input tap {x} {y}"
+        case SwipeStep(start_pt=start_pt, end_pt=end_pt, duration=duration):
+            x1, y1 = point_map(start_pt).to_int_tuple_x_y()
+            x2, y2 = point_map(end_pt).to_int_tuple_x_y()
+            return f"input swipe {x1} {y1} {x2} {y2} {int(duration)}"
+        case WaitStep(seconds=seconds):
+            return f"sleep {seconds:.3f}"
@@ -1,8 +1,13 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import Optional, Protocol
+import numpy as np
+from numpy.typing import NDArray
 from PIL.Image import Image
 from core.point import Point
+from core.region import Region
 from adb.interfaces.i_adb_device_client import IAdbDeviceClient
+from adb.input_batch import InputBatch
+from adb.screen_change import ScreenChangeCondition, SettleResult
 
 class IAdbController(Protocol):
     """
@@ -12,6 +17,7 @@ class IAdbController(Protocol):
     """
 
     adb_device_client: IAdbDeviceClient
+    last_input_at: float  # time.monotonic() when the last input command completed
 
     # -------------------------
     # Screen
@@ -20,20 +26,68 @@ class IAdbController(Protocol):
         """Return screenshot as PIL image - requires preprocessing."""
         ...
 
+    def get_screenshot(self, out: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint8]:
+        """
+        Return screenshot as BGR np array from the raw framebuffer.
+        Written into `out` if given, otherwise into a buffer reused by the next call.
+        """
+        ...
+
+    def capture_regions(self, regions: list[Region]) -> list[NDArray[np.uint8]]:
+        """Return BGR crops of only the requested regions, transferring as few rows as possible."""
+        ...
+
+    def wait_for_screen_change(
+        self,
+        condition: ScreenChangeCondition,
+        baseline: Optional[NDArray[np.uint8]] = None,
+        since: Optional[float] = None
+    ) -> SettleResult:
+        """Poll until the watched image changes from baseline / reaches the expected state, or time out."""
+        ...
+
     # -------------------------
     # Tap
     # -------------------------
-    def tap(self, pt: Point, debounce: float = 0.2) -> None:
-        """Tap on the device screen at the specified point."""
+    def tap(self, pt: Point, debounce: float = 0.2, confirm: Optional[ScreenChangeCondition] = None) -> Optional[SettleResult]:
+        """
+        Tap on the device screen at the specified point.
+        With confirm, wait for the screen to settle instead of sleeping debounce.
+        """
         ...
 
-    def tap_multiple(self, pt: Point, number_of_clicks: int = 1, debounce: float = 0.5) -> None:
+    def tap_multiple(
+        self,
+        pt: Point,
+        number_of_clicks: int = 1,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
         """Tap multiple times on the specified point."""
         ...
 
     # -------------------------
     # Swipe
     # -------------------------
-    def swipe(self, start_pt: Point, end_pt: Point, duration: int = 500, debounce: float = 0.5) -> None:
+    def swipe(
+        self,
+        start_pt: Point,
+        end_pt: Point,
+        duration: int = 500,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
         """Swipe from start_pt to end_pt over the specified duration in milliseconds."""
         ...
+
+    # -------------------------
+    # Input Batch
+    # -------------------------
+    def run_input_batch(
+        self,
+        batch: InputBatch,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        """Run a batch of taps / swipes / waits in a single adb round trip."""
+        ...
@@ -3,6 +3,7 @@ from typing import Protocol
 from PIL.Image import Image
 
 from adbutils import AdbDevice  # type: ignore
+from adb.connection_stats import ConnectionStats
 
 
 class IAdbDeviceClient(Protocol):
@@ -11,7 +12,15 @@ class IAdbDeviceClient(Protocol):
     Defines the expected methods and behavior for device interaction.
     """
 
-    adb_device: AdbDevice | None
+    # Read-only, so wrappers (RecordingAdbDeviceClient) can pass them through as properties
+    @property
+    def adb_device(self) -> AdbDevice | None:
+        ...
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        """Probe / reconnect / failure counters of this connection."""
+        ...
 
     def connect(self) -> bool:
         """
@@ -37,6 +46,7 @@ class IAdbDeviceClient(Protocol):
     def maintain_connection(self) -> bool:
         """
             Maintain connection of the current device - reconnect() if disconnected. 
+            Skips the connection probe while a recent command proves the link is alive.
             Raise AdbDeviceClientConnectionTimeoutError() from connect() on timetout
         """
         ...
@@ -45,6 +55,10 @@ class IAdbDeviceClient(Protocol):
         """Execute a shell command on the device and return its output as string."""
         ...
 
+    def exec_out(self, cmd: str) -> bytes:
+        """Execute a command via adb exec-out and return its raw stdout bytes."""
+        ...
+
     def screenshot(self) -> Image:
         """Get Screenshot from the current device"""
         ...
\ No newline at end of file
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Optional, Protocol
+import numpy as np
+from numpy.typing import NDArray
+from core.point import Point
+from core.region import Region
+from adb.input_batch import InputBatch
+from adb.screen_change import ScreenChangeCondition, SettleResult
+from adb.interfaces.i_adb_controller import IAdbController
+
+class IAsyncAdbController(Protocol):
+    """
+    Async interface for the AdbController.
+    Debounce waits are non-blocking (asyncio.sleep); blocking adb / cv2 work runs in an executor.
+    """
+
+    adb_controller: IAdbController
+    last_settled_at: float  # time.monotonic() when the last input's debounce / confirmation ended
+
+    # -------------------------
+    # Screen
+    # -------------------------
+    async def get_screenshot(self) -> NDArray[np.uint8]:
+        """
+        Return screenshot as BGR np array from the raw framebuffer.
+        Buffers are double-buffered: a frame stays valid until the second next capture.
+        """
+        ...
+
+    async def capture_regions(self, regions: list[Region]) -> list[NDArray[np.uint8]]:
+        """Return BGR crops of only the requested regions."""
+        ...
+
+    # -------------------------
+    # Tap
+    # -------------------------
+    async def tap(self, pt: Point, debounce: float = 0.2, confirm: Optional[ScreenChangeCondition] = None) -> Optional[SettleResult]:
+        """Tap on the device screen at the specified point."""
+        ...
+
+    async def tap_multiple(
+        self,
+        pt: Point,
+        number_of_clicks: int = 1,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        """Tap multiple times on the specified point."""
+        ...
+
+    # -------------------------
+    # Swipe
+    # -------------------------
+    async def swipe(
+        self,
+        start_pt: Point,
+        end_pt: Point,
+        duration: int = 500,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        """Swipe from start_pt to end_pt over the specified duration in milliseconds."""
+        ...
+
+    # -------------------------
+    # Input Batch
+    # -------------------------
+    async def run_input_batch(
+        self,
+        batch: InputBatch,
+        debounce: float = 0.5,
+        confirm: Optional[ScreenChangeCondition] = None
+    ) -> Optional[SettleResult]:
+        """Run a batch of taps / swipes / waits in a single adb round trip."""
+        ...
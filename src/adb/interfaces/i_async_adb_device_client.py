@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import Protocol
+from PIL.Image import Image
+
+from adb.interfaces.i_adb_device_client import IAdbDeviceClient
+
+
+class IAsyncAdbDeviceClient(Protocol):
+    """
+    Async interface for an ADB device client.
+    Same operations as IAdbDeviceClient, awaitable - blocking adb I/O runs off the event loop.
+    """
+
+    adb_device_client: IAdbDeviceClient
+
+    async def connect(self) -> bool:
+        """
+            Connect to the device. 
+            Returns True if successful, 
+            raises AdbDeviceClientConnectionTimeoutError on timeout.
+        """
+        ...
+
+    async def disconnect(self) -> None:
+        """Disconnect from the device."""
+        ...
+
+    async def reconnect(self) -> bool:
+        """Disconnect & connect to the device."""
+        ...
+
+    async def check_connection(self) -> bool:
+        """Check if the device is currently connected."""
+        ...
+
+    async def maintain_connection(self) -> bool:
+        """Maintain connection of the current device - reconnect() if disconnected."""
+        ...
+
+    async def shell_exc(self, cmd: str) -> str:
+        """Execute a shell command on the device and return its output as string."""
+        ...
+
+    async def exec_out(self, cmd: str) -> bytes:
+        """Execute a command via adb exec-out and return its raw stdout bytes."""
+        ...
+
+    async def screenshot(self) -> Image:
+        """Get Screenshot from the current device"""
+        ...
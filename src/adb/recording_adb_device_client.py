@@ -0,0 +1,87 @@
+from __future__ import annotations
+import io
+from pathlib import Path
+import time
+from typing import Callable, TypeVar
+from PIL.Image import Image
+
+from adbutils import AdbDevice  # type: ignore
+from adb.connection_stats import ConnectionStats
+from adb.adb_session import AdbSessionWriter, EXEC_OUT, SCREENSHOT, SHELL_EXC
+from adb.interfaces.i_adb_device_client import IAdbDeviceClient
+
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+T = TypeVar("T")
+
+
+class RecordingAdbDeviceClient:
+    """
+    IAdbDeviceClient wrapper recording every screenshot / shell_exc / exec_out call
+    (start time, device latency, payload) to an adb session for ReplayAdbDeviceClient.
+    Connection management is passed through unrecorded.
+    """
+    def __init__(self, adb_device_client: IAdbDeviceClient, session_dir: Path):
+        self.adb_device_client = adb_device_client
+        self.session = AdbSessionWriter(session_dir)
+
+    @property
+    def adb_device(self) -> AdbDevice | None:
+        return self.adb_device_client.adb_device
+
+    @property
+    def connection_stats(self) -> ConnectionStats:
+        return self.adb_device_client.connection_stats
+
+    def connect(self) -> bool:
+        return self.adb_device_client.connect()
+
+    def disconnect(self) -> None:
+        self.adb_device_client.disconnect()
+
+    def reconnect(self) -> bool:
+        return self.adb_device_client.reconnect()
+
+    def check_connection(self) -> bool:
+        return self.adb_device_client.check_connection()
+
+    def maintain_connection(self) -> bool:
+        return self.adb_device_client.maintain_connection()
+
+    def shell_exc(self, cmd: str) -> str:
+        return self._record(SHELL_EXC, cmd, lambda: self.adb_device_client.shell_exc(cmd), lambda output: output.encode())
+
+    def exec_out(self, cmd: str) -> bytes:
+        return self._record(EXEC_OUT, cmd, lambda: self.adb_device_client.exec_out(cmd), lambda output: output)
+
+    def screenshot(self) -> Image:
+        return self._record(SCREENSHOT, "", self.adb_device_client.screenshot, _encode_png)
+
+    def close(self):
+        self.session.close()
+        logger.info(
+            f"Recorded {self.session.records} adb calls: {self.session.payload_bytes} payload bytes "
+            f"stored in {self.session.stored_bytes} at {self.session.session_dir}"
+        )
+
+    def _record(self, kind: str, cmd: str, call: Callable[[], T], encode: Callable[[T], bytes]) -> T:
+        started_at = time.monotonic()
+        try:
+            result = call()
+        except Exception as e:
+            self.session.write(kind, cmd, started_at, time.monotonic() - started_at, b"", error=repr(e))
+            raise
+        duration = time.monotonic() - started_at
+        try:
+            self.session.write(kind, cmd, started_at, duration, encode(result))
+        except Exception:
+            # A full disk must not stop the bot
+            logger.error(f"Failed to record adb {kind} call.", exc_info=True)
+        return result
+
+
+def _encode_png(image: Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from collections import deque
+from enum import Enum, auto
+import io
+from pathlib import Path
+import random
+import re
+import threading
+import time
+from typing import Optional
+from PIL import Image as PILImage
+from PIL.Image import Image
+
+from adbutils import AdbDevice  # type: ignore
+from adb.adb_device_client import AdbDeviceClientError
+from adb.connection_stats import ConnectionStats
+from adb.adb_session import AdbSessionReader, SessionRecord, EXEC_OUT, SCREENSHOT, SHELL_EXC
+
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class ReplayAdbDeviceClientError(Exception):
+    pass
+
+class ReplaySessionExhaustedError(ReplayAdbDeviceClientError):
+    pass
+
+
+class ReplayTiming(Enum):
+    REALTIME = auto()  # every call takes as long as it took on the device
+    FAST = auto()  # no delay - measures the bot alone
+    SYNTHETIC = auto()  # fixed latency (+ uniform jitter) per call
+
+
+FULL_SCREENCAP_CMD = "screencap"
+# AdbController.capture_regions - served from the last full frame if not recorded as is
+PARTIAL_SCREENCAP_PATTERN = re.compile(r"^screencap \| tail -c \+(\d+) \| head -c (\d+)$")
+# Commands sent during replay, kept for inspection
+COMMAND_LOG_SIZE = 10000
+
+
+class ReplayAdbDeviceClient:
+    """
+    IAdbDeviceClient answering from a session recorded by RecordingAdbDeviceClient - no device needed.
+
+    Each (call kind, command) is answered with its recorded responses in recorded order,
+    so the same bot decisions see the same frames. Partial screencaps that were not
+    recorded are cut from the last full screencap served; unrecorded shell commands
+    (different inputs than in the session) return "" and are counted.
+    With loop=True an exhausted command starts over, otherwise it raises.
+    """
+    def __init__(
+        self,
+        session_dir: Path,
+        timing: ReplayTiming = ReplayTiming.FAST,
+        synthetic_latency: float = 0.0,
+        jitter: float = 0.0,
+        loop: bool = False,
+        seed: Optional[int] = None
+    ):
+        self.session = AdbSessionReader(session_dir)
+        self.timing = timing
+        self.synthetic_latency = synthetic_latency
+        self.jitter = jitter
+        self.loop = loop
+        self.adb_device: AdbDevice | None = None
+        self.connection_stats = ConnectionStats()
+        self.commands: deque[str] = deque(maxlen=COMMAND_LOG_SIZE)
+        self.unmatched_commands = 0
+        self._random = random.Random(seed)
+        self._responses: dict[tuple[str, str], list[SessionRecord]] = {}
+        for record in self.session.records:
+            self._responses.setdefault((record.kind, record.cmd), []).append(record)
+        self._cursors: dict[tuple[str, str], int] = {}
+        self._last_full_screencap: Optional[SessionRecord] = None
+        self._lock = threading.Lock()
+
+    # Connection - always up
+    def connect(self) -> bool:
+        return True
+
+    def disconnect(self) -> None:
+        pass
+
+    def reconnect(self) -> bool:
+        self.connection_stats.reconnects += 1
+        return True
+
+    def check_connection(self) -> bool:
+        return True
+
+    def maintain_connection(self) -> bool:
+        self.connection_stats.probes_avoided += 1
+        return True
+
+    # Commands
+    def shell_exc(self, cmd: str) -> str:
+        with self._lock:
+            self.commands.append(cmd)
+            record = self._next(SHELL_EXC, cmd, required=False)
+        if record is None:
+            self.unmatched_commands += 1
+            self._delay(None)
+            return ""
+        return self._respond(record).decode()
+
+    def exec_out(self, cmd: str) -> bytes:
+        partial_range: Optional[tuple[int, int]] = None
+        with self._lock:
+            record = self._next(EXEC_OUT, cmd, required=False)
+            if record is None:
+                partial = PARTIAL_SCREENCAP_PATTERN.match(cmd)
+                if partial is None:
+                    raise ReplayAdbDeviceClientError(f"Command not in the replayed session: exec_out {cmd!r}.")
+                record = self._last_full_screencap or self._next(EXEC_OUT, FULL_SCREENCAP_CMD, required=True)
+                start = int(partial.group(1)) - 1
+                partial_range = (start, start + int(partial.group(2)))
+            elif cmd == FULL_SCREENCAP_CMD:
+                self._last_full_screencap = record
+        assert record is not None
+        payload = self._respond(record)
+        if partial_range is not None:
+            return payload[partial_range[0]:partial_range[1]]
+        return payload
+
+    def screenshot(self) -> Image:
+        with self._lock:
+            record = self._next(SCREENSHOT, "", required=True)
+        assert record is not None
+        return PILImage.open(io.BytesIO(self._respond(record)))
+
+    def _next(self, kind: str, cmd: str, required: bool) -> Optional[SessionRecord]:
+        key = (kind, cmd)
+        records = self._responses.get(key)
+        if not records:
+            if required:
+                raise ReplayAdbDeviceClientError(f"No {kind} {cmd!r} calls in the replayed session.")
+            return None
+        cursor = self._cursors.get(key, 0)
+        if cursor >= len(records):
+            if not self.loop:
+                raise ReplaySessionExhaustedError(f"Replayed session has no more {kind} {cmd!r} responses.")
+            cursor = 0
+        self._cursors[key] = cursor + 1
+        return records[cursor]
+
+    def _respond(self, record: SessionRecord) -> bytes:
+        self._delay(record)
+        if record.error is not None:
+            self.connection_stats.command_failures += 1
+            raise AdbDeviceClientError(f"Replayed failure of recorded call {record.seq}: {record.error}")
+        return self.session.payload(record)
+
+    def _delay(self, record: Optional[SessionRecord]):
+        match self.timing:
+            case ReplayTiming.REALTIME:
+                seconds = record.duration if record is not None else 0.0
+            case ReplayTiming.SYNTHETIC:
+                seconds = self.synthetic_latency + self._random.uniform(0.0, self.jitter)
+            case _:
+                seconds = 0.0
+        if seconds > 0:
+            time.sleep(seconds)
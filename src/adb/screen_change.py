@@ -0,0 +1,27 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Optional
+import numpy as np
+from numpy.typing import NDArray
+
+from core.region import Region
+
+@dataclass(frozen=True, slots=True)
+class ScreenChangeCondition:
+    """
+    What confirms that an input took effect.
+
+    region: area to watch (cheap partial capture), None for the full frame.
+    expected: predicate on the watched BGR image for an expected state; None = any change.
+    timeout: counted from the confirmed step - waits queued before it in the same batch run first.
+    """
+    region: Optional[Region] = None
+    expected: Optional[Callable[[NDArray[np.uint8]], bool]] = None
+    timeout: float = 1.5
+    poll_interval: float = 0.05
+
+@dataclass(frozen=True, slots=True)
+class SettleResult:
+    settled: bool  # False if the screen never changed / reached the expected state before the timeout
+    latency: float  # seconds from the confirmed step completing to the confirming capture
+    polls: int
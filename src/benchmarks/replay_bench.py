@@ -0,0 +1,126 @@
+"""
+BotRunner throughput / tail latency over a recorded adb session - no device needed.
+
+Record a session by setting Settings.ADB_RECORD_SESSION_DIR and running main.py, then from src/:
+
+    python -m benchmarks.replay_bench SESSION_DIR [--timing fast|realtime|synthetic] [--latency S] [--jitter S] [--cycles N]
+
+Cycles run back to back (no cycle sleep) until --cycles or the session runs out.
+"""
+from __future__ import annotations
+import argparse
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import json
+from pathlib import Path
+import time
+from typing import Optional
+
+from config.paths import BENCHMARK_RESULTS_DIR
+from config.settings import Settings
+
+from adb.adb_controller import AdbController
+from adb.replay_adb_device_client import ReplayAdbDeviceClient, ReplaySessionExhaustedError, ReplayTiming
+from bot.async_bot_loop import CycleStats
+from bot.bot_runner import BotRunner
+from vision.change_detection import FrameChangeDetector
+from vision.memo import FrameMemo
+
+from logger.console import console
+
+
+@dataclass
+class ReplayBenchResult:
+    session: str
+    timing: str
+    cycles: int
+    failures: int
+    cycles_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    unmatched_commands: int
+
+
+def run_replay(adb_device_client: ReplayAdbDeviceClient, max_cycles: int) -> tuple[CycleStats, float]:
+    """
+    Run BotRunner cycles on the replayed session, return the stats and the elapsed seconds.
+    Input debounces only wait for the game to react, so FAST timing skips them like the recorded latencies.
+    """
+    change_detector = FrameChangeDetector()
+    bot_runner = BotRunner(
+        AdbController(adb_device_client),
+        change_detector=change_detector,
+        frame_memo=FrameMemo(change_detector, lru_size=Settings.FRAME_MEMO_LRU_SIZE),
+        input_debounce=0.0 if adb_device_client.timing is ReplayTiming.FAST else Settings.INPUT_DEBOUNCE_SECONDS
+    )
+    stats = CycleStats(latencies=deque[float](maxlen=max_cycles))
+    started_at = time.monotonic()
+    while stats.cycles + stats.failures < max_cycles:
+        start = time.monotonic()
+        try:
+            bot_runner.run_bot()
+        except Exception as e:
+            # An exhausted session surfaces wrapped by the controller
+            if _is_exhausted(e):
+                break
+            stats.failures += 1
+            continue
+        stats.record(time.monotonic() - start)
+    return stats, time.monotonic() - started_at
+
+def _is_exhausted(error: Optional[BaseException]) -> bool:
+    while error is not None:
+        if isinstance(error, ReplaySessionExhaustedError):
+            return True
+        error = error.__cause__
+    return False
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure BotRunner throughput on a recorded adb session.")
+    parser.add_argument("session", type=Path, help="session dir written by RecordingAdbDeviceClient")
+    parser.add_argument("--timing", choices=[t.name.lower() for t in ReplayTiming], default="fast")
+    parser.add_argument("--latency", type=float, default=0.0, help="synthetic latency per adb call (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="synthetic uniform jitter per adb call (seconds)")
+    parser.add_argument("--cycles", type=int, default=1000, help="max cycles")
+    parser.add_argument("--loop", action="store_true", help="restart the session when exhausted")
+    parser.add_argument("--output", type=Path, default=None, help="result JSON (default: timestamped in TEMP_DIR/benchmarks)")
+    args = parser.parse_args(argv)
+
+    timing = ReplayTiming[args.timing.upper()]
+    adb_device_client = ReplayAdbDeviceClient(
+        args.session, timing=timing, synthetic_latency=args.latency, jitter=args.jitter, loop=args.loop, seed=0
+    )
+    stats, elapsed = run_replay(adb_device_client, args.cycles)
+    result = ReplayBenchResult(
+        session=str(args.session),
+        timing=timing.name,
+        cycles=stats.cycles,
+        failures=stats.failures,
+        cycles_per_second=stats.cycles / elapsed if elapsed > 0 else 0.0,
+        p50_ms=stats.latency_percentile(50) * 1000,
+        p95_ms=stats.latency_percentile(95) * 1000,
+        p99_ms=stats.latency_percentile(99) * 1000,
+        max_ms=stats.latency_percentile(100) * 1000,
+        unmatched_commands=adb_device_client.unmatched_commands,
+    )
+    console.print(
+        f"[pink3]{result.cycles} cycles ({result.failures} failed) {result.cycles_per_second:.1f}/s[/pink3] "
+        f"p50={result.p50_ms:.1f}ms p95={result.p95_ms:.1f}ms p99={result.p99_ms:.1f}ms max={result.max_ms:.1f}ms "
+        f"unmatched commands={result.unmatched_commands}"
+    )
+
+    output = args.output
+    if output is None:
+        BENCHMARK_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = BENCHMARK_RESULTS_DIR / f"replay_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(asdict(result), f, indent=2)
+    console.print(f"[green]Results written to {output}[/green]")
+
+
+if __name__ == "__main__":
+    main()
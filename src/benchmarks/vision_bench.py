@@ -0,0 +1,276 @@
+"""
+Offline benchmark of the vision hot paths over a recorded screenshot corpus.
+
+Corpus layout: <corpus>/<GamePageState name>/*.png (1920x1080 captures).
+Run from src/:
+
+    python -m benchmarks.vision_bench [--corpus DIR] [--repeat N] [--only SUBSTR] [--compare OLD.json]
+
+Every case runs on every frame: latency percentiles come from untraced runs,
+allocations per call from a separate tracemalloc pass. Results are written as JSON
+(TEMP_DIR/benchmarks by default) to compare across commits.
+"""
+from __future__ import annotations
+import argparse
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import json
+from pathlib import Path
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from config.paths import BENCHMARK_CORPUS_DIR, BENCHMARK_RESULTS_DIR, GLYPHS_DIR, PROJECT_ROOT_DIR
+from config.settings import Settings
+
+import vision.preprocessing as vision_pre
+import vision.recognition as vision_rec
+import vision.extraction as vision_ext
+import vision.ocr as vision_ocr
+from vision.change_detection import FrameChangeDetector, compute_fingerprint
+from vision.filter_column import FilterColumnLayoutDetector
+from vision.layout import get_scaled_layout
+from vision.pixel_probes import get_default_page_probe_rules
+from vision.templates import get_default_template_bank
+from bot.bot_runner import GamePageState
+
+from logger.console import console
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class VisionBenchError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class BenchFrame:
+    page: str
+    path: Path
+    image: NDArray[np.uint8]
+    raw: bytes  # the frame as a raw `screencap` buffer (16 byte header + RGBA)
+
+@dataclass(frozen=True, slots=True)
+class BenchCase:
+    name: str
+    fn: Callable[[BenchFrame], Any]
+
+@dataclass
+class CaseResult:
+    name: str
+    calls: int = 0
+    errors: int = 0  # calls that raised (e.g. widget absent on that page) - still timed
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    mean_ms: float = 0.0
+    peak_alloc_bytes: float = 0.0  # mean per call of the traced peak above the baseline
+    per_page_p50_ms: dict[str, float] = field(default_factory=dict)
+
+
+def frame_to_raw_screencap(cv_img: NDArray[np.uint8]) -> bytes:
+    height, width = cv_img.shape[:2]
+    header = np.array([width, height, 1, 0], dtype="<u4").tobytes()
+    return header + cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGBA).tobytes()
+
+def load_corpus(corpus_dir: Path) -> list[BenchFrame]:
+    if not corpus_dir.is_dir():
+        raise VisionBenchError(f"Screenshot corpus not found at {corpus_dir}.")
+    known_pages = {page.name for page in GamePageState}
+    frames: list[BenchFrame] = []
+    for page_dir in sorted(p for p in corpus_dir.iterdir() if p.is_dir()):
+        if page_dir.name not in known_pages:
+            logger.warning(f"Corpus dir {page_dir.name} is not a GamePageState - benchmarked anyway.")
+        for path in sorted(page_dir.glob("*.png")):
+            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if image is None:
+                logger.warning(f"Skipped unreadable capture {path}.")
+                continue
+            image = image.astype(np.uint8)
+            frames.append(BenchFrame(page_dir.name, path, image, frame_to_raw_screencap(image)))
+    if not frames:
+        raise VisionBenchError(f"No captures in {corpus_dir} - expected <PAGE_STATE>/*.png.")
+    missing = known_pages - {frame.page for frame in frames}
+    if missing:
+        console.print(f"[yellow]No captures for pages: {', '.join(sorted(missing))}[/yellow]")
+    return frames
+
+
+def crop_filter_icons(frame: BenchFrame) -> list[NDArray[np.uint8]]:
+    try:
+        icon_imgs, _ = vision_ext.extract_filter_column_img_and_icon_ctr_coor(frame.image, FilterColumnLayoutDetector())
+        return icon_imgs
+    except vision_ext.ExtractionError:
+        # No filter column on this page
+        return []
+
+def build_cases(frames: list[BenchFrame]) -> list[BenchCase]:
+    """Every recognizer / extractor on its cold path - caches are reset or bypassed per call."""
+    # Inputs of the per-icon classifier, located once up front so only the classifier is timed
+    icon_crops = {frame.path: crop_filter_icons(frame) for frame in frames}
+    probe_rules = get_default_page_probe_rules()
+    template_bank = get_default_template_bank()
+    glyph_bank = vision_ocr.GlyphBank(GLYPHS_DIR)
+    screenshot_buffer: list[Optional[NDArray[np.uint8]]] = [None]
+
+    def process_raw_screencap(frame: BenchFrame):
+        screenshot_buffer[0] = vision_pre.process_raw_screencap(frame.raw, dst=screenshot_buffer[0])
+
+    def change_detector_update(frame: BenchFrame):
+        detector = FrameChangeDetector()
+        detector.update(frame.image)
+        return [detector.changed(region) for region in detector.regions.values()]
+
+    def filter_column_layout_cold(frame: BenchFrame):
+        detector = FilterColumnLayoutDetector()
+        return detector.detect(frame.image)
+
+    def read_airport_counters_cold(frame: BenchFrame):
+        # Fresh reader: no ROI cache, the glyph bank (and what tesseract added to it) is shared
+        return vision_ocr.read_airport_counters(frame.image, vision_ocr.DigitReader(glyph_bank))
+
+    def classify_filter_icons(frame: BenchFrame):
+        return [vision_rec.classify_is_filter_icon_clicked(icon_img) for icon_img in icon_crops[frame.path]]
+
+    def downscale_half(frame: BenchFrame):
+        height, width = frame.image.shape[:2]
+        return get_scaled_layout(width, height, 0.5).resize(frame.image)
+
+    return [
+        BenchCase("preprocessing.process_raw_screencap", process_raw_screencap),
+        BenchCase("preprocessing.crop_image[plane_filter]", lambda f: vision_pre.crop_image(f.image, Settings.PLANE_FILTER_REGION).copy()),
+        BenchCase("layout.resize[0.5]", downscale_half),
+        BenchCase("change_detection.compute_fingerprint[frame]", lambda f: compute_fingerprint(f.image, 32)),
+        BenchCase("change_detection.FrameChangeDetector[all regions]", change_detector_update),
+        BenchCase("pixel_probes.classify", lambda f: probe_rules.classify(f.image)),
+        BenchCase("templates.match_all", lambda f: template_bank.match_all(f.image)),
+        BenchCase(
+            "recognition.recognise_filter_icon_circles",
+            lambda f: vision_rec.recognise_filter_icon_circles(vision_pre.crop_image(f.image, Settings.PLANE_FILTER_REGION))
+        ),
+        BenchCase("extraction.classify_is_ramp_agent_toggle_switch_on", lambda f: vision_ext.classify_is_ramp_agent_toggle_switch_on(f.image)),
+        BenchCase("filter_column.FilterColumnLayoutDetector.detect[cold]", filter_column_layout_cold),
+        BenchCase("extraction.extract_filter_column_img_and_icon_ctr_coor", lambda f: vision_ext.extract_filter_column_img_and_icon_ctr_coor(f.image, FilterColumnLayoutDetector())),
+        BenchCase("recognition.classify_is_filter_icon_clicked[all icons]", classify_filter_icons),
+        BenchCase("ocr.read_airport_counters[cold]", read_airport_counters_cold),
+    ]
+
+
+def _call(case: BenchCase, frame: BenchFrame) -> bool:
+    """Run one call, True if it raised."""
+    try:
+        case.fn(frame)
+        return False
+    except Exception:
+        return True
+
+def run_case(case: BenchCase, frames: list[BenchFrame], repeat: int, warmup: int) -> CaseResult:
+    result = CaseResult(case.name)
+    for frame in frames[:warmup]:
+        _call(case, frame)
+
+    latencies: list[float] = []
+    latencies_by_page: dict[str, list[float]] = {}
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            result.errors += _call(case, frame)
+            latency = time.perf_counter() - start
+            latencies.append(latency)
+            latencies_by_page.setdefault(frame.page, []).append(latency)
+    result.calls = len(latencies)
+
+    # Allocations: one traced pass, peak above the pre-call baseline per call
+    peaks: list[int] = []
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            _call(case, frame)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    result.p50_ms, result.p95_ms, result.p99_ms = (float(v) for v in np.percentile(latencies_ms, [50, 95, 99]))
+    result.mean_ms = float(latencies_ms.mean())
+    result.peak_alloc_bytes = float(np.mean(peaks))
+    result.per_page_p50_ms = {
+        page: float(np.percentile(np.array(page_latencies) * 1000, 50))
+        for page, page_latencies in latencies_by_page.items()
+    }
+    return result
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def print_results(results: list[CaseResult], baseline: Optional[dict[str, dict[str, Any]]] = None):
+    for result in results:
+        line = (
+            f"{result.name:<58} p50={result.p50_ms:8.3f}ms p95={result.p95_ms:8.3f}ms "
+            f"p99={result.p99_ms:8.3f}ms alloc={result.peak_alloc_bytes / 1024:9.1f}KiB"
+        )
+        if result.errors:
+            line += f" errors={result.errors}/{result.calls}"
+        previous = (baseline or {}).get(result.name)
+        if previous and previous.get("p50_ms"):
+            change = 100 * (result.p50_ms - previous["p50_ms"]) / previous["p50_ms"]
+            colour = "red" if change > 10 else "green" if change < -10 else "white"
+            line += f" [{colour}]{change:+.1f}% p50[/{colour}]"
+        console.print(line)
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the vision hot paths over a screenshot corpus.")
+    parser.add_argument("--corpus", type=Path, default=BENCHMARK_CORPUS_DIR, help="<PAGE_STATE>/*.png captures")
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over the corpus per case")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed calls per case first")
+    parser.add_argument("--only", default="", help="run cases whose name contains this")
+    parser.add_argument("--output", type=Path, default=None, help="result JSON (default: timestamped in TEMP_DIR/benchmarks)")
+    parser.add_argument("--compare", type=Path, default=None, help="previous result JSON to diff p50 against")
+    args = parser.parse_args(argv)
+
+    frames = load_corpus(args.corpus)
+    cases = [case for case in build_cases(frames) if args.only in case.name]
+    console.print(f"[pink3]Benchmarking {len(cases)} cases on {len(frames)} captures x {args.repeat}.[/pink3]")
+    results = [run_case(case, frames, args.repeat, args.warmup) for case in cases]
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {result["name"]: result for result in json.load(f)["results"]}
+    print_results(results, baseline)
+
+    output = args.output
+    if output is None:
+        BENCHMARK_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = BENCHMARK_RESULTS_DIR / f"vision_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": get_git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "corpus": str(args.corpus),
+            "frames_per_page": {page: sum(frame.page == page for frame in frames) for page in sorted({f.page for f in frames})},
+            "repeat": args.repeat,
+            "results": [asdict(result) for result in results],
+        }, f, indent=2)
+    console.print(f"[green]Results written to {output}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Optional, Union
+
+from core.point import Point
+from adb.input_batch import InputBatch
+from adb.interfaces.i_adb_controller import IAdbController
+from adb.interfaces.i_async_adb_controller import IAsyncAdbController
+from adb.screen_change import ScreenChangeCondition, SettleResult
+from config.settings import Settings
+
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class ActionQueueError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class TapAction:
+    pt: Point
+    count: int = 1
+    screen: str = ""
+    confirm: Optional[ScreenChangeCondition] = None
+
+@dataclass(frozen=True, slots=True)
+class SwipeAction:
+    start_pt: Point
+    end_pt: Point
+    duration: int = 500
+    screen: str = ""
+    confirm: Optional[ScreenChangeCondition] = None
+
+@dataclass(frozen=True, slots=True)
+class WaitAction:
+    seconds: float
+    screen: str = ""
+
+Action = Union[TapAction, SwipeAction, WaitAction]
+
+
+@dataclass(frozen=True, slots=True)
+class InputDispatch:
+    """One adb round trip: confirmed by a screen change if confirm is set, else followed by the flush debounce."""
+    batch: InputBatch
+    confirm: Optional[ScreenChangeCondition]
+    actions: int
+
+
+@dataclass
+class ActionQueueStats:
+    requested: int = 0  # actions enqueued
+    coalesced: int = 0  # dropped as no-op / duplicate or merged into another action
+    dispatched: int = 0  # actions sent after coalescing
+    round_trips: int = 0  # adb calls used to send them
+    skipped: int = 0  # not sent because an earlier confirmation failed
+
+
+class ActionQueue:
+    """
+    Collects the actions of a cycle in front of the AdbController and dispatches them at flush().
+
+    - no-ops are dropped (toggle already in the wanted state, duplicate toggles),
+    - adjacent taps on the same point (same screen) are merged into one counted tap,
+    - between barriers, actions are grouped by the screen they act on (first-seen order,
+      stable within a screen), so the cycle moves through each screen once. Actions are
+      never moved across a barrier() - queue one after every causally dependent sequence,
+    - a confirmed action (confirm_with) is a barrier and ends its adb round trip; the rest
+      is sent after its screen change, or dropped if the screen never changed.
+    """
+    def __init__(self, adb_controller: IAdbController, debounce: float = Settings.INPUT_DEBOUNCE_SECONDS):
+        self.adb_controller = adb_controller
+        # Wait after each unconfirmed round trip (0 for replays that don't need the game to react)
+        self.debounce = debounce
+        self.stats = ActionQueueStats()  # current cycle, reset by flush()
+        self.last_cycle_stats = ActionQueueStats()
+        self._segments: list[list[Action]] = [[]]
+        self._toggled: set[Point] = set()
+        # The last requested action was coalesced away - there is nothing to confirm
+        self._last_dropped = False
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    def tap(self, pt: Point, count: int = 1, screen: str = "") -> ActionQueue:
+        return self._append(TapAction(pt, count, screen))
+
+    def toggle(self, pt: Point, is_on: bool, want_on: bool = True, screen: str = "") -> ActionQueue:
+        """Tap a toggle at pt only if it is not already in the wanted state (and not toggled yet this cycle)."""
+        if is_on == want_on or pt in self._toggled:
+            self.stats.requested += 1
+            self.stats.coalesced += 1
+            self._last_dropped = True
+            return self
+        self._toggled.add(pt)
+        return self._append(TapAction(pt, 1, screen))
+
+    def swipe(self, start_pt: Point, end_pt: Point, duration: int = 500, screen: str = "") -> ActionQueue:
+        return self._append(SwipeAction(start_pt, end_pt, duration, screen))
+
+    def wait(self, seconds: float, screen: str = "") -> ActionQueue:
+        return self._append(WaitAction(seconds, screen))
+
+    def barrier(self) -> ActionQueue:
+        """Keep every action queued after this behind every action queued before it."""
+        if self._segments[-1]:
+            self._segments.append([])
+        return self
+
+    def confirm_with(self, condition: ScreenChangeCondition) -> ActionQueue:
+        """
+        Confirm the last queued tap / swipe by a screen change (see AdbController) instead of a
+        fixed debounce. Later actions wait for the confirmation (implicit barrier).
+        Actions and waits queued before it are sent first; the baseline and the timeout start
+        at the confirmed action, so their duration does not eat into condition.timeout.
+        """
+        if self._last_dropped:
+            # The action was a no-op, so no screen change would follow
+            return self.barrier()
+        segment = self._segments[-1]
+        last = segment[-1] if segment else None
+        if last is None or isinstance(last, WaitAction):
+            raise ActionQueueError("confirm_with() must follow a queued tap or swipe.")
+        if last.confirm is not None:
+            raise ActionQueueError(f"{last} is already confirmed.")
+        segment[-1] = replace(last, confirm=condition)
+        return self.barrier()
+
+    def clear(self):
+        """Drop pending actions without dispatching them."""
+        self._segments = [[]]
+        self._toggled.clear()
+        self._last_dropped = False
+        self.stats = ActionQueueStats()
+
+    def _append(self, action: Action) -> ActionQueue:
+        self.stats.requested += 1
+        self._segments[-1].append(action)
+        self._last_dropped = False
+        return self
+
+    def _coalesce_segment(self, segment: list[Action]) -> list[Action]:
+        """Group a segment by screen, merging adjacent same-point taps / waits within each screen."""
+        screens: dict[str, list[Action]] = {}
+        for action in segment:
+            screens.setdefault(action.screen, []).append(action)
+        last = segment[-1] if segment else None
+        if last is not None and not isinstance(last, WaitAction) and last.confirm is not None:
+            # The confirmed action closes the segment - its group is moved last to keep it there
+            screens[last.screen] = screens.pop(last.screen)
+
+        coalesced: list[Action] = []
+        for actions in screens.values():
+            previous: Optional[Action] = None
+            for action in actions:
+                if (
+                    isinstance(action, TapAction) and isinstance(previous, TapAction)
+                    and previous.pt == action.pt and previous.confirm is None
+                ):
+                    previous = coalesced[-1] = replace(action, count=previous.count + action.count)
+                    self.stats.coalesced += 1
+                    continue
+                if isinstance(action, WaitAction) and isinstance(previous, WaitAction):
+                    previous = coalesced[-1] = WaitAction(previous.seconds + action.seconds, action.screen)
+                    self.stats.coalesced += 1
+                    continue
+                coalesced.append(action)
+                previous = action
+        return coalesced
+
+    def take_dispatches(self) -> list[InputDispatch]:
+        """Coalesce the pending actions into round trips (one per confirmed action, plus the rest) and reset the queue."""
+        try:
+            actions = [action for segment in self._segments for action in self._coalesce_segment(segment)]
+            # Trailing waits are covered by the dispatch debounce
+            while actions and isinstance(actions[-1], WaitAction):
+                actions.pop()
+                self.stats.coalesced += 1
+
+            dispatches: list[InputDispatch] = []
+            batch, count = InputBatch(), 0
+            for action in actions:
+                match action:
+                    case TapAction(pt=pt, count=clicks):
+                        batch.tap(pt, number_of_clicks=clicks)
+                    case SwipeAction(start_pt=start_pt, end_pt=end_pt, duration=duration):
+                        batch.swipe(start_pt, end_pt, duration)
+                    case WaitAction(seconds=seconds):
+                        batch.wait(seconds)
+                count += 1
+                confirm = None if isinstance(action, WaitAction) else action.confirm
+                if confirm is not None:
+                    dispatches.append(InputDispatch(batch, confirm, count))
+                    batch, count = InputBatch(), 0
+            if count:
+                dispatches.append(InputDispatch(batch, None, count))
+            self.stats.dispatched = len(actions)
+            self.stats.round_trips = len(dispatches)
+            return dispatches
+        finally:
+            stats = self.stats
+            self.clear()
+            self.last_cycle_stats = stats
+
+    def flush(self, debounce: Optional[float] = None) -> list[SettleResult]:
+        """Dispatch the cycle's actions and reset the queue, return the confirmations."""
+        debounce = self.debounce if debounce is None else debounce
+        dispatches = self.take_dispatches()
+        results: list[SettleResult] = []
+        try:
+            for i, dispatch in enumerate(dispatches):
+                result = self.adb_controller.run_input_batch(dispatch.batch, debounce=debounce, confirm=dispatch.confirm)
+                if result is not None:
+                    results.append(result)
+                    if not result.settled:
+                        self._skip(dispatches[i + 1:])
+                        break
+        except Exception as e:
+            raise ActionQueueError("Failed to dispatch queued actions.") from e
+        logger.info(f"Action queue cycle stats: {self.last_cycle_stats}")
+        return results
+
+    async def flush_async(self, adb_controller: IAsyncAdbController, debounce: Optional[float] = None) -> list[SettleResult]:
+        """flush() through an async controller - debounce waits don't block a thread."""
+        debounce = self.debounce if debounce is None else debounce
+        dispatches = self.take_dispatches()
+        results: list[SettleResult] = []
+        try:
+            for i, dispatch in enumerate(dispatches):
+                result = await adb_controller.run_input_batch(dispatch.batch, debounce=debounce, confirm=dispatch.confirm)
+                if result is not None:
+                    results.append(result)
+                    if not result.settled:
+                        self._skip(dispatches[i + 1:])
+                        break
+        except Exception as e:
+            raise ActionQueueError("Failed to dispatch queued actions.") from e
+        logger.info(f"Action queue cycle stats: {self.last_cycle_stats}")
+        return results
+
+    def _skip(self, dispatches: list[InputDispatch]):
+        # Later actions depend on the unconfirmed one
+        skipped = sum(dispatch.actions for dispatch in dispatches)
+        if skipped:
+            self.last_cycle_stats.skipped += skipped
+            logger.warning(f"Input was not confirmed - {skipped} dependent actions not sent.")
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+import time
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
+
+from adb.interfaces.i_async_adb_device_client import IAsyncAdbDeviceClient
+from adb.interfaces.i_async_adb_controller import IAsyncAdbController
+from adb.adb_device_client import AdbDeviceClientConnectionTimeoutError
+
+from bot.bot_runner import BotRunner
+from config.settings import Settings
+
+from logger.console import console
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+# Weight of the newest sample in the capture latency moving average
+CAPTURE_LATENCY_EMA_ALPHA = 0.2
+
+
+@dataclass
+class CycleStats:
+    cycles: int = 0
+    failures: int = 0
+    # Prefetched frames dropped because they were captured before the previous cycle's input settled
+    stale_captures: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    # Most recent cycle latencies (seconds), capture excluded
+    latencies: deque[float] = field(default_factory=lambda: deque[float](maxlen=512))
+
+    def record(self, latency: float):
+        self.cycles += 1
+        self.latencies.append(latency)
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), percentile))
+
+    def cycles_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return 60.0 * self.cycles / elapsed if elapsed > 0 else 0.0
+
+
+class AsyncBotLoop:
+    """
+    Pipelined bot loop: the capture of frame N+1 runs while frame N is still being recognised.
+
+    Cycles are paced start-to-start by BotRunner.get_cycle_seconds(). The next capture is
+    scheduled to complete right when the next cycle starts (using a moving average of the
+    capture latency). A prefetched frame whose capture started before the previous cycle's
+    input settled may not show that input, so it is dropped and captured again.
+    Recognition (BotRunner.plan_cycle) runs in vision_executor; the queued actions are sent
+    through the async controller - adb round trips and settle polls in its executor, debounces
+    as asyncio sleeps.
+    """
+    def __init__(
+        self,
+        adb_device_client: IAsyncAdbDeviceClient,
+        adb_controller: IAsyncAdbController,
+        bot_runner: BotRunner,
+        vision_executor: Optional[Executor] = None,
+        name: str = ""
+    ):
+        self.name = name
+        self.adb_device_client = adb_device_client
+        self.adb_controller = adb_controller
+        self.bot_runner = bot_runner
+        self.vision_executor = vision_executor
+        self.capture_latency = 0.0
+        self.stats = CycleStats()
+
+    async def capture_at(self, deadline: float) -> tuple[float, NDArray[np.uint8]]:
+        """
+        Capture a frame, starting late enough for it to complete around deadline (time.monotonic).
+        Returns (capture start, frame).
+        """
+        wait = deadline - time.monotonic() - self.capture_latency
+        if wait > 0:
+            await asyncio.sleep(wait)
+        start = time.monotonic()
+        screenshot = await self.adb_controller.get_screenshot()
+        latency = time.monotonic() - start
+        self.capture_latency += CAPTURE_LATENCY_EMA_ALPHA * (latency - self.capture_latency)
+        return start, screenshot
+
+    async def run_cycle(self, screenshot: NDArray[np.uint8]):
+        """Recognise screenshot in vision_executor, then dispatch the cycle's actions without blocking a thread on debounces."""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        started_at = await loop.run_in_executor(self.vision_executor, self.bot_runner.plan_cycle, screenshot)
+        try:
+            await self.bot_runner.bot_service.action_queue.flush_async(self.adb_controller)
+        except Exception:
+            # The screen may have moved on while the cycle failed
+            self.bot_runner.state_tracker.invalidate()
+            raise
+        finally:
+            self.bot_runner.finish_cycle(started_at)
+        self.stats.record(time.monotonic() - start)
+
+    async def run_pipeline(self):
+        """Run cycles until an error is raised."""
+        await self.adb_device_client.maintain_connection()
+        next_capture = asyncio.create_task(self.capture_at(time.monotonic()))
+        cycle_seconds = Settings.CYCLE_SECONDS
+        try:
+            while True:
+                cycle_start = time.monotonic()
+                captured_at, screenshot = await next_capture
+                if captured_at < self.adb_controller.last_settled_at:
+                    # Prefetched while the previous cycle's input was still in flight
+                    self.stats.stale_captures += 1
+                    _, screenshot = await self.capture_at(time.monotonic())
+                # Prefetch the next frame while this one is recognised
+                next_capture = asyncio.create_task(self.capture_at(cycle_start + cycle_seconds))
+                await self.run_cycle(screenshot)
+                cycle_seconds = self.bot_runner.get_cycle_seconds()
+        finally:
+            next_capture.cancel()
+
+    async def run(self):
+        """Run forever, waiting and retrying on connection loss like main.main_loop."""
+        was_connected = True
+        while True:
+            try:
+                if not was_connected:
+                    logger.info(f"{self.name} Connection stable - reconnected.")
+                    console.print(f"[green]{self.name} Reconnected![/green]")
+                    was_connected = True
+                    # Nothing seen while disconnected can be trusted
+                    self.bot_runner.state_tracker.invalidate()
+                await self.run_pipeline()
+            except AdbDeviceClientConnectionTimeoutError as e:
+                self.stats.failures += 1
+                logger.warning(e)
+            except Exception:
+                self.stats.failures += 1
+                logger.error(f"{self.name} Unexpected error in async bot loop:", exc_info=True)
+
+            if was_connected:
+                logger.warning(f"{self.name} Connection lost.")
+                console.print(f"[red]{self.name} Connection lost![/red]")
+                was_connected = False
+
+            console.print(f"[red]{self.name} Retrying in {Settings.CYCLE_SECONDS} seconds...[/red]")
+            await asyncio.sleep(Settings.CYCLE_SECONDS)
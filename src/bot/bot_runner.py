@@ -1,11 +1,25 @@
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
 from adb.interfaces.i_adb_controller import IAdbController
 # from adb.interfaces.i_adb_device_client import IAdbDeviceClient
 
 from bot.bot_service import BotService
+from bot.state_tracker import StalenessBudget, StateTracker
+from config.settings import Settings
+from config.paths import TEMPLATES_DIR
+from vision.change_detection import FrameChangeDetector
+from vision.memo import FrameMemo
+from vision.frame_ring_buffer import FrameRingBuffer
+from vision.templates import get_default_template_bank
+from vision.pixel_probes import get_default_page_probe_rules
 
+from logger.console import console
 from logger.logger import setup_logger, logging
+from logger.metrics import metrics
+from logger.profiler import SlowCycleProfiler
 logger = setup_logger(__name__, level=logging.ERROR)
 
 class GamePageState(Enum):
@@ -55,6 +69,39 @@ class FilterTags(Enum):
     OVERTIME = auto()
     FAVOURITE = auto()
 
+# Labels allowed in config/page_probes.json
+PAGE_PROBE_LABELS = tuple(GamePageState.__members__)
+
+# Template (Settings.TEMPLATE_SEARCH_REGIONS) identifying each page, in matching order
+PAGE_TEMPLATE_NAMES: dict[GamePageState, str] = {
+    GamePageState.LOADING: "page_loading",
+    GamePageState.CLAIM_REWARDS: "page_claim_rewards",
+    GamePageState.SHOP: "page_shop",
+    GamePageState.AIRPORT: "page_airport",
+    GamePageState.AIRPORT_SELECTION: "page_airport_selection",
+    GamePageState.GAME_LOGIN: "page_game_login",
+    GamePageState.PHONE_MAIN: "page_phone_main",
+}
+
+# GameState fields tracked by BotRunner.state_tracker
+PAGE_FIELD = "current_page"
+AIRPORT_COUNTERS_FIELD = "airport_counters"
+
+def get_default_staleness_budgets() -> dict[str, StalenessBudget]:
+    return {
+        # Any change of the frame may be a page change - the probes make re-checking cheap
+        PAGE_FIELD: StalenessBudget(Settings.PAGE_MAX_AGE_SECONDS),
+        AIRPORT_COUNTERS_FIELD: StalenessBudget(
+            Settings.AIRPORT_COUNTERS_MAX_AGE_SECONDS,
+            (
+                Settings.AIRPORT_WORKERS_REGION,
+                Settings.AIRPORT_GOLD_REGION,
+                Settings.AIRPORT_SILVER_REGION,
+                Settings.AIRPORT_CURRENCY_REGION,
+            )
+        ),
+    }
+
 @dataclass
 class FilterState:
     expanded: bool = False
@@ -81,70 +128,199 @@ class GameState:
 
 
 class BotRunner():
-    def __init__(self, adb_controller: IAdbController):
+    """
+    Long-lived runner: GameState persists across cycles and is updated incrementally -
+    each cycle only re-reads the fields the state tracker reports as stale.
+    """
+    def __init__(
+        self,
+        adb_controller: IAdbController,
+        change_detector: Optional[FrameChangeDetector] = None,
+        frame_memo: Optional[FrameMemo] = None,
+        frame_source: Optional[FrameRingBuffer] = None,
+        profiler: Optional[SlowCycleProfiler] = None,
+        input_debounce: float = Settings.INPUT_DEBOUNCE_SECONDS
+    ):
         self.adb_controller = adb_controller
-        self.bot_service = BotService(adb_controller)
+        self.profiler = profiler
+        self.bot_service = BotService(
+            adb_controller,
+            change_detector=change_detector,
+            frame_memo=frame_memo,
+            frame_source=frame_source,
+            input_debounce=input_debounce
+        )
+        # Per device - the banks cache per-layout data and must not be shared between threads
+        self.page_probe_rules = get_default_page_probe_rules(PAGE_PROBE_LABELS)
+        self.template_bank = get_default_template_bank()
+        missing_templates = [name for name in PAGE_TEMPLATE_NAMES.values() if name not in self.template_bank]
+        if missing_templates:
+            message = f"No page templates for {', '.join(missing_templates)} in {TEMPLATES_DIR} - only page probes recognise these pages."
+            logger.warning(message)
+            console.print(f"[yellow]{message}[/yellow]")
+        self._warned_page_placeholder = False
         self.game_state = GameState()
+        self.state_tracker = StateTracker(self.bot_service.change_detector, get_default_staleness_budgets())
+
+    @metrics.timed()
+    def run_bot(self, screenshot: Optional[NDArray[np.uint8]] = None):
+        """Run one cycle on screenshot, or on a freshly captured one if not given."""
+        started_at = self.plan_cycle(screenshot)
+        try:
+            # Send the cycle's actions together
+            self.bot_service.dispatch_actions()
+        except Exception:
+            # The screen may have moved on while the cycle failed
+            self.state_tracker.invalidate()
+            raise
+        finally:
+            self.finish_cycle(started_at)
+
+    @metrics.timed()
+    def plan_cycle(self, screenshot: Optional[NDArray[np.uint8]] = None) -> float:
+        """
+        Recognition half of a cycle: update the GameState and queue the actions, without sending them.
+        Returns the cycle start to pass to finish_cycle() once the actions were dispatched.
+        """
+        started_at = self.profiler.cycle_started() if self.profiler is not None else 0.0
+        try:
+            # Capture the frame for this cycle
+            if screenshot is None:
+                self.bot_service.update_screenshot()
+            else:
+                self.bot_service.use_screenshot(screenshot)
+
+            # Check current game page
+            self.update_current_game_page()
+
+            match self.game_state.current_page:
+                case GamePageState.AIRPORT:
+                    self.handle_game_page_airport()
+                case GamePageState.CLAIM_REWARDS:
+                    self.handle_game_page_claim_rewards()
+                case GamePageState.SHOP:
+                    self.handle_game_page_shop()
+                case GamePageState.PHONE_MAIN:
+                    self.handle_game_page_phone_main()
+                case GamePageState.LOADING:
+                    self.handle_game_page_loading()
+                case GamePageState.GAME_LOGIN:
+                    self.handle_game_page_game_login()
+                case GamePageState.AIRPORT_SELECTION:
+                    self.handle_game_page_airport_selection()
+                case GamePageState.UNKNOWN:
+                    self.handle_game_page_unknown()
+        except Exception:
+            self.state_tracker.invalidate()
+            self.finish_cycle(started_at)
+            raise
+        return started_at
 
-    def run_bot(self):
-        # Check current game page
-        self.game_state.current_page = self.check_current_game_page()
-
-        match self.game_state.current_page:
-            case GamePageState.AIRPORT:
-                self.handle_game_page_airport()
-            case GamePageState.CLAIM_REWARDS:
-                self.handle_game_page_claim_rewards()
-            case GamePageState.SHOP:
-                self.handle_game_page_shop()
-            case GamePageState.PHONE_MAIN:
-                self.handle_game_page_phone_main()
-            case GamePageState.LOADING:
-                self.handle_game_page_loading()
-            case GamePageState.GAME_LOGIN:
-                self.handle_game_page_game_login()
-            case GamePageState.AIRPORT_SELECTION:
-                self.handle_game_page_airport_selection()
-            case GamePageState.UNKNOWN:
-                self.handle_game_page_unknown()
+    def finish_cycle(self, started_at: float):
+        """End the cycle: drop actions left by a failure and release the frame."""
+        # Before the frame is released - its buffer may be reused
+        if self.profiler is not None:
+            self.profiler.cycle_finished(started_at, self.bot_service.latest_screenshot)
+        self.bot_service.action_queue.clear()
+        self.bot_service.release_frame()
 
+    def get_cycle_seconds(self) -> float:
+        """Base cycle time, doubled for every consecutive static frame up to the max."""
+        change_detector = self.bot_service.change_detector
+        if not change_detector.is_static():
+            return Settings.CYCLE_SECONDS
+        backoff = Settings.CYCLE_SECONDS * 2 ** min(change_detector.static_frames, 8)
+        return min(backoff, Settings.STATIC_SCREEN_MAX_CYCLE_SECONDS)
+
+    @metrics.timed()
+    def update_current_game_page(self):
+        """Re-classify the page if stale. A new page invalidates every other field."""
+        if not self.state_tracker.is_stale(PAGE_FIELD):
+            return
+        page = self.check_current_game_page()
+        if page != self.game_state.current_page:
+            self.state_tracker.invalidate()
+            self.game_state.current_page = page
+        self.state_tracker.mark_verified(PAGE_FIELD)
+
+    @metrics.timed()
     def check_current_game_page(self) -> GamePageState:
-        # Placeholder for game page checking
-        # TODO
-        return GamePageState.AIRPORT
+        """
+        Classify the page of the latest screenshot.
+        Pixel probes (one gather, microseconds) run first, template matching only if no probe rule matched.
+        """
+        screenshot = self.bot_service.latest_screenshot
+        if screenshot is None:
+            return GamePageState.UNKNOWN
+
+        probe_rules = self.page_probe_rules
+        page_name = probe_rules.classify(screenshot)
+        if page_name is not None:
+            return GamePageState[page_name]
+
+        template_bank = self.template_bank
+        if not any(name in template_bank for name in PAGE_TEMPLATE_NAMES.values()):
+            if len(probe_rules) == 0:
+                # Placeholder until page probes / templates are captured
+                if not self._warned_page_placeholder:
+                    message = "No page probe rules or page templates - every frame is taken for the AIRPORT page."
+                    logger.warning(message)
+                    console.print(f"[yellow]{message}[/yellow]")
+                    self._warned_page_placeholder = True
+                return GamePageState.AIRPORT
+            return GamePageState.UNKNOWN
+
+        page_by_template = {name: page for page, name in PAGE_TEMPLATE_NAMES.items()}
+        match = template_bank.match_first(screenshot, PAGE_TEMPLATE_NAMES.values())
+        if match is None:
+            return GamePageState.UNKNOWN
+        return page_by_template[match.name]
 
     # -------------------------------
     #             HANDLERS
     # -------------------------------
 
+    @metrics.timed()
     def handle_game_page_airport(self):
+        if Settings.AIRPORT_COUNTERS_OCR_ENABLED and self.state_tracker.is_stale(AIRPORT_COUNTERS_FIELD):
+            self.bot_service.update_airport_counters(self.game_state.airport_state)
+            self.state_tracker.mark_verified(AIRPORT_COUNTERS_FIELD)
         # TODO
-        pass
+        # Plane list: bot_service.scan_plane_list() once a plane card recogniser exists, recognising
+        # each card through bot_service.decode_plane_card() and skipping planes for which
+        # bot_service.is_plane_recently_handled() (mark_plane_handled() after acting on one)
 
+    @metrics.timed()
     def handle_game_page_claim_rewards(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_shop(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_phone_main(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_loading(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_game_login(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_airport_selection(self):
         # TODO
         pass
 
+    @metrics.timed()
     def handle_game_page_unknown(self):
         # TODO
         pass
@@ -1,32 +1,147 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
 from adb.interfaces.i_adb_controller import IAdbController
+from adb.screen_change import ScreenChangeCondition
+from bot.action_queue import ActionQueue
 import numpy as np
 from numpy.typing import NDArray
 
 from config.settings import Settings
+from core.region import Region
 
 import vision.preprocessing as vision_pre
 import vision.extraction as vision_ext
+from vision.change_detection import FrameChangeDetector
+from vision.filter_column import FilterColumnLayoutDetector
+from vision.frame import Frame
+from vision.frame_ring_buffer import FrameRingBuffer
+from vision.layout import get_scaled_layout
+from vision.memo import FrameMemo
+import vision.ocr as vision_ocr
+from vision.card_index import CardRecord, PlaneCardIndex
+from vision.plane_list import PlaneList, PlaneListStitcher
+
+if TYPE_CHECKING:
+    from bot.bot_runner import AirportState
 
 from logger.logger import setup_logger, logging
 logger = setup_logger(__name__, level=logging.ERROR)
 
+T = TypeVar("T")
+S = TypeVar("S")
+
+# ActionQueue screen keys
+SELECTED_PLANE_SCREEN = "selected_plane"
+
 class AirportControllerActionsError(Exception):
     pass
 
 class ScreenshotEmptyError(Exception):
     pass
 
+class ScreenshotTimeoutError(Exception):
+    pass
+
 
 class BotService:
-    def __init__(self, adb_controller: IAdbController):
+    def __init__(
+        self,
+        adb_controller: IAdbController,
+        change_detector: Optional[FrameChangeDetector] = None,
+        frame_memo: Optional[FrameMemo] = None,
+        frame_source: Optional[FrameRingBuffer] = None,
+        input_debounce: float = Settings.INPUT_DEBOUNCE_SECONDS
+    ):
         self.adb_controller = adb_controller
+        # Actions of the cycle - dispatched together by BotRunner at the end of run_bot
+        self.action_queue = ActionQueue(adb_controller, debounce=input_debounce)
+        # Ring buffer fed by a CaptureProducer - if set, screenshots come from it instead of on-demand captures
+        self.frame_source = frame_source
+        self.latest_frame: Optional[Frame] = None
         self.latest_screenshot:Optional[NDArray[np.uint8]] = None
+        # Reused destination of the Settings.VISION_SCALE downscale
+        self._vision_buffer: Optional[NDArray[np.uint8]] = None
+        # Destination of on-demand captures - owned here, so confirm polls / other full captures
+        # of the controller cannot overwrite the cycle frame
+        self._capture_buffer: Optional[NDArray[np.uint8]] = None
+        # Pass long-lived detector / memo to keep change tracking and results across BotService instances
+        self.change_detector = change_detector if change_detector is not None else FrameChangeDetector()
+        self.frame_memo = frame_memo if frame_memo is not None else FrameMemo(self.change_detector)
+        # Decoded status / last action of plane cards, across cycles
+        self.plane_card_index: PlaneCardIndex[Any] = PlaneCardIndex()
+        # Per device - their caches are mutated by every read and must not be shared between threads
+        self.filter_column_layout_detector = FilterColumnLayoutDetector(Settings.PLANE_FILTER_REGION)
+        self.digit_reader = vision_ocr.get_default_digit_reader()
+
+    def update_screenshot(self, timeout: float = 5.0):
+        if self.frame_source is None:
+            self.use_screenshot(self._capture_screenshot())
+            return
+        # Newest complete frame - only waits if nothing was captured yet
+        frame = self.frame_source.latest() or self.frame_source.wait_for_newer(0.0, timeout)
+        if frame is None:
+            raise ScreenshotTimeoutError(f"No frame captured within {timeout} seconds.")
+        self._use_frame(frame)
+
+    def update_screenshot_after_input(self, timeout: float = 5.0):
+        """Take a frame captured after the last input (tap / swipe) completed."""
+        self.update_screenshot_newer_than(self.adb_controller.last_input_at, timeout)
+
+    def update_screenshot_newer_than(self, captured_after: float, timeout: float = 5.0):
+        """Take a frame captured after captured_after (time.monotonic)."""
+        if self.frame_source is None:
+            self.use_screenshot(self._capture_screenshot())
+            return
+        frame = self.frame_source.wait_for_newer(captured_after, timeout)
+        if frame is None:
+            raise ScreenshotTimeoutError(f"No frame newer than {captured_after} within {timeout} seconds.")
+        self._use_frame(frame)
+
+    def _capture_screenshot(self) -> NDArray[np.uint8]:
+        self._capture_buffer = self.adb_controller.get_screenshot(out=self._capture_buffer)
+        return self._capture_buffer
 
-    def update_screenshot(self):
-        raw_screenshot = self.adb_controller.get_raw_screenshot()
-        screenshot = vision_pre.process_raw_screenshot(raw_screenshot)
-        self.latest_screenshot = screenshot
+    def use_screenshot(self, screenshot: NDArray[np.uint8]):
+        """Make an already captured BGR screenshot the latest frame."""
+        self._use_frame(Frame(screenshot))
+
+    def release_frame(self):
+        """Drop the latest frame, unpinning it in the frame source (end of cycle)."""
+        if self.frame_source is not None and self.latest_frame is not None:
+            self.frame_source.release(self.latest_frame)
+        self.latest_frame = None
+        self.latest_screenshot = None
+
+    def _use_frame(self, frame: Frame):
+        # Unpin the previous ring buffer frame so the producer can reuse its slot
+        if self.frame_source is not None and self.latest_frame is not None:
+            self.frame_source.release(self.latest_frame)
+        if Settings.VISION_SCALE != 1.0:
+            # Same frame id, so the ring buffer still releases the captured frame
+            height, width = frame.image.shape[:2]
+            vision_layout = get_scaled_layout(width, height, Settings.VISION_SCALE)
+            self._vision_buffer = vision_layout.resize(frame.image, dst=self._vision_buffer)
+            frame = Frame(self._vision_buffer, frame.frame_id, frame.captured_at)
+        self.latest_frame = frame
+        self.latest_screenshot = frame.image
+        self.change_detector.update(self.latest_screenshot)
+
+    def extract(self, region: Region, extract_fn: Callable[[NDArray[np.uint8]], Any]) -> Any:
+        """
+        Run extract_fn on the latest frame through the frame memo: computed once per frame,
+        and reused across frames while region (the area extract_fn reads) is unchanged.
+        """
+        if self.latest_frame is None:
+            raise ScreenshotEmptyError()
+        return self.frame_memo.get_or_compute(extract_fn, self.latest_frame, region)
+
+    def update_airport_counters(self, airport_state: "AirportState"):
+        """Fill the HUD counters of airport_state from the latest screenshot (unreadable ones are left as is)."""
+        if self.latest_screenshot is None:
+            raise ScreenshotEmptyError()
+        counters = vision_ocr.read_airport_counters(self.latest_screenshot, self.digit_reader)
+        for field_name, value in counters.items():
+            if value is not None:
+                setattr(airport_state, field_name, value)
 
     # Airport Actions
     def perform_ground_service_instruction(self, no_of_crew:int=13):
@@ -37,45 +152,98 @@ class BotService:
             click assign crew.
         """
         # Check if the current screen has a current plane for operations
-        if not self.latest_screenshot:
+        if self.latest_screenshot is None:
             raise ScreenshotEmptyError()
         # TODO
 
-        # Add worker to max
-        self.adb_controller.tap_multiple(
-            Settings.CURRENT_SELECTED_PLANE_HANDLING_CREW_PLUS_WORKER_COORDINATES,
-            number_of_clicks=no_of_crew
-        )
-
-        
-        # Add Ramp Agent
         try:
-            if not vision_ext.classify_is_ramp_agent_toggle_switch_on(self.latest_screenshot):
-                self.adb_controller.tap(
-                    Settings.CURRENT_SELECTED_PLANE_HANDLING_CREW_EXTRA_RAMP_AGENT_COORDINATES,
-                )
+            # Add worker to max
+            self.action_queue.tap(
+                Settings.CURRENT_SELECTED_PLANE_HANDLING_CREW_PLUS_WORKER_COORDINATES,
+                count=no_of_crew,
+                screen=SELECTED_PLANE_SCREEN
+            ).wait(0.5, screen=SELECTED_PLANE_SCREEN)
+
+            # Add Ramp Agent
+            self.action_queue.toggle(
+                Settings.CURRENT_SELECTED_PLANE_HANDLING_CREW_EXTRA_RAMP_AGENT_COORDINATES,
+                is_on=self.extract(
+                    Settings.CURRENT_SELECTED_PLANE_HANDLING_CREW_EXTRA_RAMP_AGENT_REGION,
+                    vision_ext.classify_is_ramp_agent_toggle_switch_on
+                ),
+                want_on=True,
+                screen=SELECTED_PLANE_SCREEN
+            ).wait(0.2, screen=SELECTED_PLANE_SCREEN)
+
+            # Click Assign Crew - the waits above run before the confirm baseline is captured
+            self.action_queue.tap(
+                Settings.CURRENT_SELECTED_PLANE_CLICK_COORDINATES,
+                screen=SELECTED_PLANE_SCREEN
+            ).confirm_with(ScreenChangeCondition(Settings.CURRENT_SELECTED_PLANE_CLICK_REGION))
         except Exception as e:
             raise AirportControllerActionsError("Error occured when performing ground service instructions.") from e
 
-        # Click Assign Crew
-        self.adb_controller.tap(
-            Settings.CURRENT_SELECTED_PLANE_CLICK_COORDINATES
-        )
-
     def perform_deicing(self):
         # Check if the current screen has a current plane for operations
-        if not self.latest_screenshot:
+        if self.latest_screenshot is None:
             raise ScreenshotEmptyError()
         # TODO
 
         # Click De-icing Button
         try:
-            self.adb_controller.tap(
-            Settings.CURRENT_SELECTED_PLANE_CLICK_COORDINATES
-            )
+            self.action_queue.tap(
+                Settings.CURRENT_SELECTED_PLANE_CLICK_COORDINATES,
+                screen=SELECTED_PLANE_SCREEN
+            ).confirm_with(ScreenChangeCondition(Settings.CURRENT_SELECTED_PLANE_CLICK_REGION))
         except Exception as e:
             raise AirportControllerActionsError("Error occured when perfomring deicing.") from e
+
+    def dispatch_actions(self):
+        """Send the actions queued during this cycle (one adb round trip per confirmed action)."""
+        self.action_queue.flush()
     
+    def scan_plane_list(
+        self,
+        recognise_card: Callable[[NDArray[np.uint8]], T],
+        max_swipes: int = Settings.PLANE_LIST_MAX_SWIPES
+    ) -> PlaneList[T]:
+        """
+        Scroll down the plane list from the latest frame until it stops moving, running
+        recognise_card once per card. Regions of the result are for the final scroll position.
+        Swipes are sent immediately (not queued) - each needs the frame it reveals.
+        """
+        if self.latest_screenshot is None:
+            raise ScreenshotEmptyError()
+        stitcher = PlaneListStitcher(recognise_card)
+        try:
+            stitcher.add_frame(self.latest_screenshot)
+            for _ in range(max_swipes):
+                self.adb_controller.swipe(
+                    Settings.PLANE_LIST_SWIPE_START_COORDINATES,
+                    Settings.PLANE_LIST_SWIPE_END_COORDINATES,
+                    duration=Settings.PLANE_LIST_SWIPE_DURATION_MS
+                )
+                self.update_screenshot_after_input()
+                stitcher.add_frame(self.latest_screenshot)
+                if stitcher.last_offset == 0:
+                    # End of the list
+                    break
+        except Exception as e:
+            raise AirportControllerActionsError("Error occured when scanning the plane list.") from e
+        logger.info(f"Plane list stats: {stitcher.stats}")
+        return stitcher.plane_list()
+
+    def decode_plane_card(self, card_img: NDArray[np.uint8], decode_status: Callable[[NDArray[np.uint8]], S]) -> CardRecord[S]:
+        """Status of a plane card crop - decode_status only runs for cards not seen (near-identical) recently."""
+        return self.plane_card_index.get_or_decode(card_img, decode_status)
+
+    def is_plane_recently_handled(self, card: CardRecord[Any], action: str) -> bool:
+        """True if action was taken on this card within the cooldown - its tap hasn't shown on the card yet."""
+        return card.acted_within(action, Settings.PLANE_CARD_ACTION_COOLDOWN_SECONDS)
+
+    def mark_plane_handled(self, card: CardRecord[Any], action: str):
+        self.plane_card_index.mark_action(card.card_hash, action)
+
     def check_filter_column(self):
         pass
 
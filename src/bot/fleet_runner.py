@@ -0,0 +1,135 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import os
+from typing import Optional
+
+from adb.adb_device_client import AdbDeviceClient
+from adb.adb_controller import AdbController
+from adb.async_adb_device_client import AsyncAdbDeviceClient
+from adb.async_adb_controller import AsyncAdbController
+
+from bot.async_bot_loop import AsyncBotLoop
+from bot.bot_runner import BotRunner
+from config.settings import Settings
+from vision.change_detection import FrameChangeDetector
+from vision.memo import FrameMemo
+
+from logger.console import console
+from logger.logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class FleetRunnerError(Exception):
+    pass
+
+
+@dataclass
+class DeviceSession:
+    """Everything owned by one emulator: its own adb client / controller, I/O threads, runner (GameState) and loop."""
+    addr: str
+    io_executor: ThreadPoolExecutor
+    adb_device_client: AdbDeviceClient
+    adb_controller: AdbController
+    bot_runner: BotRunner
+    bot_loop: AsyncBotLoop
+
+
+class FleetRunner:
+    """
+    Drives many devices from one process on one asyncio loop.
+
+    Each device gets its own AdbController, BotRunner (GameState and recognition caches)
+    and I/O executor: captures, input round trips and settle polls of a slow or hung device
+    only block its own threads. Pure recognition (BotRunner.plan_cycle) of all devices shares
+    one bounded vision pool; each device has at most one cycle in flight and the pool serves
+    jobs FIFO, so CPU is shared round-robin between devices.
+    """
+    def __init__(self, addrs: list[str], vision_workers: Optional[int] = None):
+        if not addrs:
+            raise FleetRunnerError("Fleet needs at least one device address.")
+        if len(set(addrs)) != len(addrs):
+            raise FleetRunnerError("Duplicate device addresses in fleet.")
+        self.vision_executor = ThreadPoolExecutor(
+            max_workers=vision_workers or os.cpu_count() or 1,
+            thread_name_prefix="fleet-vision"
+        )
+        self.sessions = [self._create_session(addr) for addr in addrs]
+
+    def _create_session(self, addr: str) -> DeviceSession:
+        # Capture + connection check can overlap
+        io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"fleet-io-{addr}")
+        adb_device_client = AdbDeviceClient(addr=addr, liveness_ttl=Settings.ADB_LIVENESS_TTL_SECONDS)
+        adb_controller = AdbController(adb_device_client)
+        change_detector = FrameChangeDetector()
+        bot_runner = BotRunner(
+            adb_controller,
+            change_detector=change_detector,
+            frame_memo=FrameMemo(change_detector, lru_size=Settings.FRAME_MEMO_LRU_SIZE)
+        )
+        bot_loop = AsyncBotLoop(
+            AsyncAdbDeviceClient(adb_device_client, io_executor),
+            AsyncAdbController(adb_controller, io_executor),
+            bot_runner,
+            vision_executor=self.vision_executor,
+            name=f"[{addr}]"
+        )
+        return DeviceSession(addr, io_executor, adb_device_client, adb_controller, bot_runner, bot_loop)
+
+    def stats_snapshot(self) -> dict[str, dict[str, float]]:
+        """Per-device throughput and cycle latency (seconds) percentiles."""
+        return {
+            session.addr: {
+                "cycles": session.bot_loop.stats.cycles,
+                "failures": session.bot_loop.stats.failures,
+                "stale_captures": session.bot_loop.stats.stale_captures,
+                "cycles_per_minute": session.bot_loop.stats.cycles_per_minute(),
+                "latency_p50": session.bot_loop.stats.latency_percentile(50),
+                "latency_p95": session.bot_loop.stats.latency_percentile(95),
+                "latency_p99": session.bot_loop.stats.latency_percentile(99),
+                "capture_latency": session.bot_loop.capture_latency,
+            }
+            for session in self.sessions
+        }
+
+    async def report_stats(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for addr, stats in self.stats_snapshot().items():
+                console.print(
+                    f"[pink3]{addr}[/pink3] cycles={stats['cycles']} failures={stats['failures']} "
+                    f"{stats['cycles_per_minute']:.1f}/min p50={stats['latency_p50'] * 1000:.0f}ms "
+                    f"p95={stats['latency_p95'] * 1000:.0f}ms p99={stats['latency_p99'] * 1000:.0f}ms "
+                    f"capture={stats['capture_latency'] * 1000:.0f}ms"
+                )
+
+    async def connect_sessions(self):
+        """Connect all devices concurrently (each in its own I/O executor), dropping the ones that fail."""
+        results = await asyncio.gather(
+            *(session.bot_loop.adb_device_client.connect() for session in self.sessions),
+            return_exceptions=True
+        )
+        connected: list[DeviceSession] = []
+        for session, result in zip(self.sessions, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Skipping device {session.addr}, connection failed: {result}")
+                console.print(f"[red]Skipping device {session.addr} - connection failed.[/red]")
+                session.io_executor.shutdown(wait=False, cancel_futures=True)
+                continue
+            connected.append(session)
+        if not connected:
+            raise FleetRunnerError("No device of the fleet could be connected.")
+        self.sessions = connected
+
+    async def run(self, stats_interval: float = Settings.FLEET_STATS_INTERVAL_SECONDS):
+        try:
+            await self.connect_sessions()
+            console.print(f"[pink3]Starting bot services for a fleet of {len(self.sessions)} devices.[/pink3]")
+            await asyncio.gather(
+                self.report_stats(stats_interval),
+                *(session.bot_loop.run() for session in self.sessions)
+            )
+        finally:
+            self.vision_executor.shutdown(wait=False, cancel_futures=True)
+            for session in self.sessions:
+                session.io_executor.shutdown(wait=False, cancel_futures=True)
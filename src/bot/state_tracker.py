@@ -0,0 +1,83 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import time
+from typing import Optional
+
+from core.region import Region
+from vision.change_detection import FrameChangeDetector
+
+class StateTrackerError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class StalenessBudget:
+    max_age: float  # seconds a verified value is trusted without looking again
+    # Regions the value is read from - a change in any of them makes it stale early.
+    # Empty: any change of the whole frame does.
+    regions: tuple[Region, ...] = ()
+
+@dataclass(slots=True)
+class FieldFreshness:
+    budget: StalenessBudget
+    verified_at: Optional[float] = None  # time.monotonic(), None until first verified
+    verified_frame: int = 0  # change detector frame_index it was verified on
+
+@dataclass
+class StateTrackerStats:
+    refreshes: int = 0  # fields re-read
+    skips: int = 0  # fields kept from a previous cycle
+
+
+class StateTracker:
+    """
+    Last verification time / frame of each tracked GameState field.
+
+    A field is stale - and has to be re-read - if it was never verified, is older than
+    its budget's max_age, or one of its regions changed since it was verified.
+    Everything else is carried over from the previous cycle as is.
+    """
+    def __init__(self, change_detector: FrameChangeDetector, budgets: dict[str, StalenessBudget]):
+        self.change_detector = change_detector
+        self.stats = StateTrackerStats()
+        self._fields = {name: FieldFreshness(budget) for name, budget in budgets.items()}
+
+    def is_stale(self, name: str, now: Optional[float] = None) -> bool:
+        field = self._get(name)
+        now = time.monotonic() if now is None else now
+        if field.verified_at is None or now - field.verified_at > field.budget.max_age:
+            stale = True
+        elif field.budget.regions:
+            stale = any(
+                self.change_detector.changed_since(region, field.verified_frame)
+                for region in field.budget.regions
+            )
+        else:
+            stale = self.change_detector.frame_changed_since(field.verified_frame)
+
+        if stale:
+            self.stats.refreshes += 1
+        else:
+            self.stats.skips += 1
+        return stale
+
+    def mark_verified(self, name: str, now: Optional[float] = None):
+        field = self._get(name)
+        field.verified_at = time.monotonic() if now is None else now
+        field.verified_frame = self.change_detector.frame_index
+
+    def invalidate(self, *names: str):
+        """Force a re-read of the given fields (all fields if none given)."""
+        for name in names or tuple(self._fields):
+            self._get(name).verified_at = None
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the field was verified, None if never."""
+        verified_at = self._get(name).verified_at
+        return None if verified_at is None else time.monotonic() - verified_at
+
+    def _get(self, name: str) -> FieldFreshness:
+        try:
+            return self._fields[name]
+        except KeyError as e:
+            raise StateTrackerError(f"Untracked state field: {name}.") from e
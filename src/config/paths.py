@@ -5,6 +5,16 @@ PROJECT_ROOT_DIR = Path(__file__).resolve().parent.parent.parent
 SRC_DIR = PROJECT_ROOT_DIR / "src"
 TEMP_DIR = SRC_DIR / "temp"
 TEMPLATES_DIR = SRC_DIR / "templates"
+GLYPHS_DIR = TEMPLATES_DIR / "glyphs"
+CONFIG_DIR = SRC_DIR / "config"
+PAGE_PROBES_FILE = CONFIG_DIR / "page_probes.json"
+# Recorded captures for benchmarks.vision_bench: <PAGE_STATE>/*.png
+BENCHMARK_CORPUS_DIR = SRC_DIR / "benchmarks" / "corpus"
+BENCHMARK_RESULTS_DIR = TEMP_DIR / "benchmarks"
+METRICS_JSON_FILE = TEMP_DIR / "metrics.json"
+METRICS_PROMETHEUS_FILE = TEMP_DIR / "metrics.prom"
+# Collapsed stacks + frame of cycles over budget (logger.profiler)
+SLOW_CYCLE_DUMPS_DIR = TEMP_DIR / "slow_cycles"
 
 
 TEMP_DIR.mkdir(exist_ok=True)
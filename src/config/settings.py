@@ -1,9 +1,47 @@
+from typing import Optional
 from core import Point, Region
 
 class Settings:
     CYCLE_SECONDS = 3
+    # Back off (up to the max) while consecutive cycles see an unchanged screen
+    STATIC_SCREEN_MAX_CYCLE_SECONDS = 15
+    # Extraction results kept across frames while their region is unchanged
+    FRAME_MEMO_LRU_SIZE = 64
+    # Max seconds a GameState field is trusted without re-reading it (bot.state_tracker)
+    # - fields are re-read earlier when their screen region changes
+    PAGE_MAX_AGE_SECONDS = 30
+    AIRPORT_COUNTERS_MAX_AGE_SECONDS = 60
 
     ADDR = "127.0.0.1:16384"
+    # Fleet mode (bot.fleet_runner): drive every address listed here instead of ADDR
+    FLEET_ADDRS: list[str] = []
+    FLEET_VISION_WORKERS = 4
+    FLEET_STATS_INTERVAL_SECONDS = 60
+    ADB_LIVENESS_TTL_SECONDS = 5.0
+    # Wait after an unconfirmed input batch for the game to react (bot.action_queue)
+    INPUT_DEBOUNCE_SECONDS = 0.5
+    # Record every adb call of main.py to this dir for offline replay (benchmarks.replay_bench)
+    ADB_RECORD_SESSION_DIR: Optional[str] = None
+    # Span timings / per-cycle breakdown (logger.metrics), exported to TEMP_DIR every interval
+    METRICS_ENABLED = False
+    METRICS_EXPORT_INTERVAL_SECONDS = 30
+    # Low frequency stack sampling, dumped only for run_bot cycles over budget (logger.profiler)
+    SLOW_CYCLE_PROFILER_ENABLED = False
+    SLOW_CYCLE_BUDGET_SECONDS = 2.0
+    SLOW_CYCLE_SAMPLE_INTERVAL_SECONDS = 0.02
+    SLOW_CYCLE_MAX_DUMPS = 20
+    # Pipelined asyncio loop (bot.async_bot_loop) instead of main.main_loop
+    ASYNC_RUNTIME = False
+    # Capture continuously on a background thread into a ring of preallocated frames
+    BACKGROUND_CAPTURE = False
+    FRAME_RING_BUFFER_CAPACITY = 4
+    # Min seconds between capture starts - back to back captures would keep adb (and a core) busy for nothing
+    CAPTURE_MIN_INTERVAL_SECONDS = 0.25
+    # Captures pause while the bot sleeps between cycles and resume this long before the next one
+    CAPTURE_RESUME_LEAD_SECONDS = 0.5
+    # Frames are downscaled by this factor before recognition (0.5: 1920x1080 -> 960x540).
+    # Regions / points below are layout space (1920x1080) and resolve to any frame or device resolution.
+    VISION_SCALE = 1.0
 
     PLANE_TAG_CROP_REGION = Region(Point(1560, 0), Point(1810, 1080))
     PLANE_FILTER_REGION = Region(Point(1810, 0), Point(1920, 1080))
@@ -12,7 +50,48 @@ class Settings:
     CURRENT_SELECTED_PLANE_HANDLING_CREW_REGION = Region(Point(470, 540), Point(1020, 820))
     CURRENT_SELECTED_PLANE_CLICK_REGION = Region(Point(60, 950), Point(390, 1010))
     CURRENT_SELECTED_PLANE_HANDLING_CREW_EXTRA_RAMP_AGENT_REGION = Region(Point(930, 759), Point(994, 796))
+    # Airport HUD counters (OCR) - the regions below are unmeasured estimates, so reading
+    # the counters stays off until they are verified on a device
+    AIRPORT_COUNTERS_OCR_ENABLED = False
+    AIRPORT_WORKERS_REGION = Region(Point(680, 20), Point(800, 60))
+    AIRPORT_GOLD_REGION = Region(Point(1100, 20), Point(1260, 60))
+    AIRPORT_SILVER_REGION = Region(Point(1320, 20), Point(1480, 60))
+    AIRPORT_CURRENCY_REGION = Region(Point(1540, 20), Point(1700, 60))
 
     CURRENT_SELECTED_PLANE_CLICK_COORDINATES = Point(225, 980)
     CURRENT_SELECTED_PLANE_HANDLING_CREW_PLUS_WORKER_COORDINATES = Point(965, 690)
     CURRENT_SELECTED_PLANE_HANDLING_CREW_EXTRA_RAMP_AGENT_COORDINATES = Point(965, 775)
+    # Plane list scroll (vision.plane_list) - a slow drag shorter than PLANE_TAG_CROP_REGION,
+    # so consecutive frames overlap and the list doesn't fling
+    PLANE_LIST_SWIPE_START_COORDINATES = Point(1685, 900)
+    PLANE_LIST_SWIPE_END_COORDINATES = Point(1685, 400)
+    PLANE_LIST_SWIPE_DURATION_MS = 800
+    PLANE_LIST_MAX_SWIPES = 10
+    # Plane card index (vision.card_index) - cards with identical text ink and layout hashes within
+    # the Hamming distance are the same card. Regions are in card space (reference pixels from the
+    # top left of a PLANE_TAG_CROP_REGION card), with a margin for 1px segmentation shifts
+    PLANE_CARD_INDEX_SIZE = 256
+    PLANE_CARD_INDEX_TTL_SECONDS = 120
+    PLANE_CARD_HASH_MAX_DISTANCE = 8
+    # Flight number / aircraft type, status line
+    PLANE_CARD_TEXT_REGIONS = [Region(Point(64, 8), Point(250, 72)), Region(Point(0, 76), Point(250, 124))]
+    # Plane thumbnail (spinning propellers, blinking status light) - left out of the layout hash
+    PLANE_CARD_ANIMATED_REGIONS = [Region(Point(0, 0), Point(64, 64))]
+    # Min grayscale difference from the text region background of an ink pixel
+    PLANE_CARD_TEXT_INK_CONTRAST = 60
+    # A plane is not given the same action again within this time
+    PLANE_CARD_ACTION_COOLDOWN_SECONDS = 15
+
+    # Template name (TEMPLATES_DIR/<name>.png) -> search ROI
+    # Deliberately generous bands (full width top / bottom bars, centred dialogs): the page
+    # templates are searched where their element can appear on any supported layout, and
+    # matching cost only depends on the band size, not on the frame size
+    TEMPLATE_SEARCH_REGIONS = {
+        "page_airport": PLANE_FILTER_REGION,
+        "page_claim_rewards": Region(Point(460, 140), Point(1460, 940)),
+        "page_shop": Region(Point(0, 0), Point(1920, 160)),
+        "page_phone_main": Region(Point(0, 880), Point(1920, 1080)),
+        "page_loading": Region(Point(0, 880), Point(1920, 1080)),
+        "page_game_login": Region(Point(460, 640), Point(1460, 1080)),
+        "page_airport_selection": Region(Point(0, 0), Point(1920, 160)),
+    }
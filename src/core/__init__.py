@@ -1,4 +1,6 @@
 from .point import Point
 from .region import Region
+from .point_set import PointSet
+from .region_set import RegionSet
 
-__all__ = ["Point", "Region"]
\ No newline at end of file
+__all__ = ["Point", "Region", "PointSet", "RegionSet"]
\ No newline at end of file
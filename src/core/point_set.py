@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, Optional, Union
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .point import Point, Number
+from .interfaces.i_point import IPoint
+
+class PointSet:
+    """
+    N points backed by one (N, 2) array of x, y - every operation is a single array operation.
+    Integer input stays integer until an operation needs floats (e.g. scale).
+    """
+    __slots__ = ("xy",)
+
+    def __init__(self, xy: ArrayLike):
+        xy = np.asarray(xy)
+        if xy.size == 0:
+            xy = xy.reshape(0, 2)
+        if xy.ndim != 2 or xy.shape[1] != 2:
+            raise ValueError(f"PointSet needs an (N, 2) array, got shape {xy.shape}")
+        self.xy: NDArray[np.integer | np.floating] = xy
+
+    # Conversions
+    @classmethod
+    def from_points(cls, points: Iterable[IPoint]) -> PointSet:
+        return cls(np.array([(pt.x, pt.y) for pt in points]))
+
+    def to_points(self) -> list[Point]:
+        return [Point(x, y) for x, y in self.xy.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def __iter__(self) -> Iterator[Point]:
+        return iter(self.to_points())
+
+    def __getitem__(self, index: Union[int, slice, NDArray[np.bool_], NDArray[np.integer]]) -> Union[Point, PointSet]:
+        """An int index returns a Point, slices / index or bool arrays a PointSet."""
+        if isinstance(index, (int, np.integer)):
+            x, y = self.xy[index].tolist()
+            return Point(x, y)
+        return PointSet(self.xy[index])
+
+    def __repr__(self) -> str:
+        return f"PointSet({self.xy.tolist()})"
+
+    @property
+    def x(self) -> NDArray[np.integer | np.floating]:
+        return self.xy[:, 0]
+
+    @property
+    def y(self) -> NDArray[np.integer | np.floating]:
+        return self.xy[:, 1]
+
+    # Immutable methods returning new PointSets
+    def translate(self, dx: Number, dy: Number) -> PointSet:
+        return PointSet(self.xy + np.array([dx, dy]))
+
+    def scale(self, sx: Number, sy: Optional[Number] = None) -> PointSet:
+        if sy is None: sy = sx
+        return PointSet(self.xy * np.array([sx, sy]))
+
+    def clamp(self, max_width: int, max_height: int) -> PointSet:
+        return PointSet(np.clip(self.xy, 0, [max_width - 1, max_height - 1]))
+
+    def to_int(self) -> PointSet:
+        """Truncate like Point.to_int."""
+        return PointSet(self.xy.astype(np.int64))
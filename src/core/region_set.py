@@ -0,0 +1,95 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, Optional, Union
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .point import Point, Number
+from .point_set import PointSet
+from .region import Region
+from .interfaces.i_point import IPoint
+
+class RegionSet:
+    """
+    N regions backed by one (N, 4) array of x1, y1, x2, y2.
+    Corners are normalised (x1 <= x2, y1 <= y2) once on construction, not on every call.
+    """
+    __slots__ = ("bounds",)
+
+    def __init__(self, bounds: ArrayLike):
+        bounds = np.asarray(bounds)
+        if bounds.size == 0:
+            bounds = bounds.reshape(0, 4)
+        if bounds.ndim != 2 or bounds.shape[1] != 4:
+            raise ValueError(f"RegionSet needs an (N, 4) array, got shape {bounds.shape}")
+        self.bounds: NDArray[np.integer | np.floating] = np.concatenate(
+            (np.minimum(bounds[:, :2], bounds[:, 2:]), np.maximum(bounds[:, :2], bounds[:, 2:])),
+            axis=1
+        )
+
+    # Conversions
+    @classmethod
+    def from_regions(cls, regions: Iterable[Region]) -> RegionSet:
+        return cls(np.array([(r.corner1.x, r.corner1.y, r.corner2.x, r.corner2.y) for r in regions]))
+
+    def to_regions(self) -> list[Region]:
+        return [Region(Point(x1, y1), Point(x2, y2)) for x1, y1, x2, y2 in self.bounds.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __iter__(self) -> Iterator[Region]:
+        return iter(self.to_regions())
+
+    def __getitem__(self, index: Union[int, slice, NDArray[np.bool_], NDArray[np.integer]]) -> Union[Region, RegionSet]:
+        """An int index returns a Region, slices / index or bool arrays a RegionSet."""
+        if isinstance(index, (int, np.integer)):
+            x1, y1, x2, y2 = self.bounds[index].tolist()
+            return Region(Point(x1, y1), Point(x2, y2))
+        return RegionSet(self.bounds[index])
+
+    def __repr__(self) -> str:
+        return f"RegionSet({self.bounds.tolist()})"
+
+    def width(self) -> NDArray[np.integer | np.floating]:
+        return self.bounds[:, 2] - self.bounds[:, 0]
+
+    def height(self) -> NDArray[np.integer | np.floating]:
+        return self.bounds[:, 3] - self.bounds[:, 1]
+
+    def center(self) -> PointSet:
+        return PointSet((self.bounds[:, :2] + self.bounds[:, 2:]) / 2)
+
+    # Immutable methods returning new RegionSets
+    def translate(self, dx: Number, dy: Number) -> RegionSet:
+        return RegionSet(self.bounds + np.array([dx, dy, dx, dy]))
+
+    def scale(self, sx: Number, sy: Optional[Number] = None) -> RegionSet:
+        if sy is None: sy = sx
+        return RegionSet(self.bounds * np.array([sx, sy, sx, sy]))
+
+    def clamp(self, max_width: int, max_height: int) -> RegionSet:
+        """Same bounds as Region.clamp, for all regions at once."""
+        return RegionSet(np.clip(self.bounds, 0, [max_width - 1, max_height - 1, max_width - 1, max_height - 1]))
+
+    # Hit testing
+    def contains(self, points: Union[PointSet, IPoint]) -> NDArray[np.bool_]:
+        """
+        (regions, points) matrix of Region.contains (edges inclusive),
+        or one flag per region for a single point.
+        """
+        if not isinstance(points, PointSet):
+            return self.contains(PointSet.from_points([points]))[:, 0]
+        x, y = points.x[None, :], points.y[None, :]
+        x1, y1, x2, y2 = (self.bounds[:, i, None] for i in range(4))
+        return (x1 <= x) & (x <= x2) & (y1 <= y) & (y <= y2)
+
+    def hit_test(self, points: PointSet) -> NDArray[np.intp]:
+        """Index of the first region containing each point, -1 if none."""
+        hits = self.contains(points)
+        if len(self) == 0:
+            return np.full(len(points), -1, dtype=np.intp)
+        return np.where(hits.any(axis=0), hits.argmax(axis=0), -1)
+
+    def crop_all(self, cv_img: NDArray[np.uint8]) -> list[NDArray[np.uint8]]:
+        """Views of every region in cv_img (bounds truncated to int like Region.to_tuple_x1_y1_x2_y2)."""
+        return [cv_img[y1:y2, x1:x2] for x1, y1, x2, y2 in self.bounds.astype(np.intp).tolist()]
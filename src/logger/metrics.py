@@ -0,0 +1,269 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import functools
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional, TypeVar, cast
+
+from config.settings import Settings
+
+from .logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Cycle breakdown categories
+CAPTURE = "capture"
+VISION = "vision"
+INPUT = "input"
+SLEEP = "sleep"
+CYCLE_CATEGORIES = (CAPTURE, VISION, INPUT, SLEEP)
+
+# Log-linear buckets over microseconds: 2**SUB_BUCKET_BITS sub-buckets per power of two,
+# so any recorded value is within 1 / 2**(SUB_BUCKET_BITS - 1) (~1.6%) of its bucket
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+EXPORT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKETS + (value >> shift)
+
+def _bucket_value(index: int) -> int:
+    """Lowest value of the bucket."""
+    if index < SUB_BUCKETS:
+        return index
+    shift, mantissa = divmod(index, SUB_BUCKETS)
+    return mantissa << shift
+
+
+class Histogram:
+    """HDR-style latency histogram: constant relative precision from microseconds to hours, sparse buckets."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.min = float("inf")
+        self.max = 0.0
+        self._buckets: dict[int, int] = {}
+
+    def record(self, seconds: float):
+        index = _bucket_index(max(0, int(seconds * 1_000_000)))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Value (seconds) at quantile q (0-1), 0 if empty."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self.max, _bucket_value(index) / 1_000_000)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.mean(),
+            **{f"p{q * 100:g}": self.quantile(q) for q in EXPORT_QUANTILES},
+        }
+
+
+@dataclass
+class CycleBreakdown:
+    """Seconds spent per category in one cycle; other = total - categorised time."""
+    total: float = 0.0
+    categories: dict[str, float] = field(default_factory=lambda: {category: 0.0 for category in CYCLE_CATEGORIES})
+
+    @property
+    def other(self) -> float:
+        return max(0.0, self.total - sum(self.categories.values()))
+
+    def __str__(self) -> str:
+        parts = " ".join(f"{category}={seconds * 1000:.1f}ms" for category, seconds in self.categories.items())
+        return f"total={self.total * 1000:.1f}ms {parts} other={self.other * 1000:.1f}ms"
+
+
+class _CycleState(threading.local):
+    def __init__(self):
+        self.breakdown: Optional[CycleBreakdown] = None
+        self.started_at = 0.0
+        # category -> open spans, so nested spans of one category are only counted once
+        self.depth: dict[str, int] = {}
+
+
+class Metrics:
+    """
+    Span timings aggregated per name into histograms, plus the per-cycle category breakdown.
+
+    Disabled (the default unless Settings.METRICS_ENABLED), span() returns a shared no-op
+    context and timed functions call straight through after a single attribute check.
+    Cycle breakdowns are tracked per thread - start_cycle() / end_cycle() on the thread
+    running the cycle, whose spans are counted.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: dict[str, Histogram] = {}
+        self.last_cycle: Optional[CycleBreakdown] = None
+        self._lock = threading.Lock()
+        self._cycle = _CycleState()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    def span(self, name: str, category: Optional[str] = None):
+        """Context manager timing its body as name, counted towards category in the cycle breakdown."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category)
+
+    @contextmanager
+    def _span(self, name: str, category: Optional[str]) -> Iterator[None]:
+        cycle = self._cycle
+        if category is not None:
+            cycle.depth[category] = cycle.depth.get(category, 0) + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(name, elapsed)
+            if category is not None:
+                cycle.depth[category] -= 1
+                if cycle.depth[category] == 0 and cycle.breakdown is not None:
+                    cycle.breakdown.categories[category] = cycle.breakdown.categories.get(category, 0.0) + elapsed
+
+    def timed(self, name: Optional[str] = None, category: Optional[str] = None) -> Callable[[F], F]:
+        """Decorator form of span(), named module.qualname by default."""
+        def decorator(fn: F) -> F:
+            span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._span(span_name, category):
+                    return fn(*args, **kwargs)
+            return cast(F, wrapper)
+        return decorator
+
+    # Cycles
+    def start_cycle(self):
+        if not self.enabled:
+            return
+        self._cycle.breakdown = CycleBreakdown()
+        self._cycle.started_at = time.perf_counter()
+
+    def end_cycle(self) -> Optional[CycleBreakdown]:
+        breakdown = self._cycle.breakdown
+        if breakdown is None:
+            return None
+        self._cycle.breakdown = None
+        breakdown.total = time.perf_counter() - self._cycle.started_at
+        self.record("cycle.total", breakdown.total)
+        for category, seconds in breakdown.categories.items():
+            self.record(f"cycle.{category}", seconds)
+        self.record("cycle.other", breakdown.other)
+        self.last_cycle = breakdown
+        return breakdown
+
+    # Export
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+    def to_json(self) -> str:
+        return json.dumps({"created_at": time.time(), "spans": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix: str = "woa_bot") -> str:
+        """Prometheus text exposition: one summary (seconds) labelled by span name."""
+        metric = f"{prefix}_span_seconds"
+        lines = [f"# HELP {metric} Latency of instrumented spans.", f"# TYPE {metric} summary"]
+        for name, snapshot in self.snapshot().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in EXPORT_QUANTILES:
+                lines.append(f'{metric}{{span="{label}",quantile="{q:g}"}} {snapshot[f"p{q * 100:g}"]:.6f}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {snapshot["sum"]:.6f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {int(snapshot["count"])}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Optional[Path] = None, prometheus_path: Optional[Path] = None):
+        """Write the exports atomically (written aside, then renamed)."""
+        for path, content in ((json_path, self.to_json), (prometheus_path, self.to_prometheus)):
+            if path is None:
+                continue
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_text(content(), encoding="utf-8")
+            tmp_path.replace(path)
+
+
+class MetricsExporter:
+    """Daemon thread writing the metrics exports every interval seconds."""
+    def __init__(
+        self,
+        metrics: Metrics,
+        interval: float,
+        json_path: Optional[Path] = None,
+        prometheus_path: Optional[Path] = None
+    ):
+        self.metrics = metrics
+        self.interval = interval
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.metrics.write(self.json_path, self.prometheus_path)
+            except Exception:
+                logger.error("Failed to write metrics.", exc_info=True)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info: Any):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+# Process-wide registry, like logger.console
+metrics = Metrics(enabled=Settings.METRICS_ENABLED)
+
+__all__ = ["metrics", "Metrics", "MetricsExporter", "Histogram", "CycleBreakdown"]
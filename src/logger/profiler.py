@@ -0,0 +1,145 @@
+from __future__ import annotations
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from config.paths import SLOW_CYCLE_DUMPS_DIR
+
+from .logger import setup_logger, logging
+logger = setup_logger(__name__, level=logging.ERROR)
+
+DUMP_PREFIX = "slow_cycle_"
+MAX_STACK_DEPTH = 128
+
+
+class SlowCycleProfilerError(Exception):
+    pass
+
+
+# (time.monotonic(), thread name, code objects root -> leaf)
+_Sample = tuple[float, str, tuple[CodeType, ...]]
+
+
+class SlowCycleProfiler:
+    """
+    Low frequency sampling profiler that only keeps what slow cycles did.
+
+    A daemon thread samples the stacks of all threads every interval seconds into a
+    bounded buffer (code objects only - formatting happens at dump time). When a cycle
+    reported by cycle_finished() took longer than budget, the samples taken during it
+    are written as collapsed stacks (flamegraph.pl / speedscope "folded" format) next to
+    the frame the cycle worked on. Only the newest max_dumps dumps are kept.
+    """
+    def __init__(
+        self,
+        budget: float,
+        interval: float = 0.02,
+        buffer_size: int = 4096,
+        max_dumps: int = 20,
+        dump_dir: Path = SLOW_CYCLE_DUMPS_DIR
+    ):
+        if interval <= 0:
+            raise SlowCycleProfilerError(f"Sampling interval must be > 0, got {interval}.")
+        self.budget = budget
+        self.interval = interval
+        self.max_dumps = max_dumps
+        self.dump_dir = dump_dir
+        self.slow_cycles = 0
+        self._samples: deque[_Sample] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Sampler
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-cycle-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            samples = [
+                (now, names.get(ident, str(ident)), _stack_codes(frame))
+                for ident, frame in sys._current_frames().items()
+                if ident != own_ident
+            ]
+            with self._lock:
+                self._samples.extend(samples)
+
+    # Cycles
+    def cycle_started(self) -> float:
+        """Return the cycle start to pass to cycle_finished()."""
+        return time.monotonic()
+
+    def cycle_finished(self, started_at: float, frame: Optional[NDArray[np.uint8]] = None) -> Optional[Path]:
+        """Dump the cycle if it exceeded the budget, return the collapsed stacks file (None if in budget)."""
+        finished_at = time.monotonic()
+        elapsed = finished_at - started_at
+        if elapsed <= self.budget:
+            return None
+        self.slow_cycles += 1
+        with self._lock:
+            samples = [sample for sample in self._samples if started_at <= sample[0] <= finished_at]
+        try:
+            return self._dump(elapsed, samples, frame)
+        except Exception:
+            # Diagnostics must never break the bot
+            logger.error("Failed to dump slow cycle profile.", exc_info=True)
+            return None
+
+    def _dump(self, elapsed: float, samples: list[_Sample], frame: Optional[NDArray[np.uint8]]) -> Path:
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{DUMP_PREFIX}{datetime.now():%Y%m%d_%H%M%S_%f}_{elapsed * 1000:.0f}ms"
+        stacks_path = self.dump_dir / f"{name}.folded"
+        counts = Counter(
+            ";".join([thread_name, *(_format_code(code) for code in codes)])
+            for _, thread_name, codes in samples
+        )
+        with open(stacks_path, "w", encoding="utf-8") as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        if frame is not None:
+            cv2.imwrite(str(self.dump_dir / f"{name}.png"), frame)
+        logger.warning(
+            f"Cycle took {elapsed:.3f}s (budget {self.budget:.3f}s) - {len(samples)} stack samples written to {stacks_path}."
+        )
+        self._rotate()
+        return stacks_path
+
+    def _rotate(self):
+        dumps = sorted(self.dump_dir.glob(f"{DUMP_PREFIX}*.folded"))
+        for stacks_path in dumps[:max(0, len(dumps) - self.max_dumps)]:
+            stacks_path.unlink(missing_ok=True)
+            stacks_path.with_suffix(".png").unlink(missing_ok=True)
+
+
+def _stack_codes(frame: Optional[FrameType]) -> tuple[CodeType, ...]:
+    codes: list[CodeType] = []
+    while frame is not None and len(codes) < MAX_STACK_DEPTH:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return tuple(codes)
+
+def _format_code(code: CodeType) -> str:
+    # No spaces / semicolons - they delimit the folded format
+    return f"{Path(code.co_filename).stem}.{code.co_qualname}".replace(" ", "_").replace(";", "_")
@@ -1,64 +1,163 @@
+import asyncio
+from pathlib import Path
 import time
-
+from typing import Optional
 
 from config.settings import Settings
+from config.paths import METRICS_JSON_FILE, METRICS_PROMETHEUS_FILE
 
 from adb.interfaces.i_adb_device_client import IAdbDeviceClient
 from adb.interfaces.i_adb_controller import IAdbController
 from adb.adb_device_client import AdbDeviceClient, AdbDeviceClientConnectionTimeoutError
 from adb.adb_controller import AdbController
+from adb.async_adb_device_client import AsyncAdbDeviceClient
+from adb.async_adb_controller import AsyncAdbController
+from adb.capture_producer import CaptureProducer
+from adb.recording_adb_device_client import RecordingAdbDeviceClient
 
 from bot.bot_runner import BotRunner
+from bot.async_bot_loop import AsyncBotLoop
+from bot.fleet_runner import FleetRunner
+from vision.change_detection import FrameChangeDetector
+from vision.memo import FrameMemo
+from vision.frame_ring_buffer import FrameRingBuffer
 
 from logger.console import console
+from logger.metrics import metrics, MetricsExporter, CAPTURE, SLEEP
+from logger.profiler import SlowCycleProfiler
 from logger.logger import setup_logger, logging
 logger = setup_logger(__name__, level=logging.ERROR)
 
 
 
 
+def get_slow_cycle_profiler() -> Optional[SlowCycleProfiler]:
+    """Started profiler if enabled in Settings, else None."""
+    if not Settings.SLOW_CYCLE_PROFILER_ENABLED:
+        return None
+    profiler = SlowCycleProfiler(
+        Settings.SLOW_CYCLE_BUDGET_SECONDS,
+        interval=Settings.SLOW_CYCLE_SAMPLE_INTERVAL_SECONDS,
+        max_dumps=Settings.SLOW_CYCLE_MAX_DUMPS
+    )
+    profiler.start()
+    return profiler
+
+
 def main_loop(adb_device_client: IAdbDeviceClient, adb_controller: IAdbController):
     was_connected:bool = True
-    while True:
-        try:
-            adb_device_client.maintain_connection()
-            if was_connected:
-                logger.info("Connection stable.")
-                console.print("[pink3]Starting bot services.[/pink3]")
-            else:
-                logger.info("Connection stable - reconnected.")
-                console.print("[green]Reconnected![/green]")
-                was_connected = True
+    change_detector = FrameChangeDetector()
+    frame_memo = FrameMemo(change_detector, lru_size=Settings.FRAME_MEMO_LRU_SIZE)
+    frame_source = None
+    capture_producer = None
+    if Settings.BACKGROUND_CAPTURE:
+        frame_source = FrameRingBuffer(Settings.FRAME_RING_BUFFER_CAPACITY)
+        capture_producer = CaptureProducer(adb_controller, frame_source)
+        capture_producer.start()
+    # One runner for the whole session - its GameState carries over between cycles
+    bot_runner = BotRunner(
+        adb_controller,
+        change_detector=change_detector,
+        frame_memo=frame_memo,
+        frame_source=frame_source,
+        profiler=get_slow_cycle_profiler()
+    )
+    try:
+        while True:
+            try:
+                adb_device_client.maintain_connection()
+                if was_connected:
+                    logger.info("Connection stable.")
+                    console.print("[pink3]Starting bot services.[/pink3]")
+                else:
+                    logger.info("Connection stable - reconnected.")
+                    console.print("[green]Reconnected![/green]")
+                    was_connected = True
+                    # Nothing seen while disconnected can be trusted
+                    bot_runner.state_tracker.invalidate()
             
-            # Bot Loging
-            bot_runner = BotRunner(adb_controller)
-            bot_runner.run_bot()
+                # Bot Loging
+                metrics.start_cycle()
+                bot_runner.run_bot()
+                logger.info(f"Adb connection stats: {adb_device_client.connection_stats}")
+                logger.info(f"Frame memo stats: {frame_memo.stats}")
+                logger.info(f"State tracker stats: {bot_runner.state_tracker.stats}")
+                logger.info(f"Plane card index stats: {bot_runner.bot_service.plane_card_index.stats}")
+
+                cycle_seconds = bot_runner.get_cycle_seconds()
+                console.print(f"[pink3]Finished bot services. Next cycle starts in {cycle_seconds} seconds[/pink3]")
+                if capture_producer is not None:
+                    # Nothing reads frames while sleeping - capture again just ahead of the next cycle
+                    capture_producer.pause_until(time.monotonic() + max(0.0, cycle_seconds - Settings.CAPTURE_RESUME_LEAD_SECONDS))
+                with metrics.span("main_loop.sleep", SLEEP):
+                    time.sleep(cycle_seconds)
+                if capture_producer is not None:
+                    with metrics.span("main_loop.wait_for_frame", CAPTURE):
+                        capture_producer.wait_for_resumed_frame()
+                breakdown = metrics.end_cycle()
+                if breakdown is not None:
+                    logger.info(f"Cycle breakdown: {breakdown}")
+                continue
 
-            console.print(f"[pink3]Finished bot services. Next cycle starts in {Settings.CYCLE_SECONDS} seconds[/pink3]")
+            except AdbDeviceClientConnectionTimeoutError as e:
+                logger.warning(e)
+            except Exception:
+                logger.error("Unexpected error in adb connection:", exc_info=True)
+
+            # Connection dropped
+            if was_connected:
+                logger.warning("Connection lost.")
+                console.print("[red]Connection lost![/red]")
+                was_connected = False
+
+            logger.warning(f"Retrying in {Settings.CYCLE_SECONDS} seconds...")
+            console.print(f"[red]Retrying in {Settings.CYCLE_SECONDS} seconds...[/red]")
             time.sleep(Settings.CYCLE_SECONDS)
-            continue
+    finally:
+        if capture_producer is not None:
+            capture_producer.stop()
 
-        except AdbDeviceClientConnectionTimeoutError as e:
-            logger.warning(e)
-        except Exception:
-            logger.error("Unexpected error in adb connection:", exc_info=True)
 
-        # Connection dropped
-        if was_connected:
-            logger.warning("Connection lost.")
-            console.print("[red]Connection lost![/red]")
-            was_connected = False
+async def async_main_loop(adb_device_client: IAdbDeviceClient, adb_controller: IAdbController):
+    change_detector = FrameChangeDetector()
+    frame_memo = FrameMemo(change_detector, lru_size=Settings.FRAME_MEMO_LRU_SIZE)
+    bot_loop = AsyncBotLoop(
+        AsyncAdbDeviceClient(adb_device_client),
+        AsyncAdbController(adb_controller),
+        BotRunner(
+            adb_controller,
+            change_detector=change_detector,
+            frame_memo=frame_memo,
+            profiler=get_slow_cycle_profiler()
+        )
+    )
+    console.print("[pink3]Starting bot services (async).[/pink3]")
+    await bot_loop.run()
 
-        logger.warning(f"Retrying in {Settings.CYCLE_SECONDS} seconds...")
-        console.print(f"[red]Retrying in {Settings.CYCLE_SECONDS} seconds...[/red]")
-        time.sleep(Settings.CYCLE_SECONDS)
-    
 
 # main
 if __name__ == "__main__":
+    if metrics.enabled:
+        MetricsExporter(
+            metrics,
+            Settings.METRICS_EXPORT_INTERVAL_SECONDS,
+            json_path=METRICS_JSON_FILE,
+            prometheus_path=METRICS_PROMETHEUS_FILE
+        ).start()
+
+    if Settings.FLEET_ADDRS:
+        try:
+            asyncio.run(FleetRunner(Settings.FLEET_ADDRS, vision_workers=Settings.FLEET_VISION_WORKERS).run())
+        except Exception:
+            logger.error("Exiting.. Unexpected error in fleet runner:", exc_info=True)
+        quit()
+
     try:
-        adb_device_client = AdbDeviceClient(addr=Settings.ADDR)
+        adb_device_client: IAdbDeviceClient = AdbDeviceClient(addr=Settings.ADDR, liveness_ttl=Settings.ADB_LIVENESS_TTL_SECONDS)
         adb_device_client.connect()
+        if Settings.ADB_RECORD_SESSION_DIR:
+            adb_device_client = RecordingAdbDeviceClient(adb_device_client, Path(Settings.ADB_RECORD_SESSION_DIR))
+            console.print(f"[pink3]Recording adb session to {Settings.ADB_RECORD_SESSION_DIR}[/pink3]")
         adb_controller = AdbController(adb_device_client)
         console.print("[green]Connected![/green]")
     except AdbDeviceClientConnectionTimeoutError as e:
@@ -69,7 +168,13 @@ if __name__ == "__main__":
         quit()
 
     try:
-        main_loop(adb_device_client, adb_controller) # type: ignore
+        if Settings.ASYNC_RUNTIME:
+            asyncio.run(async_main_loop(adb_device_client, adb_controller)) # type: ignore
+        else:
+            main_loop(adb_device_client, adb_controller) # type: ignore
     except Exception:
         logger.error("Exiting.. Unexpected error in main loop:", exc_info=True)
-        quit()
\ No newline at end of file
+        quit()
+    finally:
+        if isinstance(adb_device_client, RecordingAdbDeviceClient):
+            adb_device_client.close()
\ No newline at end of file
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules import each other from src (e.g. `from vision.card_index import ...`), as when running src/main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
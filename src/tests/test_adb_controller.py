@@ -0,0 +1,75 @@
+import re
+
+import numpy as np
+
+from adb.adb_controller import AdbController
+from adb.input_batch import InputBatch
+from adb.screen_change import ScreenChangeCondition
+from config.settings import Settings
+from core.point import Point
+from vision.layout import REFERENCE_RESOLUTION
+
+
+class FakeDeviceClient:
+    """Raw framebuffer device - a tap on redraw_pt repaints the watched region, any other tap changes nothing."""
+    def __init__(self, redraw_pt: Point):
+        width, height = REFERENCE_RESOLUTION
+        self.header = np.array([width, height, 1, 0], dtype="<u4").tobytes()
+        self.screen = np.zeros((height, width, 4), dtype=np.uint8)
+        self.redraw_tap = f"input tap {redraw_pt.x} {redraw_pt.y}"
+        self.shell_cmds: list[str] = []
+
+    def exec_out(self, cmd: str) -> bytes:
+        raw = self.header + self.screen.tobytes()
+        band = re.search(r"tail -c \+(\d+) \| head -c (\d+)", cmd)
+        if band is None:
+            return raw
+        start, length = int(band.group(1)) - 1, int(band.group(2))
+        return raw[start:start + length]
+
+    def shell_exc(self, cmd: str) -> str:
+        self.shell_cmds.append(cmd)
+        if self.redraw_tap in cmd.split("; "):
+            x1, y1, x2, y2 = Settings.CURRENT_SELECTED_PLANE_CLICK_REGION.to_tuple_x1_y1_x2_y2()
+            self.screen[y1:y2, x1:x2] = 255
+        return ""
+
+
+def test_confirm_ignores_changes_made_by_earlier_steps():
+    toggle_pt, confirmed_pt = Point(100, 200), Point(300, 400)
+    device_client = FakeDeviceClient(redraw_pt=toggle_pt)
+    adb_controller = AdbController(device_client)  # type: ignore[arg-type]
+    batch = InputBatch().tap(toggle_pt).wait(0.01).tap(confirmed_pt)
+    confirm = ScreenChangeCondition(Settings.CURRENT_SELECTED_PLANE_CLICK_REGION, timeout=0.1, poll_interval=0.01)
+
+    result = adb_controller.run_input_batch(batch, confirm=confirm)
+
+    # The toggle redrew the watched region before the confirmed tap - the confirmed tap itself changed nothing
+    assert result is not None and not result.settled
+    assert device_client.shell_cmds == ["input tap 100 200; sleep 0.010", "input tap 300 400"]
+
+
+def test_confirm_settles_on_change_made_by_confirmed_step():
+    toggle_pt, confirmed_pt = Point(100, 200), Point(300, 400)
+    device_client = FakeDeviceClient(redraw_pt=confirmed_pt)
+    adb_controller = AdbController(device_client)  # type: ignore[arg-type]
+    batch = InputBatch().tap(toggle_pt).tap(confirmed_pt)
+    confirm = ScreenChangeCondition(Settings.CURRENT_SELECTED_PLANE_CLICK_REGION, timeout=0.1, poll_interval=0.01)
+
+    result = adb_controller.run_input_batch(batch, confirm=confirm)
+
+    assert result is not None and result.settled
+    assert result.polls == 1
+
+
+def test_full_frame_watch_does_not_overwrite_screenshots():
+    device_client = FakeDeviceClient(redraw_pt=Point(100, 200))
+    adb_controller = AdbController(device_client)  # type: ignore[arg-type]
+    screenshot = adb_controller.get_screenshot()
+    owned = adb_controller.get_screenshot(out=np.empty_like(screenshot))
+
+    device_client.shell_exc("input tap 100 200")
+    watched = adb_controller.capture_watched_image(ScreenChangeCondition())
+
+    assert watched.any()
+    assert not screenshot.any() and not owned.any()
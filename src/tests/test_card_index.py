@@ -0,0 +1,94 @@
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from vision.card_index import CardHash, PlaneCardIndex, card_hash
+
+CARD_BACKGROUND = (60, 50, 40)
+
+
+def draw_card(flight: str, status: str) -> NDArray[np.uint8]:
+    card_img = np.full((124, 250, 3), CARD_BACKGROUND, dtype=np.uint8)
+    cv2.rectangle(card_img, (4, 4), (60, 60), (200, 200, 200), -1)
+    cv2.putText(card_img, flight, (70, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    cv2.putText(card_img, "Boeing 737", (70, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1)
+    cv2.putText(card_img, status, (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 255), 1)
+    return card_img
+
+
+def shift_card(card_img: NDArray[np.uint8], dy: int, dx: int) -> NDArray[np.uint8]:
+    """The card segmented dy rows / dx columns off."""
+    height, width = card_img.shape[:2]
+    shifted = np.full_like(card_img, CARD_BACKGROUND)
+    shifted[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] = \
+        card_img[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)]
+    return shifted
+
+
+def test_distinct_cards_do_not_collide():
+    cards = [
+        draw_card("AB123", "Ready for pushback"),
+        draw_card("AB128", "Ready for pushback"),  # one digit of the flight number
+        draw_card("AB123", "Ready for takeoff"),  # status line
+        draw_card("AB123", "Ready for pushbock"),  # one letter of the status
+    ]
+    index = PlaneCardIndex[int]()
+    records = [index.get_or_decode(card_img, lambda _, i=i: i) for i, card_img in enumerate(cards)]
+
+    assert [record.status for record in records] == [0, 1, 2, 3]
+    assert len({card_hash(card_img).text for card_img in cards}) == len(cards)
+    assert index.stats.misses == len(cards)
+    assert index.stats.hits == index.stats.near_hits == 0
+
+
+def test_identical_card_is_not_decoded_again():
+    index = PlaneCardIndex[str]()
+    decodes: list[str] = []
+
+    def decode(_: NDArray[np.uint8]) -> str:
+        decodes.append("decode")
+        return "pushback"
+
+    first = index.get_or_decode(draw_card("AB123", "Ready for pushback"), decode)
+    second = index.get_or_decode(draw_card("AB123", "Ready for pushback"), decode)
+
+    assert second is first
+    assert len(decodes) == 1
+    assert index.stats.hits == 1
+
+
+def test_shifted_or_animated_card_is_the_same_card():
+    card_img = draw_card("AB123", "Ready for pushback")
+    animated = card_img.copy()
+    cv2.circle(animated, (30, 30), 12, (0, 0, 255), -1)  # blinking light on the thumbnail
+    variants = [
+        shift_card(card_img, 1, 0),
+        shift_card(card_img, -1, 0),
+        shift_card(card_img, 0, 1),
+        card_img[1:],  # one row shorter
+        animated,
+    ]
+    index = PlaneCardIndex[str]()
+    decoded = index.get_or_decode(card_img, lambda _: "first")
+
+    records = [index.get_or_decode(variant, lambda _: "again") for variant in variants]
+
+    assert all(record is decoded for record in records)
+    assert index.stats.misses == 1
+
+
+def test_near_hits_do_not_drift_to_another_card():
+    # Each frame one more bit away from the decoded card - 1 bit per frame is a near hit,
+    # but the entry must stay keyed to its decode, not follow the drift
+    hashes = iter(CardHash(text=0, layout=layout) for layout in [0b0, 0b1, 0b11, 0b111])
+    index = PlaneCardIndex[str](max_distance=1, hash_fn=lambda _: next(hashes))
+    card_img = draw_card("AB123", "Ready for pushback")
+
+    decoded = index.get_or_decode(card_img, lambda _: "first")
+    near = index.get_or_decode(card_img, lambda _: "second")
+    drifted = index.get_or_decode(card_img, lambda _: "third")
+
+    assert near is decoded
+    assert drifted.status == "third"
+    assert decoded.card_hash.layout == 0b0
+    assert index.stats.near_hits == 1
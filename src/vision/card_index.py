@@ -0,0 +1,235 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import time
+from typing import Callable, Generic, NamedTuple, Optional, TypeVar
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from config.settings import Settings
+from core.region import Region
+
+from logger.metrics import metrics, VISION
+
+class CardIndexError(Exception):
+    pass
+
+
+S = TypeVar("S")
+
+HASH_BITS = 64
+_PHASH_SIZE = 32
+_PHASH_LOW_FREQUENCIES = 8
+
+
+def _to_gray(card_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    return card_img if card_img.ndim == 2 else cv2.cvtColor(card_img, cv2.COLOR_BGR2GRAY).astype(np.uint8, copy=False)
+
+def _pack_bits(bits: NDArray[np.bool_]) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+@metrics.timed(category=VISION)
+def phash(card_img: NDArray[np.uint8]) -> int:
+    """
+    64-bit DCT perceptual hash: low frequencies above / below their median - robust to small shifts and blinking pixels.
+    Short text lines only move a couple of bits, so cards differing in a flight number or status can be within a few bits.
+    """
+    if card_img.size == 0:
+        raise CardIndexError("Cannot hash an empty card image.")
+    small = cv2.resize(_to_gray(card_img), (_PHASH_SIZE, _PHASH_SIZE), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(small.astype(np.float32))[:_PHASH_LOW_FREQUENCIES, :_PHASH_LOW_FREQUENCIES]
+    # The DC term only carries brightness
+    return _pack_bits(low > np.median(low.ravel()[1:]))
+
+@metrics.timed(category=VISION)
+def dhash(card_img: NDArray[np.uint8]) -> int:
+    """64-bit difference hash: sign of horizontal gradients - cheaper than phash, less tolerant."""
+    if card_img.size == 0:
+        raise CardIndexError("Cannot hash an empty card image.")
+    small = cv2.resize(_to_gray(card_img), (9, 8), interpolation=cv2.INTER_AREA)
+    return _pack_bits(small[:, 1:] > small[:, :-1])
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return (hash_a ^ hash_b).bit_count()
+
+
+def _crop(card_img: NDArray[np.uint8], region: Region) -> NDArray[np.uint8]:
+    # Card space region, clamped to the card (crops differ by a row or two)
+    x1, y1, x2, y2 = region.to_tuple_x1_y1_x2_y2()
+    return card_img[y1:y2, x1:x2]
+
+
+class CardHash(NamedTuple):
+    text: int  # digest of the text ink - must match exactly
+    layout: int  # perceptual hash of the card, animated regions masked - matches within a Hamming distance
+
+
+@metrics.timed(category=VISION)
+def text_hash(
+    card_img: NDArray[np.uint8],
+    text_regions: list[Region] = Settings.PLANE_CARD_TEXT_REGIONS,
+    ink_contrast: int = Settings.PLANE_CARD_TEXT_INK_CONTRAST
+) -> int:
+    """
+    64-bit digest of the text ink: pixels of each text region deviating from its background (median)
+    by more than ink_contrast, cropped to their bounding box - so a 1px shift of the card is the same
+    text, while one changed digit or letter is another.
+    """
+    if card_img.size == 0:
+        raise CardIndexError("Cannot hash an empty card image.")
+    gray = _to_gray(card_img)
+    digest = hashlib.blake2b(digest_size=8)
+    for region in text_regions:
+        area = _crop(gray, region).astype(np.int16)
+        ink = np.abs(area - int(np.median(area))) > ink_contrast if area.size else np.zeros((0, 0), dtype=bool)
+        rows, cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+        # Bounding box of the ink - where the card was segmented doesn't matter
+        ink = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] if rows.size else ink[:0, :0]
+        digest.update(repr(ink.shape).encode())
+        digest.update(np.packbits(ink).tobytes())
+    return int.from_bytes(digest.digest(), "big")
+
+@metrics.timed(category=VISION)
+def card_hash(
+    card_img: NDArray[np.uint8],
+    animated_regions: list[Region] = Settings.PLANE_CARD_ANIMATED_REGIONS
+) -> CardHash:
+    """text_hash of the card and phash of it with animated_regions (card space) filled with the card median."""
+    if card_img.size == 0:
+        raise CardIndexError("Cannot hash an empty card image.")
+    gray = _to_gray(card_img)
+    layout = gray
+    if animated_regions:
+        layout = gray.copy()
+        background = int(np.median(gray))
+        for region in animated_regions:
+            _crop(layout, region)[:] = background
+    return CardHash(text_hash(gray), phash(layout))
+
+
+@dataclass
+class CardRecord(Generic[S]):
+    card_hash: CardHash
+    status: S
+    updated_at: float  # time.monotonic of the decode
+    last_action: Optional[str] = None
+    last_action_at: Optional[float] = None
+
+    def acted_within(self, action: str, seconds: float) -> bool:
+        return (
+            self.last_action == action
+            and self.last_action_at is not None
+            and time.monotonic() - self.last_action_at < seconds
+        )
+
+
+@dataclass
+class CardIndexStats:
+    hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / total if total else 0.0
+
+
+class PlaneCardIndex(Generic[S]):
+    """
+    Decoded status and last action of plane cards, keyed by card_hash of the card crop.
+
+    A card is an indexed one if its text ink is identical and its layout hash is within max_distance
+    bits: animated pixels and 1px segmentation shifts hit, while a changed flight number or status
+    misses and is decoded again. Entries keep the hash of their decode, so near hits can't drift
+    step by step to another card. Entries expire ttl seconds after their decode, and the least
+    recently used one is evicted past max_entries.
+    """
+    def __init__(
+        self,
+        max_entries: int = Settings.PLANE_CARD_INDEX_SIZE,
+        ttl: float = Settings.PLANE_CARD_INDEX_TTL_SECONDS,
+        max_distance: int = Settings.PLANE_CARD_HASH_MAX_DISTANCE,
+        hash_fn: Callable[[NDArray[np.uint8]], CardHash] = card_hash
+    ):
+        if not 0 <= max_distance < HASH_BITS:
+            raise CardIndexError(f"max_distance must be in [0, {HASH_BITS}), got {max_distance}.")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.hash_fn = hash_fn
+        self.stats = CardIndexStats()
+        self._entries: OrderedDict[CardHash, CardRecord[S]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, card_hash: CardHash) -> Optional[CardRecord[S]]:
+        """Record of the nearest indexed card with the same text within max_distance, None if there is none (or it expired)."""
+        key = self._find(card_hash)
+        if key is None:
+            self.stats.misses += 1
+            return None
+        record = self._entries[key]
+        if time.monotonic() - record.updated_at > self.ttl:
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        if key == card_hash:
+            self.stats.hits += 1
+        else:
+            self.stats.near_hits += 1
+        self._entries.move_to_end(key)
+        return record
+
+    def get_or_decode(self, card_img: NDArray[np.uint8], decode: Callable[[NDArray[np.uint8]], S]) -> CardRecord[S]:
+        """Record of the card, running decode only if no live near-identical card is indexed."""
+        card_hash = self.hash_fn(card_img)
+        record = self.lookup(card_hash)
+        if record is None:
+            record = self.store(card_hash, decode(card_img))
+        return record
+
+    def store(self, card_hash: CardHash, status: S) -> CardRecord[S]:
+        """Index a freshly decoded status, replacing any near-identical card (its last action is kept if the status is unchanged)."""
+        previous_key = self._find(card_hash)
+        previous = self._entries.pop(previous_key) if previous_key is not None else None
+        record = CardRecord(card_hash, status, time.monotonic())
+        if previous is not None and previous.status == status:
+            record.last_action = previous.last_action
+            record.last_action_at = previous.last_action_at
+        self._entries[card_hash] = record
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return record
+
+    def mark_action(self, card_hash: CardHash, action: str):
+        record = self._entries.get(card_hash)
+        if record is None:
+            raise CardIndexError(f"No indexed card {card_hash.text:016x}/{card_hash.layout:016x} to mark '{action}' on.")
+        record.last_action = action
+        record.last_action_at = time.monotonic()
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def _find(self, card_hash: CardHash) -> Optional[CardHash]:
+        if card_hash in self._entries:
+            return card_hash
+        if self.max_distance == 0:
+            return None
+        best_key, best_distance = None, self.max_distance + 1
+        for key in self._entries:
+            if key.text != card_hash.text:
+                continue
+            distance = hamming_distance(card_hash.layout, key.layout)
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
@@ -0,0 +1,134 @@
+from __future__ import annotations
+from typing import Optional, Union
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from core.region import Region
+
+from .layout import crop_layout_region, get_settings_regions
+
+from logger.metrics import metrics, VISION
+
+class ChangeDetectionError(Exception):
+    pass
+
+
+# Fingerprint: grey image downsampled so that each cell averages CELL x CELL pixels
+REGION_FINGERPRINT_CELL_SIZE = 8
+FRAME_FINGERPRINT_CELL_SIZE = 32
+# Max per-cell grey level difference still considered identical (compression / render noise)
+FINGERPRINT_DIFF_THRESHOLD = 6
+
+
+def compute_fingerprint(cv_img: NDArray[np.uint8], cell_size: int = REGION_FINGERPRINT_CELL_SIZE) -> NDArray[np.uint8]:
+    """Return a small grey fingerprint of a BGR image - INTER_AREA averages each cell."""
+    try:
+        height, width = cv_img.shape[:2]
+        size = (max(1, width // cell_size), max(1, height // cell_size))
+        small = cv2.resize(cv_img, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.uint8)
+    except Exception as e:
+        raise ChangeDetectionError("Failed to compute image fingerprint.") from e
+
+def is_fingerprint_changed(
+    prev: Optional[NDArray[np.uint8]],
+    curr: NDArray[np.uint8],
+    threshold: int = FINGERPRINT_DIFF_THRESHOLD
+) -> bool:
+    if prev is None or prev.shape != curr.shape:
+        return True
+    return bool(cv2.absdiff(prev, curr).max() > threshold)
+
+
+
+class _RegionFingerprint:
+    __slots__ = ("fingerprint", "observed_frame", "changed", "last_changed_frame")
+
+    def __init__(self, fingerprint: NDArray[np.uint8], frame_index: int):
+        self.fingerprint = fingerprint
+        self.observed_frame = frame_index
+        self.changed = True
+        self.last_changed_frame = frame_index
+
+
+class FrameChangeDetector:
+    """
+    Tracks per-region fingerprints across frames fed by update().
+
+    Region fingerprints are taken lazily on the first query of each frame and compared
+    against the last changed observation of the same region, so unqueried regions cost nothing.
+    A whole-frame fingerprint is taken on every update() for the `static` signal.
+    """
+    def __init__(
+        self,
+        regions: Optional[dict[str, Region]] = None,
+        threshold: int = FINGERPRINT_DIFF_THRESHOLD
+    ):
+        self.regions: dict[str, Region] = get_settings_regions() if regions is None else regions
+        self.threshold = threshold
+        self.frame_index = 0
+        self.static_frames = 0
+        # frame_index of the last frame that differed from its predecessor
+        self.last_changed_frame = 0
+        self._frame: Optional[NDArray[np.uint8]] = None
+        self._frame_fingerprint: Optional[NDArray[np.uint8]] = None
+        self._region_fingerprints: dict[Region, _RegionFingerprint] = {}
+
+    @metrics.timed(category=VISION)
+    def update(self, cv_img: NDArray[np.uint8]):
+        """Feed a new frame (BGR). The detector keeps a reference, not a copy."""
+        frame_fingerprint = compute_fingerprint(cv_img, FRAME_FINGERPRINT_CELL_SIZE)
+        self.frame_index += 1
+        if is_fingerprint_changed(self._frame_fingerprint, frame_fingerprint, self.threshold):
+            self.static_frames = 0
+            self.last_changed_frame = self.frame_index
+        else:
+            self.static_frames += 1
+        self._frame_fingerprint = frame_fingerprint
+        self._frame = cv_img
+
+    def is_static(self) -> bool:
+        """True if the whole frame is identical to the previous one."""
+        return self.static_frames > 0
+
+    def frame_changed_since(self, frame_index: int) -> bool:
+        """True if the whole frame changed after frame_index."""
+        return self.last_changed_frame > frame_index
+
+    def changed(self, region: Union[Region, str]) -> bool:
+        """True if the region differs from its last observation (always True on first sight)."""
+        return self._observe(self._resolve_region(region)).changed
+
+    def changed_since(self, region: Union[Region, str], frame_index: int) -> bool:
+        """True if the region changed after frame_index (a value of `frame_index` at that time)."""
+        return self._observe(self._resolve_region(region)).last_changed_frame > frame_index
+
+    def _resolve_region(self, region: Union[Region, str]) -> Region:
+        if isinstance(region, Region):
+            return region
+        try:
+            return self.regions[region]
+        except KeyError as e:
+            raise ChangeDetectionError(f"Unknown region name: {region}.") from e
+
+    def _observe(self, region: Region) -> _RegionFingerprint:
+        if self._frame is None:
+            raise ChangeDetectionError("No frame to detect changes on - call update() first.")
+        state = self._region_fingerprints.get(region)
+        if state is not None and state.observed_frame == self.frame_index:
+            return state
+
+        fingerprint = compute_fingerprint(crop_layout_region(self._frame, region))
+        if state is None:
+            state = _RegionFingerprint(fingerprint, self.frame_index)
+            self._region_fingerprints[region] = state
+            return state
+
+        state.changed = is_fingerprint_changed(state.fingerprint, fingerprint, self.threshold)
+        if state.changed:
+            # Keep the reference fingerprint until a change is seen, so slow drift still accumulates
+            state.fingerprint = fingerprint
+            state.last_changed_frame = self.frame_index
+        state.observed_frame = self.frame_index
+        return state
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
+
+from core.point import Point
+from core.point_set import PointSet
+from core.region import Region
+from core.region_set import RegionSet
+
+from config.settings import Settings
+
+from . import recognition
+from .layout import crop_layout_region_at_reference
+from .change_detection import compute_fingerprint, is_fingerprint_changed
+
+from logger.metrics import metrics, VISION
+
+class FilterColumnLayoutError(Exception):
+    pass
+
+
+# Icon crop boxes, in filter column coordinates
+SINGLE_FILTER_ICON_CROP_REGION = Region(Point(0, 0), Point(110, 90))
+FILTER_ICON_CROP_ABOVE_CENTRE = 45
+FILTER_ICON_CROP_BELOW_CENTRE = 35
+
+@dataclass(frozen=True, slots=True)
+class FilterColumnLayout:
+    icon_ctr_coordinates: PointSet  # layout space (tap hitboxes)
+    icon_crop_regions: RegionSet  # filter column coordinates, at reference size
+
+
+@dataclass
+class FilterColumnLayoutStats:
+    hough_runs: int = 0
+    cache_hits: int = 0
+
+
+def build_filter_column_layout(circles: NDArray[np.int32], column_region: Region) -> FilterColumnLayout:
+    """Map detected (x, y, r) circles of the 1-icon (collapsed) or 10-icon (expanded) layout to icon centres and crops."""
+    x0, y0, _, _ = column_region.to_tuple_x1_y1_x2_y2()
+    column_height = int(column_region.height())
+    if len(circles) == 1:
+        # Only one circle found, check its position.
+        centre = Point(int(circles[0, 0]), int(circles[0, 1]))
+        if not SINGLE_FILTER_ICON_CROP_REGION.contains(centre):
+            raise FilterColumnLayoutError("Filter Icon not in recognized position.")
+        crop_regions = RegionSet.from_regions([SINGLE_FILTER_ICON_CROP_REGION])
+    elif len(circles) == 10:
+        ys = circles[:, 1].astype(np.int64)
+        crop_regions = RegionSet(np.column_stack((
+            np.zeros_like(ys),
+            np.maximum(0, ys - FILTER_ICON_CROP_ABOVE_CENTRE),
+            np.full_like(ys, SINGLE_FILTER_ICON_CROP_REGION.to_tuple_x1_y1_x2_y2()[2]),
+            np.minimum(column_height, ys + FILTER_ICON_CROP_BELOW_CENTRE)
+        )))
+    else:
+        raise FilterColumnLayoutError(f"Number of filter column's icon isn't considered: {len(circles)}.")
+
+    icon_ctr_coordinates = PointSet(circles[:, :2].astype(np.int64)).translate(x0, y0)
+    return FilterColumnLayout(icon_ctr_coordinates, crop_regions)
+
+
+class FilterColumnLayoutDetector:
+    """
+    Detects the filter column layout with HoughCircles once and caches it.
+    While the column fingerprint matches the one the layout was detected on,
+    detect() is a cache lookup - Hough only re-runs when the column changes.
+    """
+    def __init__(self, column_region: Region = Settings.PLANE_FILTER_REGION):
+        self.column_region = column_region
+        self.stats = FilterColumnLayoutStats()
+        self._layout: Optional[FilterColumnLayout] = None
+        self._fingerprint: Optional[NDArray[np.uint8]] = None
+
+    def crop_column(self, cv_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        """The filter column of a frame of any resolution, at reference size (Hough radii / crop boxes are in reference pixels)."""
+        return crop_layout_region_at_reference(cv_img, self.column_region)
+
+    @metrics.timed(category=VISION)
+    def detect(self, cv_img: NDArray[np.uint8]) -> FilterColumnLayout:
+        try:
+            column_img = self.crop_column(cv_img)
+            fingerprint = compute_fingerprint(column_img)
+            if self._layout is not None and not is_fingerprint_changed(self._fingerprint, fingerprint):
+                self.stats.cache_hits += 1
+                return self._layout
+
+            self.stats.hough_runs += 1
+            self._layout = None
+            layout = build_filter_column_layout(recognition.recognise_filter_icon_circles(column_img), self.column_region)
+            self._layout, self._fingerprint = layout, fingerprint
+            return layout
+        except Exception as e:
+            raise FilterColumnLayoutError("Failed to detect filter column layout.") from e
+
+    def invalidate(self):
+        self._layout = None
+        self._fingerprint = None
@@ -0,0 +1,19 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import itertools
+import time
+import numpy as np
+from numpy.typing import NDArray
+
+_frame_id_counter = itertools.count(1)
+
+def next_frame_id() -> int:
+    """Return a process-wide, monotonically increasing frame id."""
+    return next(_frame_id_counter)
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """A captured BGR screenshot tagged with its frame id and capture time (time.monotonic)."""
+    image: NDArray[np.uint8]
+    frame_id: int = field(default_factory=next_frame_id)
+    captured_at: float = field(default_factory=time.monotonic)
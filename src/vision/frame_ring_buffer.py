@@ -0,0 +1,107 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
+
+from .frame import Frame, next_frame_id
+
+class FrameRingBufferError(Exception):
+    pass
+
+
+class FrameRingBuffer:
+    """
+    Fixed ring of reusable BGR frame buffers filled by one producer thread.
+
+    The producer writes into the oldest slot that is neither the newest frame nor pinned
+    by a reader. Readers get a pinned Frame (no copy) and release() it when done, so a
+    frame is never overwritten while in use. Needs capacity >= readers + 2.
+    """
+    def __init__(self, capacity: int = 4):
+        if capacity < 3:
+            raise FrameRingBufferError("Frame ring buffer needs a capacity of at least 3.")
+        self.capacity = capacity
+        self._buffers: list[Optional[NDArray[np.uint8]]] = [None] * capacity
+        self._frames: list[Optional[Frame]] = [None] * capacity
+        self._pins = [0] * capacity
+        self._writing: Optional[int] = None
+        self._newest: Optional[int] = None
+        self._condition = threading.Condition()
+
+    # Producer side
+    def acquire_write_slot(self) -> tuple[int, Optional[NDArray[np.uint8]]]:
+        """Return (slot, buffer to capture into - None until the slot's first frame)."""
+        with self._condition:
+            if self._writing is not None:
+                raise FrameRingBufferError("A write slot is already acquired.")
+            candidates = [
+                slot for slot in range(self.capacity)
+                if slot != self._newest and self._pins[slot] == 0
+            ]
+            if not candidates:
+                raise FrameRingBufferError("No free slot - all frames are pinned by readers.")
+            slot = min(candidates, key=self._slot_captured_at)
+            self._frames[slot] = None
+            self._writing = slot
+            return slot, self._buffers[slot]
+
+    def commit(self, slot: int, image: NDArray[np.uint8], captured_at: float):
+        """Publish the frame written into slot (image may be a newly allocated buffer)."""
+        with self._condition:
+            self._check_writing(slot)
+            self._buffers[slot] = image
+            self._frames[slot] = Frame(image, next_frame_id(), captured_at)
+            self._newest = slot
+            self._writing = None
+            self._condition.notify_all()
+
+    def abort(self, slot: int):
+        with self._condition:
+            self._check_writing(slot)
+            self._writing = None
+
+    def _check_writing(self, slot: int):
+        if self._writing != slot:
+            raise FrameRingBufferError(f"Slot {slot} is not the acquired write slot.")
+
+    # Reader side
+    def latest(self) -> Optional[Frame]:
+        """Return the newest complete frame, pinned (release() it), or None if no frame yet."""
+        with self._condition:
+            return self._pin_newest()
+
+    def wait_for_newer(self, captured_after: float, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        Wait for a frame captured after captured_after (time.monotonic, e.g. the last tap)
+        and return it pinned, or None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                newest = self._frames[self._newest] if self._newest is not None else None
+                if newest is not None and newest.captured_at > captured_after:
+                    return self._pin_newest()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def release(self, frame: Frame):
+        with self._condition:
+            for slot, slot_frame in enumerate(self._frames):
+                if slot_frame is not None and slot_frame.frame_id == frame.frame_id:
+                    self._pins[slot] = max(0, self._pins[slot] - 1)
+                    return
+
+    def _slot_captured_at(self, slot: int) -> float:
+        # Oldest first, never written slots before all
+        frame = self._frames[slot]
+        return frame.captured_at if frame is not None else -1.0
+
+    def _pin_newest(self) -> Optional[Frame]:
+        if self._newest is None:
+            return None
+        self._pins[self._newest] += 1
+        return self._frames[self._newest]
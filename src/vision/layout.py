@@ -0,0 +1,148 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cache
+import math
+from typing import Optional, Union
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from core.interfaces import IRegion
+from core.point import Point
+from core.region import Region
+
+from config.settings import Settings
+
+class LayoutError(Exception):
+    pass
+
+
+# Resolution every Region / Point in Settings is authored at ("layout space")
+REFERENCE_RESOLUTION = (1920, 1080)
+# Absorbs float error of fraction * size, so exact pixel edges don't round outwards
+_EDGE_EPSILON = 1e-6
+
+
+def get_settings_regions() -> dict[str, Region]:
+    """Return every named Region defined on Settings."""
+    return {name: value for name, value in vars(Settings).items() if isinstance(value, Region)}
+
+
+@dataclass(frozen=True, slots=True)
+class NormalizedRegion:
+    """Region as fractions (0-1) of the screen width / height - resolution independent."""
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+
+    @classmethod
+    def from_region(cls, region: IRegion, resolution: tuple[int, int] = REFERENCE_RESOLUTION) -> NormalizedRegion:
+        width, height = resolution
+        x1, y1, x2, y2 = region.to_tuple_x1_y1_x2_y2()
+        return cls(x1 / width, y1 / height, x2 / width, y2 / height)
+
+    def to_slices(self, width: int, height: int) -> tuple[slice, slice]:
+        """(rows, columns) slices covering the region at width x height - outer pixel edges included."""
+        return (
+            slice(max(0, math.floor(self.y1 * height + _EDGE_EPSILON)), min(height, math.ceil(self.y2 * height - _EDGE_EPSILON))),
+            slice(max(0, math.floor(self.x1 * width + _EDGE_EPSILON)), min(width, math.ceil(self.x2 * width - _EDGE_EPSILON))),
+        )
+
+    def to_region(self, width: int, height: int) -> Region:
+        rows, columns = self.to_slices(width, height)
+        return Region(Point(columns.start, rows.start), Point(columns.stop, rows.stop))
+
+
+class LayoutProfile:
+    """
+    The Settings layout resolved for one resolution.
+
+    Named Settings regions are precomputed into a slice table, so cropping them out of a
+    frame of this resolution is a view, not a computation. Points and regions convert
+    between layout space (REFERENCE_RESOLUTION) and this resolution in both directions.
+    """
+    def __init__(self, width: int, height: int, regions: Optional[dict[str, Region]] = None):
+        if width <= 0 or height <= 0:
+            raise LayoutError(f"Invalid layout resolution {width}x{height}.")
+        self.width = width
+        self.height = height
+        self.scale_x = width / REFERENCE_RESOLUTION[0]
+        self.scale_y = height / REFERENCE_RESOLUTION[1]
+        self.is_reference = (width, height) == REFERENCE_RESOLUTION
+        regions = get_settings_regions() if regions is None else regions
+        self.normalized_regions = {name: NormalizedRegion.from_region(region) for name, region in regions.items()}
+        self.slice_table = {name: region.to_slices(width, height) for name, region in self.normalized_regions.items()}
+
+    def slices(self, region: Union[IRegion, str]) -> tuple[slice, slice]:
+        if isinstance(region, str):
+            try:
+                return self.slice_table[region]
+            except KeyError as e:
+                raise LayoutError(f"Unknown region name: {region}.") from e
+        return NormalizedRegion.from_region(region).to_slices(self.width, self.height)
+
+    def crop(self, cv_img: NDArray[np.uint8], region: Union[IRegion, str]) -> NDArray[np.uint8]:
+        """View of a layout space region in a frame of this resolution."""
+        if cv_img.shape[:2] != (self.height, self.width):
+            raise LayoutError(f"Frame of shape {cv_img.shape} does not match layout {self.width}x{self.height}.")
+        cropped_img = cv_img[self.slices(region)]
+        if cropped_img.size == 0:
+            raise LayoutError(f"Cropped image is empty. Check input region: {region}.")
+        return cropped_img
+
+    def region(self, region: Region) -> Region:
+        """Layout space region -> this resolution."""
+        if self.is_reference:
+            return region
+        return NormalizedRegion.from_region(region).to_region(self.width, self.height)
+
+    def point(self, pt: Point) -> Point:
+        """Layout space point -> this resolution (e.g. a Settings tap target -> device)."""
+        if self.is_reference:
+            return pt
+        return Point(round(pt.x * self.scale_x), round(pt.y * self.scale_y))
+
+    def to_reference(self, pt: Point) -> Point:
+        """Point at this resolution (e.g. detected in a downscaled frame) -> layout space."""
+        if self.is_reference:
+            return pt
+        return Point(round(pt.x / self.scale_x), round(pt.y / self.scale_y))
+
+    def resize(self, cv_img: NDArray[np.uint8], dst: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint8]:
+        """Resize a frame to this resolution (INTER_AREA), into dst when its shape matches."""
+        shape = (self.height, self.width) + cv_img.shape[2:]
+        if cv_img.shape == shape:
+            return cv_img
+        if dst is None or dst.shape != shape or dst.dtype != cv_img.dtype:
+            dst = np.empty(shape, dtype=cv_img.dtype)
+        cv2.resize(cv_img, (self.width, self.height), dst=dst, interpolation=cv2.INTER_AREA)
+        return dst
+
+
+@cache
+def get_layout_profile(width: int, height: int) -> LayoutProfile:
+    return LayoutProfile(width, height)
+
+def get_frame_layout(cv_img: NDArray[np.uint8]) -> LayoutProfile:
+    height, width = cv_img.shape[:2]
+    return get_layout_profile(width, height)
+
+def get_scaled_layout(width: int, height: int, scale: float) -> LayoutProfile:
+    """Profile for frames of width x height downscaled by scale (e.g. 0.5: 1920x1080 -> 960x540)."""
+    return get_layout_profile(max(1, round(width * scale)), max(1, round(height * scale)))
+
+def crop_layout_region(cv_img: NDArray[np.uint8], region: Union[IRegion, str]) -> NDArray[np.uint8]:
+    """Crop a layout space (Settings) region out of a frame of any resolution."""
+    return get_frame_layout(cv_img).crop(cv_img, region)
+
+def crop_layout_region_at_reference(cv_img: NDArray[np.uint8], region: IRegion) -> NDArray[np.uint8]:
+    """
+    Crop a layout space region and bring it to its reference size, for recognisers
+    with pixel-size dependent parameters (Hough radii, fixed crop boxes).
+    """
+    cropped_img = crop_layout_region(cv_img, region)
+    x1, y1, x2, y2 = region.to_tuple_x1_y1_x2_y2()
+    if cropped_img.shape[:2] == (y2 - y1, x2 - x1):
+        return cropped_img
+    return cv2.resize(cropped_img, (x2 - x1, y2 - y1), interpolation=cv2.INTER_LINEAR).astype(np.uint8)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, TypeVar
+import numpy as np
+from numpy.typing import NDArray
+
+from core.region import Region
+
+from .change_detection import FrameChangeDetector
+from .frame import Frame
+
+T = TypeVar("T")
+
+class MemoError(Exception):
+    pass
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    lru_hits: int = 0
+    misses: int = 0
+    frame_evictions: int = 0
+    lru_evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.lru_hits + self.misses
+        return (self.hits + self.lru_hits) / total if total else 0.0
+
+
+class FrameMemo:
+    """
+    Memoizes pure extraction functions of (frame, region), keyed on (function, frame_id, region).
+
+    Entries of the current frame are dropped when a frame with a new id arrives.
+    With lru_size > 0 and a change detector, up to lru_size results are also kept across
+    frames and reused while the change fingerprint of their region is unchanged.
+    The change detector must be fed the same frames (FrameChangeDetector.update).
+    """
+    def __init__(self, change_detector: Optional[FrameChangeDetector] = None, lru_size: int = 0):
+        if lru_size > 0 and change_detector is None:
+            raise MemoError("A cross-frame LRU requires a change detector.")
+        self.change_detector = change_detector
+        self.lru_size = lru_size
+        self.stats = MemoStats()
+        self._frame_id: Optional[int] = None
+        self._frame_entries: dict[tuple[Hashable, Region], Any] = {}
+        # (fn, region) -> (change detector frame_index computed at, result)
+        self._lru: OrderedDict[tuple[Hashable, Region], tuple[int, Any]] = OrderedDict()
+
+    def get_or_compute(self, fn: Callable[[NDArray[np.uint8]], T], frame: Frame, region: Region) -> T:
+        """Return fn(frame.image), where region is the area of the frame fn depends on."""
+        if frame.frame_id != self._frame_id:
+            self._start_frame(frame.frame_id)
+
+        key = (fn, region)
+        if key in self._frame_entries:
+            self.stats.hits += 1
+            return self._frame_entries[key]
+
+        if self.lru_size > 0 and self.change_detector is not None:
+            cached = self._lru.get(key)
+            if cached is not None and not self.change_detector.changed_since(region, cached[0]):
+                self._lru.move_to_end(key)
+                self.stats.lru_hits += 1
+                self._frame_entries[key] = cached[1]
+                return cached[1]
+
+        self.stats.misses += 1
+        result = fn(frame.image)
+        self._frame_entries[key] = result
+        if self.lru_size > 0 and self.change_detector is not None:
+            self.change_detector.changed(region)  # fingerprint the region this result was computed on
+            self._lru[key] = (self.change_detector.frame_index, result)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+                self.stats.lru_evictions += 1
+        return result
+
+    def clear(self):
+        self._frame_id = None
+        self._frame_entries.clear()
+        self._lru.clear()
+
+    def _start_frame(self, frame_id: int):
+        self.stats.frame_evictions += len(self._frame_entries)
+        self._frame_entries.clear()
+        self._frame_id = frame_id
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from core.region import Region
+
+from config.paths import GLYPHS_DIR
+from config.settings import Settings
+
+from .layout import crop_layout_region
+
+from logger.logger import setup_logger, logging
+from logger.metrics import metrics, VISION
+logger = setup_logger(__name__, level=logging.ERROR)
+
+try:
+    import pytesseract  # type: ignore
+except ImportError:  # optional - only needed for glyphs missing from the glyph bank
+    pytesseract = None
+
+class OCRError(Exception):
+    pass
+
+
+GLYPH_SIZE = (12, 16)  # (width, height) every glyph is normalised to
+# Max mean abs difference (0-255) between a glyph and a bank sample to accept the match
+GLYPH_MATCH_THRESHOLD = 40.0
+# Glyph sample file name prefix -> character, e.g. "7_0.png", "slash_0.png"
+GLYPH_FILE_LABELS = {str(d): str(d) for d in range(10)} | {"slash": "/", "comma": ","}
+TESSERACT_CONFIG = "--psm 10 -c tessedit_char_whitelist=0123456789/,"
+# Tesseract answers (0-100 confidence) below this are used for the read but not learned into the glyph bank
+TESSERACT_LEARN_MIN_CONFIDENCE = 90.0
+
+
+def binarize_text(cv_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Otsu-threshold a BGR crop into a 0/255 mask with the text (minority) as foreground."""
+    grey = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY) if cv_img.ndim == 3 else cv_img
+    _, binary = cv2.threshold(grey, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary.astype(np.uint8)
+
+def normalize_glyph(binary_glyph: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """
+    Fit a glyph cut at line height into GLYPH_SIZE, keeping its aspect ratio.
+    The glyph spans the whole line, so its vertical position (baseline) is kept too -
+    a "1" stays thin and a "," stays low instead of both becoming full blocks.
+    """
+    height, width = binary_glyph.shape[:2]
+    target_width, target_height = GLYPH_SIZE
+    scale = min(target_width / width, target_height / height)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    resized = cv2.resize(binary_glyph, size, interpolation=cv2.INTER_AREA)
+    normalized = np.zeros((target_height, target_width), dtype=np.uint8)
+    x0, y0 = (target_width - size[0]) // 2, (target_height - size[1]) // 2
+    normalized[y0:y0 + size[1], x0:x0 + size[0]] = resized
+    return normalized
+
+def segment_glyphs(binary: NDArray[np.uint8]) -> list[NDArray[np.uint8]]:
+    """Split a binarized text line into glyphs at empty columns, all cut to the line's inked rows."""
+    rows_with_ink = np.flatnonzero(binary.any(axis=1))
+    if len(rows_with_ink) == 0:
+        return []
+    binary = binary[rows_with_ink[0]:rows_with_ink[-1] + 1]
+    columns_with_ink = np.flatnonzero(binary.any(axis=0))
+    if len(columns_with_ink) == 0:
+        return []
+    # Runs of consecutive inked columns
+    breaks = np.flatnonzero(np.diff(columns_with_ink) > 1)
+    starts = np.concatenate(([columns_with_ink[0]], columns_with_ink[breaks + 1]))
+    ends = np.concatenate((columns_with_ink[breaks], [columns_with_ink[-1]])) + 1
+
+    return [binary[:, start:end] for start, end in zip(starts, ends)]
+
+
+class GlyphBank:
+    """
+    Normalised glyph samples of the game's fixed font, loaded from `<label>_<n>.png` files
+    (one glyph cropped at the full text line height). Glyphs the tesseract fallback reads
+    confidently are added at runtime, so each unknown glyph costs one tesseract call per process.
+    """
+    def __init__(self, glyphs_dir: Optional[Path] = None):
+        self.labels: list[str] = []
+        self._samples = np.empty((0, GLYPH_SIZE[1], GLYPH_SIZE[0]), dtype=np.float32)
+        if glyphs_dir is not None and glyphs_dir.exists():
+            for path in sorted(glyphs_dir.glob("*.png")):
+                label = GLYPH_FILE_LABELS.get(path.stem.split("_")[0])
+                sample = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+                if label is None or sample is None:
+                    logger.warning(f"Skipped glyph sample {path}.")
+                    continue
+                self.add(label, normalize_glyph(binarize_text(sample.astype(np.uint8))))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, label: str, normalized_glyph: NDArray[np.uint8]):
+        self.labels.append(label)
+        self._samples = np.concatenate((self._samples, normalized_glyph[None].astype(np.float32)))
+
+    def match(self, normalized_glyph: NDArray[np.uint8]) -> Optional[str]:
+        if not self.labels:
+            return None
+        distances = np.abs(self._samples - normalized_glyph.astype(np.float32)).mean(axis=(1, 2))
+        best = int(distances.argmin())
+        return self.labels[best] if distances[best] <= GLYPH_MATCH_THRESHOLD else None
+
+
+def recognise_glyph_with_tesseract(binary_glyph: NDArray[np.uint8]) -> Optional[tuple[str, float]]:
+    """(character, confidence 0-100) of a single glyph, None if tesseract is missing or read no single character."""
+    if pytesseract is None:
+        return None
+    # Dark text on a white, padded background reads best
+    padded = cv2.copyMakeBorder(cv2.bitwise_not(binary_glyph), 8, 8, 8, 8, cv2.BORDER_CONSTANT, value=255)
+    data = pytesseract.image_to_data(padded, config=TESSERACT_CONFIG, output_type=pytesseract.Output.DICT)
+    words = [(text.strip(), float(conf)) for text, conf in zip(data["text"], data["conf"]) if text.strip()]
+    if len(words) != 1 or len(words[0][0]) != 1:
+        return None
+    return words[0]
+
+
+class DigitReader:
+    """
+    Reads fixed-font numbers: segment glyphs, match against the glyph bank,
+    tesseract only for unknown glyphs. The last text per ROI is cached against the
+    ROI's binarized fingerprint, so unchanged counters are never re-read.
+    """
+    def __init__(self, glyph_bank: GlyphBank):
+        self.glyph_bank = glyph_bank
+        self.cache_hits = 0
+        self.reads = 0
+        self.tesseract_calls = 0
+        self.low_confidence_reads = 0
+        self._roi_cache: dict[Region, tuple[bytes, Optional[str]]] = {}
+
+    def read_text(self, cv_img: NDArray[np.uint8], region: Region) -> Optional[str]:
+        """Return the text in region (layout space) of the frame, None if any glyph is unrecognised."""
+        try:
+            binary = binarize_text(crop_layout_region(cv_img, region))
+            fingerprint = hashlib.blake2b(binary.tobytes(), digest_size=16).digest()
+            cached = self._roi_cache.get(region)
+            if cached is not None and cached[0] == fingerprint:
+                self.cache_hits += 1
+                return cached[1]
+
+            self.reads += 1
+            text = self._read_glyphs(segment_glyphs(binary))
+            self._roi_cache[region] = (fingerprint, text)
+            return text
+        except Exception as e:
+            raise OCRError(f"Failed to read text in region {region}.") from e
+
+    def read_int(self, cv_img: NDArray[np.uint8], region: Region) -> Optional[int]:
+        return parse_int(self.read_text(cv_img, region))
+
+    def _read_glyphs(self, glyphs: list[NDArray[np.uint8]]) -> Optional[str]:
+        chars: list[str] = []
+        for glyph in glyphs:
+            normalized = normalize_glyph(glyph)
+            char = self.glyph_bank.match(normalized)
+            if char is None:
+                self.tesseract_calls += 1
+                recognised = recognise_glyph_with_tesseract(glyph)
+                if recognised is None:
+                    return None
+                char, confidence = recognised
+                # A learned misread would poison every later read of that glyph
+                if confidence >= TESSERACT_LEARN_MIN_CONFIDENCE:
+                    self.glyph_bank.add(char, normalized)
+                else:
+                    self.low_confidence_reads += 1
+            chars.append(char)
+        return "".join(chars) if chars else None
+
+
+def parse_int(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    digits = text.replace(",", "")
+    return int(digits) if digits.isdigit() else None
+
+def parse_fraction(text: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """Parse 'used/max' into (used, max)."""
+    if text is None or text.count("/") != 1:
+        return None, None
+    numerator, denominator = text.split("/")
+    return parse_int(numerator), parse_int(denominator)
+
+
+@metrics.timed(category=VISION)
+def read_airport_counters(cv_img: NDArray[np.uint8], reader: DigitReader) -> dict[str, Optional[int]]:
+    """
+    Read all airport HUD counters, keyed by AirportState field name.
+    Unreadable counters are None.
+    """
+    used_workers, max_workers = parse_fraction(reader.read_text(cv_img, Settings.AIRPORT_WORKERS_REGION))
+    return {
+        "gold": reader.read_int(cv_img, Settings.AIRPORT_GOLD_REGION),
+        "silver": reader.read_int(cv_img, Settings.AIRPORT_SILVER_REGION),
+        "currency": reader.read_int(cv_img, Settings.AIRPORT_CURRENCY_REGION),
+        "used_workers": used_workers,
+        "max_workers": max_workers,
+    }
+
+
+def get_default_digit_reader() -> DigitReader:
+    """Digit reader over the glyph samples in GLYPHS_DIR - keep one per device, its glyph bank and ROI cache are not thread-safe."""
+    return DigitReader(GlyphBank(GLYPHS_DIR))
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import json
+from pathlib import Path
+from typing import Collection, Optional
+import numpy as np
+from numpy.typing import NDArray
+
+from core.point import Point
+
+from config.paths import PAGE_PROBES_FILE
+
+from .layout import REFERENCE_RESOLUTION, get_frame_layout
+
+from logger.logger import setup_logger, logging
+from logger.metrics import metrics, VISION
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class PixelProbeError(Exception):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class PixelProbe:
+    """Expect the pixel at pt to be within tolerance (per channel) of bgr."""
+    pt: Point
+    bgr: tuple[int, int, int]
+    tolerance: int = 10
+
+
+class PixelProbeRuleSet:
+    """
+    Label -> probes rules compiled into index arrays, so a single NumPy gather
+    evaluates every probe of every label at once.
+    A label matches when all of its probes pass; labels without probes never match.
+
+    Data file format (JSON), labels in priority order:
+        {"AIRPORT": [{"pt": [x, y], "bgr": [b, g, r], "tolerance": 12}, ...], ...}
+    """
+    def __init__(self, rules: dict[str, list[PixelProbe]]):
+        for label, label_probes in rules.items():
+            for probe in label_probes:
+                _validate_probe(label, probe)
+        self.labels: list[str] = [label for label, probes in rules.items() if probes]
+        probes = [(i, probe) for i, label in enumerate(self.labels) for probe in rules[label]]
+        self._xs = np.array([int(p.pt.x) for _, p in probes], dtype=np.intp)
+        self._ys = np.array([int(p.pt.y) for _, p in probes], dtype=np.intp)
+        self._expected = np.array([p.bgr for _, p in probes], dtype=np.int16).reshape(-1, 3)
+        self._tolerance = np.array([p.tolerance for _, p in probes], dtype=np.int16)
+        self._owner = np.array([i for i, _ in probes], dtype=np.intp)
+        # (frame height, width) -> probe (ys, xs) at that resolution - probes are authored in layout space
+        self._indices: dict[tuple[int, int], tuple[NDArray[np.intp], NDArray[np.intp]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def load(cls, path: Path, labels: Optional[Collection[str]] = None) -> PixelProbeRuleSet:
+        """Load rules from a data file. With labels, any other label in the file is an error."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            rules = {
+                label: [
+                    PixelProbe(Point(*probe["pt"]), tuple(probe["bgr"]), probe.get("tolerance", 10))
+                    for probe in probes
+                ]
+                for label, probes in data.items()
+            }
+        except Exception as e:
+            raise PixelProbeError(f"Failed to load pixel probe rules from {path}.") from e
+        if labels is not None:
+            unknown = [label for label in rules if label not in labels]
+            if unknown:
+                raise PixelProbeError(f"Unknown labels {unknown} in {path} - expected any of {sorted(labels)}.")
+        return cls(rules)
+
+    def evaluate(self, cv_img: NDArray[np.uint8]) -> NDArray[np.bool_]:
+        """Return, per label, whether all of its probes pass."""
+        if not self.labels:
+            return np.zeros(0, dtype=np.bool_)
+        try:
+            ys, xs = self._get_indices(cv_img)
+            pixels = cv_img[ys, xs].astype(np.int16)
+        except IndexError as e:
+            raise PixelProbeError(f"Pixel probes out of bounds for image of shape {cv_img.shape}.") from e
+        passed = (np.abs(pixels - self._expected).max(axis=1) <= self._tolerance)
+        failures = np.bincount(self._owner, weights=~passed, minlength=len(self.labels))
+        return failures == 0
+
+    def _get_indices(self, cv_img: NDArray[np.uint8]) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        profile = get_frame_layout(cv_img)
+        if profile.is_reference:
+            return self._ys, self._xs
+        key = (profile.height, profile.width)
+        indices = self._indices.get(key)
+        if indices is None:
+            indices = (
+                np.minimum((self._ys * profile.scale_y).astype(np.intp), profile.height - 1),
+                np.minimum((self._xs * profile.scale_x).astype(np.intp), profile.width - 1)
+            )
+            self._indices[key] = indices
+        return indices
+
+    @metrics.timed(category=VISION)
+    def classify(self, cv_img: NDArray[np.uint8]) -> Optional[str]:
+        """Return the first label (in rule order) whose probes all pass."""
+        matches = np.flatnonzero(self.evaluate(cv_img))
+        return self.labels[matches[0]] if len(matches) else None
+
+
+def _validate_probe(label: str, probe: PixelProbe):
+    # Negative indices would silently wrap to the other edge of the frame
+    width, height = REFERENCE_RESOLUTION
+    if not (0 <= probe.pt.x < width and 0 <= probe.pt.y < height):
+        raise PixelProbeError(f"Probe of '{label}' at {probe.pt} is outside the {width}x{height} layout.")
+    if len(probe.bgr) != 3 or not all(0 <= channel <= 255 for channel in probe.bgr):
+        raise PixelProbeError(f"Probe of '{label}' has an invalid BGR colour {probe.bgr}.")
+    if probe.tolerance < 0:
+        raise PixelProbeError(f"Probe of '{label}' has a negative tolerance {probe.tolerance}.")
+
+
+def get_default_page_probe_rules(labels: Optional[Collection[str]] = None) -> PixelProbeRuleSet:
+    """Page probe rules from PAGE_PROBES_FILE (empty if the file is missing) - load one per device, its index cache is not thread-safe."""
+    if not PAGE_PROBES_FILE.exists():
+        logger.warning(f"Page probe rules not found at {PAGE_PROBES_FILE}.")
+        return PixelProbeRuleSet({})
+    return PixelProbeRuleSet.load(PAGE_PROBES_FILE, labels)
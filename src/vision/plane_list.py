@@ -0,0 +1,180 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Optional, TypeVar
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from core.region import Region
+from core.region_set import RegionSet
+
+from config.settings import Settings
+
+from .layout import crop_layout_region_at_reference
+
+from logger.metrics import metrics, VISION
+
+class PlaneListError(Exception):
+    pass
+
+
+T = TypeVar("T")
+
+# Rows of the tag column whose grayscale std is below this are background (gaps between cards)
+CARD_GAP_ROW_STD = 6.0
+# Shorter runs of non-background rows are card remnants, not cards
+MIN_CARD_HEIGHT = 40
+# Cards starting within this many content rows of a known card are the same card
+DEDUP_TOLERANCE = 12
+# Overlap search: strip of the previous frame looked up in the current one
+OVERLAP_STRIP_HEIGHT = 64
+MIN_OVERLAP_SCORE = 0.8
+
+
+def to_gray(column_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    return cv2.cvtColor(column_img, cv2.COLOR_BGR2GRAY).astype(np.uint8, copy=False)
+
+
+@metrics.timed(category=VISION)
+def segment_card_rows(gray: NDArray[np.uint8]) -> list[tuple[int, int]]:
+    """(y1, y2) row spans of the cards in a tag column strip, top to bottom."""
+    is_card = (gray.std(axis=1) > CARD_GAP_ROW_STD).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], is_card, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [(int(y1), int(y2)) for y1, y2 in zip(starts, ends) if y2 - y1 >= MIN_CARD_HEIGHT]
+
+
+@metrics.timed(category=VISION)
+def find_scroll_offset(
+    prev_gray: NDArray[np.uint8],
+    curr_gray: NDArray[np.uint8],
+    strip_height: int = OVERLAP_STRIP_HEIGHT,
+    min_score: float = MIN_OVERLAP_SCORE
+) -> Optional[int]:
+    """
+    Rows the list content moved up from prev_gray to curr_gray (scrolling down the list),
+    or None if no overlap was found. A textured strip from the bottom half of the previous
+    frame is correlated against the current one - only upward moves are searched.
+    """
+    height = prev_gray.shape[0]
+    if curr_gray.shape != prev_gray.shape or height < 2 * strip_height:
+        raise PlaneListError(f"Cannot correlate tag columns of shapes {prev_gray.shape} and {curr_gray.shape}.")
+    # Lowest strip with texture - a flat strip (gap / empty list end) correlates with anything
+    for y0 in range(height - strip_height, height // 2 - 1, -(strip_height // 2)):
+        strip = prev_gray[y0:y0 + strip_height]
+        if strip.std() > CARD_GAP_ROW_STD:
+            break
+    else:
+        return None
+    scores = cv2.matchTemplate(curr_gray[:y0 + strip_height], strip, cv2.TM_CCOEFF_NORMED)
+    _, score, _, (_, match_y) = cv2.minMaxLoc(scores)
+    if score < min_score:
+        return None
+    return y0 - match_y
+
+
+@dataclass(frozen=True, slots=True)
+class PlaneList(Generic[T]):
+    """Recognised cards top to bottom, with their regions (layout space) at the current scroll position."""
+    items: tuple[T, ...]
+    regions: RegionSet
+    column_region: Region
+
+    def visible(self) -> NDArray[np.intp]:
+        """Indices of the cards fully on screen - the others need a scroll before tapping."""
+        _, y1, _, y2 = self.column_region.to_tuple_x1_y1_x2_y2()
+        bounds = self.regions.bounds
+        return np.flatnonzero((bounds[:, 1] >= y1) & (bounds[:, 3] <= y2))
+
+
+@dataclass
+class PlaneListStats:
+    frames: int = 0
+    rows_scanned: int = 0
+    cards_recognised: int = 0
+    duplicates: int = 0
+    cut_cards: int = 0  # runs cut by the top edge, not recognised
+
+
+class PlaneListStitcher(Generic[T]):
+    """
+    Builds one plane list from frames of the tag column taken while scrolling down.
+
+    Cards are tracked in content rows (screen row + rows scrolled since reset). Each frame
+    is aligned to the previous one by strip correlation, and only the rows below the last
+    completely recognised card are segmented - recognise_card runs once per card, on the
+    first frame showing it whole. Cards cut by the bottom edge wait for the next frame; a
+    run starting on the top edge is a card cut by it (unless the first frame is known to show
+    the top of the list) and is skipped.
+    """
+    def __init__(
+        self,
+        recognise_card: Callable[[NDArray[np.uint8]], T],
+        column_region: Region = Settings.PLANE_TAG_CROP_REGION,
+        starts_at_top: bool = False
+    ):
+        self.recognise_card = recognise_card
+        self.column_region = column_region
+        self.starts_at_top = starts_at_top
+        self.stats = PlaneListStats()
+        self.reset()
+
+    def reset(self):
+        self.scroll_offset = 0
+        self.last_offset = 0
+        self._items: list[T] = []
+        self._content_rows: list[tuple[int, int]] = []
+        # Content row up to which every complete card was recognised
+        self._scanned_until = 0
+        self._prev_gray: Optional[NDArray[np.uint8]] = None
+
+    def add_frame(self, cv_img: NDArray[np.uint8]) -> int:
+        """Add the next frame (any resolution), return the number of new cards."""
+        column = crop_layout_region_at_reference(cv_img, self.column_region)
+        gray = to_gray(column)
+        if self._prev_gray is not None:
+            offset = find_scroll_offset(self._prev_gray, gray)
+            if offset is None:
+                raise PlaneListError("Lost the plane list position - no overlap with the previous frame.")
+            self.last_offset = offset
+            self.scroll_offset += offset
+        self._prev_gray = gray
+        self.stats.frames += 1
+
+        height = gray.shape[0]
+        band_top = max(0, self._scanned_until - self.scroll_offset)
+        if band_top >= height:
+            return 0
+        self.stats.rows_scanned += height - band_top
+        new_cards = 0
+        for y1, y2 in segment_card_rows(gray[band_top:]):
+            if band_top + y2 >= height:
+                # Cut by the bottom edge
+                break
+            if band_top + y1 == 0 and not (self.starts_at_top and self.scroll_offset == 0):
+                # Cut by the top edge - its top part scrolled out (or was never on screen)
+                self.stats.cut_cards += 1
+                continue
+            content_y1 = band_top + y1 + self.scroll_offset
+            content_y2 = band_top + y2 + self.scroll_offset
+            self._scanned_until = content_y2
+            if any(abs(content_y1 - known_y1) <= DEDUP_TOLERANCE for known_y1, _ in self._content_rows[-2:]):
+                self.stats.duplicates += 1
+                continue
+            self._items.append(self.recognise_card(column[band_top + y1:band_top + y2]))
+            self._content_rows.append((content_y1, content_y2))
+            new_cards += 1
+        self.stats.cards_recognised += new_cards
+        return new_cards
+
+    def plane_list(self) -> PlaneList[T]:
+        x1, y1, x2, _ = self.column_region.to_tuple_x1_y1_x2_y2()
+        rows = np.asarray(self._content_rows, dtype=np.int64).reshape(-1, 2)
+        regions = RegionSet(np.column_stack((
+            np.full(len(rows), x1, dtype=np.int64),
+            rows[:, 0],
+            np.full(len(rows), x2, dtype=np.int64),
+            rows[:, 1]
+        ))).translate(0, y1 - self.scroll_offset)
+        return PlaneList(tuple(self._items), regions, self.column_region)
@@ -9,25 +9,99 @@ from core.interfaces import IRegion
 
 from . import image_utils
 
+from logger.metrics import metrics, VISION
+
 class ImageProcessingError(Exception):
     pass
 
 # Image preprocessing
 
+@metrics.timed(category=VISION)
 def convert_pil_image_2_np_array(pil_image: Image) -> NDArray[np.uint8]:
     return np.array(pil_image).astype(np.uint8)
 
+@metrics.timed(category=VISION)
 def convert_RGB_2_BGR(cv_img_rgb: NDArray[np.uint8]) -> NDArray[np.uint8]:
     return cv2.cvtColor(cv_img_rgb, cv2.COLOR_RGB2BGR).astype(np.uint8)
 
+@metrics.timed(category=VISION)
 def process_raw_screenshot(pil_image: Image) -> NDArray[np.uint8]:
     return convert_RGB_2_BGR(convert_pil_image_2_np_array(pil_image))
 
+# Raw framebuffer (`screencap` without -p)
+
+# Header layouts of `screencap` raw output: width, height, format (+ colorspace on Android 9+)
+RAW_SCREENCAP_HEADER_SIZES = (16, 12)
+
+def parse_raw_screencap_header(raw: bytes) -> tuple[int, int, int]:
+    """
+    Return (width, height, header_size) of a raw `screencap` RGBA buffer.
+
+    The header is little-endian uint32 width, height, format and, on newer
+    Android versions, a colorspace field - the size is derived from the payload length.
+    """
+    try:
+        width, height = (int(v) for v in np.frombuffer(raw, dtype="<u4", count=2))
+        for header_size in RAW_SCREENCAP_HEADER_SIZES:
+            if len(raw) - header_size == width * height * 4:
+                return width, height, header_size
+        raise ValueError(f"Unexpected raw screencap size {len(raw)} for {width}x{height} RGBA.")
+    except Exception as e:
+        raise ImageProcessingError("Failed to parse raw screencap header.") from e
+
+@metrics.timed(category=VISION)
+def convert_raw_screencap_2_np_array(raw: bytes) -> NDArray[np.uint8]:
+    """Return a zero-copy (height, width, 4) RGBA view over a raw `screencap` buffer."""
+    width, height, header_size = parse_raw_screencap_header(raw)
+    return np.frombuffer(raw, dtype=np.uint8, count=width * height * 4, offset=header_size).reshape(height, width, 4)
+
+@metrics.timed(category=VISION)
+def convert_raw_screencap_rows_2_np_array(raw_rows: bytes, width: int) -> NDArray[np.uint8]:
+    """Return a zero-copy (rows, width, 4) RGBA view over headerless framebuffer rows."""
+    stride = width * 4
+    if len(raw_rows) == 0 or len(raw_rows) % stride != 0:
+        raise ImageProcessingError(f"Raw framebuffer rows of {len(raw_rows)} bytes are not a multiple of row stride {stride}.")
+    return np.frombuffer(raw_rows, dtype=np.uint8).reshape(len(raw_rows) // stride, width, 4)
+
+@metrics.timed(category=VISION)
+def crop_RGBA_2_BGR(cv_img_rgba: NDArray[np.uint8], region: IRegion, y_offset: int = 0) -> NDArray[np.uint8]:
+    """
+    Crop region out of an RGBA image and convert only the cropped pixels to BGR.
+    y_offset: screen row of the first row in cv_img_rgba (for partial framebuffer bands).
+    """
+    x1, y1, x2, y2 = region.to_tuple_x1_y1_x2_y2()
+    cropped_img = cv_img_rgba[y1 - y_offset:y2 - y_offset, x1:x2]
+    if cropped_img.size == 0:
+        raise ImageProcessingError(f"Cropped image is empty. Check input region: {region}.")
+    return convert_RGBA_2_BGR(cropped_img)
+
+@metrics.timed(category=VISION)
+def convert_RGBA_2_BGR(cv_img_rgba: NDArray[np.uint8], dst: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint8]:
+    """
+    Convert RGBA to BGR, writing into dst when its shape matches.
+
+    Returns the converted image - dst itself when it was reused.
+    """
+    height, width = cv_img_rgba.shape[:2]
+    if dst is None or dst.shape != (height, width, 3) or dst.dtype != np.uint8:
+        dst = np.empty((height, width, 3), dtype=np.uint8)
+    cv2.cvtColor(cv_img_rgba, cv2.COLOR_RGBA2BGR, dst=dst)
+    return dst
+
+@metrics.timed(category=VISION)
+def process_raw_screencap(raw: bytes, dst: Optional[NDArray[np.uint8]] = None) -> NDArray[np.uint8]:
+    """Raw `screencap` buffer -> BGR image with a single conversion (into dst if given)."""
+    try:
+        return convert_RGBA_2_BGR(convert_raw_screencap_2_np_array(raw), dst=dst)
+    except Exception as e:
+        raise ImageProcessingError("Failed to process raw screencap.") from e
+
 
 
 
 # Image Basic Actions
 
+@metrics.timed(category=VISION)
 def crop_image(
     cv_img: NDArray[np.uint8],
     region: IRegion
@@ -87,7 +161,7 @@ def crop_image_and_save(
     except Exception as e:
         raise ImageProcessingError("Failed to crop and save image.") from e
 
-def draw_circles_on_image(cv_img: NDArray[np.uint8], circles: Optional[NDArray[np.uint8]], show_coor:bool=False) -> NDArray[np.uint8]:
+def draw_circles_on_image(cv_img: NDArray[np.uint8], circles: Optional[NDArray[np.int32]], show_coor:bool=False) -> NDArray[np.uint8]:
     try:
         cv_img_copy = cv_img.copy()
         if circles is None: 
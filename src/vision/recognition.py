@@ -1,56 +1,106 @@
-from typing import Any, cast
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import cache
+from typing import Any, Hashable, Optional, Sequence, cast
 import numpy as np
 from numpy.typing import NDArray
 import cv2
 
+from core.region import Region
+
+from .layout import get_frame_layout
+
+from logger.metrics import metrics, VISION
+
 
 class RecognitionError(Exception):
     pass
 
-def classify_is_ramp_agent_toggle_switch_on_using_cropped_image(toggle_switch_img: NDArray[np.uint8]) -> bool:
-    """
-    Classify a toggle switch image as 'on' (green) or 'off' (grey).
+# Colour state classification (BGR -> colour class lookup table)
 
-    Parameters:
-        cv_img (np.ndarray): Input image in BGR format. Cropped for the toggle switch.
+class ColourClass(IntEnum):
+    OTHER = 0
+    GREEN = 1
+    GREY = 2
 
-    Returns:
-        bool: True if green (on), False if grey (off).
+# HSV (OpenCV ranges) of each colour class - earlier entries win on overlap
+HSV_COLOUR_CLASS_RANGES: dict[ColourClass, tuple[tuple[int, int, int], tuple[int, int, int]]] = {
+    ColourClass.GREEN: ((40, 50, 50), (80, 255, 255)),
+    ColourClass.GREY: ((0, 0, 50), (180, 50, 200)),
+}
 
-    Raises:
-        ValueError: If the image does not match expected toggle switch colors.
+# Bits kept per BGR channel in the lookup table index (5 -> 32 levels, 32768 entries)
+COLOUR_LUT_BITS = 5
+
+@dataclass(frozen=True, slots=True)
+class ColourStateSpec:
     """
-    try:
-        # Resize for consistency
-        resized = cv2.resize(toggle_switch_img, (100, 50))
+    Widget states by colour class, e.g. (("on", GREEN), ("off", GREY)).
+    The state whose colour class dominates wins if it covers at least min_fraction of the pixels.
+    """
+    states: tuple[tuple[str, ColourClass], ...]
+    min_fraction: float = 0.02
+
+TOGGLE_SWITCH_COLOUR_STATES = ColourStateSpec((("on", ColourClass.GREEN), ("off", ColourClass.GREY)))
 
-        # Convert to HSV for better color segmentation
-        hsv = cv2.cvtColor(resized, cv2.COLOR_BGR2HSV)
+@cache
+def build_bgr_colour_class_lut() -> NDArray[np.uint8]:
+    """Return the quantised-BGR -> ColourClass table, built once by converting every bin centre to HSV."""
+    shift = 8 - COLOUR_LUT_BITS
+    levels = (np.arange(1 << COLOUR_LUT_BITS, dtype=np.uint16) << shift) + (1 << shift >> 1)
+    b, g, r = np.meshgrid(levels, levels, levels, indexing="ij")
+    bgr = np.stack([b, g, r], axis=-1).astype(np.uint8).reshape(-1, 1, 3)
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
 
-        # Define HSV color ranges
-        green_lower = np.array([40, 50, 50])
-        green_upper = np.array([80, 255, 255])
+    lut = np.full(len(bgr), ColourClass.OTHER, dtype=np.uint8)
+    for colour_class, (lower, upper) in reversed(HSV_COLOUR_CLASS_RANGES.items()):
+        mask = cv2.inRange(hsv, np.array(lower), np.array(upper)).reshape(-1) > 0
+        lut[mask] = colour_class
+    return lut
+
+@metrics.timed(category=VISION)
+def classify_colour_states(
+    cv_img: NDArray[np.uint8],
+    items: Sequence[tuple[Hashable, Region, ColourStateSpec]]
+) -> dict[Hashable, Optional[str]]:
+    """
+    Classify many widgets of one BGR frame in a single pass.
 
-        grey_lower = np.array([0, 0, 50])
-        grey_upper = np.array([180, 50, 200])
+    Parameters:
+        cv_img (np.ndarray): Full frame in BGR format, any resolution.
+        items: (key, region, spec) per widget, regions in layout space.
 
-        # Create masks
-        green_mask = cv2.inRange(hsv, green_lower, green_upper)
-        grey_mask = cv2.inRange(hsv, grey_lower, grey_upper)
+    Returns:
+        dict: key -> state name, or None if no state colour is dominant enough.
+    """
+    try:
+        if not items:
+            return {}
+        lut = build_bgr_colour_class_lut()
+        shift = 8 - COLOUR_LUT_BITS
+        profile = get_frame_layout(cv_img)
+        crops = [profile.crop(cv_img, region).reshape(-1, 3) for _, region, _ in items]
+        sizes = np.array([len(crop) for crop in crops])
+        pixels = np.concatenate(crops) >> shift
+        lut_index = (pixels[:, 0].astype(np.intp) << (2 * COLOUR_LUT_BITS)) | (pixels[:, 1].astype(np.intp) << COLOUR_LUT_BITS) | pixels[:, 2]
+        item_ids = np.repeat(np.arange(len(items)), sizes)
 
-        green_pixels = cv2.countNonZero(green_mask)
-        grey_pixels = cv2.countNonZero(grey_mask)
+        n_classes = len(ColourClass)
+        counts = np.bincount(item_ids * n_classes + lut[lut_index], minlength=len(items) * n_classes).reshape(len(items), n_classes)
 
-        if green_pixels > grey_pixels and green_pixels > 100:
-            return True
-        elif grey_pixels > green_pixels and grey_pixels > 100:
-            return False
-        else:
-            raise ValueError("Unrecognized ramp agent toggle switch img: unrecognized color or insufficient color dominance. Saved image to temp/error.png")
+        states: dict[Hashable, Optional[str]] = {}
+        for (key, _, spec), class_counts, size in zip(items, counts, sizes):
+            state_counts = [(class_counts[colour_class], name) for name, colour_class in spec.states]
+            best_count, best_name = max(state_counts)
+            is_dominant = sum(count == best_count for count, _ in state_counts) == 1
+            states[key] = best_name if is_dominant and best_count >= spec.min_fraction * size else None
+        return states
     except Exception as e:
-        raise RecognitionError("Error classifying ramp agent toggle switch.") from e
+        raise RecognitionError("Error classifying colour states.") from e
 
-def recognise_filter_icon_circles(filter_column_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+@metrics.timed(category=VISION)
+def recognise_filter_icon_circles(filter_column_img: NDArray[np.uint8]) -> NDArray[np.int32]:
+    """Return detected circles as (x, y, r) int rows, sorted by y."""
     try:
         grey_img = cv2.cvtColor(filter_column_img, cv2.COLOR_BGR2GRAY)
 
@@ -70,12 +120,13 @@ def recognise_filter_icon_circles(filter_column_img: NDArray[np.uint8]) -> NDArr
         
         circles_res = cast(NDArray[np.floating], circles_res)
         circles_2d: NDArray[np.floating] = circles_res[0]
-        circles_int: NDArray[np.uint8] = np.rint(circles_2d).astype(np.uint8)
-        sorted_circles: NDArray[np.uint8] = circles_int[circles_int[:, 1].argsort()]
+        circles_int: NDArray[np.int32] = np.rint(circles_2d).astype(np.int32)
+        sorted_circles: NDArray[np.int32] = circles_int[circles_int[:, 1].argsort()]
         return sorted_circles
     except Exception as e:
         raise RecognitionError("Error in recognising circles in filter column.") from e
     
+@metrics.timed(category=VISION)
 def classify_is_filter_icon_clicked(filter_icon_img: NDArray[np.uint8]) -> bool:
     """
     Determines whether a single filter icon is clicked or not.
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+import numpy as np
+from numpy.typing import NDArray
+import cv2
+
+from core.point import Point
+from core.region import Region
+
+from config.paths import TEMPLATES_DIR
+from config.settings import Settings
+
+from .layout import LayoutProfile, get_frame_layout
+
+from logger.logger import setup_logger, logging
+from logger.metrics import metrics, VISION
+logger = setup_logger(__name__, level=logging.ERROR)
+
+class TemplateError(Exception):
+    pass
+
+
+CANNY_THRESHOLDS = (50, 150)
+
+@dataclass(frozen=True, slots=True)
+class TemplateSpec:
+    """
+    A template image `<name>.png` in the templates dir, searched only inside search_region.
+    use_edges matches Canny edge maps instead of grey levels (robust to colour / brightness changes).
+    """
+    name: str
+    search_region: Region
+    threshold: float = 0.9
+    scales: tuple[float, ...] = (1.0,)
+    use_edges: bool = False
+
+@dataclass(frozen=True, slots=True)
+class TemplateMatch:
+    name: str
+    score: float
+    region: Region  # matched area in layout space (Settings coordinates)
+    scale: float
+
+    def center(self) -> Point:
+        return self.region.center()
+
+@dataclass(frozen=True, slots=True)
+class _TemplateLevel:
+    scale: float
+    image: NDArray[np.uint8]  # grey or edge map, as matched
+
+
+def to_grey(cv_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    return cv_img if cv_img.ndim == 2 else cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY).astype(np.uint8)
+
+def to_edges(grey_img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    return cv2.Canny(grey_img, *CANNY_THRESHOLDS).astype(np.uint8)
+
+
+class TemplateBank:
+    """
+    Templates loaded once with their grey / edge variants and scale levels precomputed.
+
+    Matching crops the frame to each template's search region, converts every distinct
+    region once per call and runs cv2.matchTemplate on that window only - cost scales
+    with the ROI size, not the frame size. Missing template files are skipped with a warning.
+    Templates are authored at the layout reference resolution and resized once per frame
+    resolution, so downscaled frames are matched without upscaling them.
+    """
+    def __init__(self, specs: Iterable[TemplateSpec], templates_dir: Path = TEMPLATES_DIR):
+        self.specs: dict[str, TemplateSpec] = {}
+        self._levels: dict[str, list[_TemplateLevel]] = {}
+        # (name, frame width, frame height) -> levels resized to that frame resolution
+        self._resolution_levels: dict[tuple[str, int, int], list[_TemplateLevel]] = {}
+        for spec in specs:
+            self._load(spec, templates_dir)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._levels
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def _load(self, spec: TemplateSpec, templates_dir: Path):
+        path = templates_dir / f"{spec.name}.png"
+        template_img = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if template_img is None:
+            logger.warning(f"Template '{spec.name}' not found at {path} - skipped.")
+            return
+        try:
+            grey = to_grey(template_img.astype(np.uint8))
+            levels: list[_TemplateLevel] = []
+            for scale in spec.scales:
+                scaled = grey if scale == 1.0 else cv2.resize(grey, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA).astype(np.uint8)
+                if min(scaled.shape[:2]) < 4:
+                    continue
+                levels.append(_TemplateLevel(scale, to_edges(scaled) if spec.use_edges else scaled))
+        except Exception as e:
+            raise TemplateError(f"Failed to prepare template '{spec.name}'.") from e
+        self.specs[spec.name] = spec
+        self._levels[spec.name] = levels
+
+    def match(self, cv_img: NDArray[np.uint8], name: str) -> Optional[TemplateMatch]:
+        """Return the best match of one template if its score reaches the template threshold."""
+        return self.match_first(cv_img, [name])
+
+    @metrics.timed(category=VISION)
+    def match_first(self, cv_img: NDArray[np.uint8], names: Optional[Iterable[str]] = None) -> Optional[TemplateMatch]:
+        """Try templates in order and return the first confident match (early exit)."""
+        for match in self._iter_matches(cv_img, names):
+            return match
+        return None
+
+    @metrics.timed(category=VISION)
+    def match_all(self, cv_img: NDArray[np.uint8], names: Optional[Iterable[str]] = None) -> list[TemplateMatch]:
+        """Return every confident match."""
+        return list(self._iter_matches(cv_img, names))
+
+    def _iter_matches(self, cv_img: NDArray[np.uint8], names: Optional[Iterable[str]]):
+        # Search windows converted at most once per call, shared by templates with the same ROI
+        windows: dict[tuple[Region, bool], NDArray[np.uint8]] = {}
+        profile = get_frame_layout(cv_img)
+        for name in (self._levels.keys() if names is None else names):
+            if not self._levels.get(name):
+                continue
+            spec = self.specs[name]
+            try:
+                levels = self._get_levels(name, profile)
+                window_key = (spec.search_region, spec.use_edges)
+                window = windows.get(window_key)
+                if window is None:
+                    grey = to_grey(profile.crop(cv_img, spec.search_region))
+                    window = to_edges(grey) if spec.use_edges else grey
+                    windows[window_key] = window
+                match = self._match_levels(window, spec, levels, profile)
+            except Exception as e:
+                raise TemplateError(f"Failed to match template '{name}'.") from e
+            if match is not None:
+                yield match
+
+    def _get_levels(self, name: str, profile: LayoutProfile) -> list[_TemplateLevel]:
+        if profile.is_reference:
+            return self._levels[name]
+        key = (name, profile.width, profile.height)
+        levels = self._resolution_levels.get(key)
+        if levels is None:
+            levels = []
+            for level in self._levels[name]:
+                height, width = level.image.shape[:2]
+                size = (max(1, round(width * profile.scale_x)), max(1, round(height * profile.scale_y)))
+                # Edge maps are binary - keep them crisp
+                interpolation = cv2.INTER_NEAREST if self.specs[name].use_edges else cv2.INTER_AREA
+                levels.append(_TemplateLevel(level.scale, cv2.resize(level.image, size, interpolation=interpolation).astype(np.uint8)))
+            self._resolution_levels[key] = levels
+        return levels
+
+    def _match_levels(
+        self,
+        window: NDArray[np.uint8],
+        spec: TemplateSpec,
+        levels: list[_TemplateLevel],
+        profile: LayoutProfile
+    ) -> Optional[TemplateMatch]:
+        best: Optional[TemplateMatch] = None
+        x0, y0, _, _ = profile.region(spec.search_region).to_tuple_x1_y1_x2_y2()
+        for level in levels:
+            t_height, t_width = level.image.shape[:2]
+            if t_height > window.shape[0] or t_width > window.shape[1]:
+                continue
+            result = cv2.matchTemplate(window, level.image, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (x, y) = cv2.minMaxLoc(result)
+            if score < spec.threshold or (best is not None and score <= best.score):
+                continue
+            best = TemplateMatch(
+                spec.name,
+                float(score),
+                Region(
+                    profile.to_reference(Point(x0 + x, y0 + y)),
+                    profile.to_reference(Point(x0 + x + t_width, y0 + y + t_height))
+                ),
+                level.scale
+            )
+        return best
+
+
+def get_default_template_bank() -> TemplateBank:
+    """Template bank for Settings.TEMPLATE_SEARCH_REGIONS - load one per device, its per-resolution cache is not thread-safe."""
+    return TemplateBank(
+        TemplateSpec(name, region) for name, region in Settings.TEMPLATE_SEARCH_REGIONS.items()
+    )